@@ -0,0 +1,225 @@
+import os
+import tempfile
+import unittest
+from Node_Matrix import *
+from Node_Matrix_io import *
+from NM_unit_tests import as_lists, samples
+
+
+class TempFileTestCase(unittest.TestCase):
+    ''' A test case with a file to write to, removed once it is done. '''
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write(self, text):
+        with open(self.path, 'w') as out:
+            out.write(text)
+
+
+class TestBinaryFormat(TempFileTestCase):
+    ''' Test saving matrices to and loading them from binary files. '''
+
+    def test1_round_trip_every_class(self):
+        for matrix in samples():
+            save_matrix(matrix, self.path)
+            result = load_matrix(self.path)
+            self.assertIs(type(result), type(matrix))
+            self.assertEqual(as_lists(result), as_lists(matrix),
+                             type(matrix).__name__)
+
+    def test2_mapped_every_class(self):
+        for matrix in samples():
+            save_matrix(matrix, self.path)
+            result = load_matrix(self.path, mapped=True)
+            self.assertEqual(as_lists(result), as_lists(matrix),
+                             type(matrix).__name__)
+            if(isinstance(result, MappedMatrix)):
+                result.close()
+
+    def test3_mapped_copies_on_write(self):
+        matrix = samples()[0]
+        save_matrix(matrix, self.path)
+        result = load_matrix(self.path, mapped=True)
+        self.assertIsInstance(result, MappedMatrix)
+        result.set_val(1, 1, 6)
+        self.assertIsNone(result._buffer, "The copy lets go of the map.")
+        result.swap_rows(0, 2)
+        self.assertEqual(result.get_val(1, 1), 6)
+        self.assertEqual(result.get_val(0, 3), -2)
+        # The file itself is never changed
+        self.assertEqual(as_lists(load_matrix(self.path)), as_lists(matrix))
+
+    def test4_pending_scalars(self):
+        matrix = Matrix.from_triplets(2, 2, [0], [1], [3.5])
+        matrix.multiply_scalar(2)
+        matrix.add_scalar(1)
+        save_matrix(matrix, self.path)
+        self.assertEqual(as_lists(load_matrix(self.path)),
+                         [[1, 8.0], [1, 1]])
+
+    def test5_not_a_matrix(self):
+        self.write('not a matrix')
+        with self.assertRaises(MatrixFormatError):
+            load_matrix(self.path)
+
+    def test6_truncated(self):
+        save_matrix(samples()[0], self.path)
+        with open(self.path, 'rb') as source:
+            data = source.read()
+        with open(self.path, 'wb') as out:
+            out.write(data[:-8])
+        with self.assertRaises(MatrixFormatError):
+            load_matrix(self.path)
+
+    def test7_identity_after_add_scalar(self):
+        matrix = IdentityMatrix(3)
+        matrix.add_scalar(1)
+        save_matrix(matrix, self.path)
+        result = load_matrix(self.path)
+        expected = [[2, 1, 1], [1, 2, 1], [1, 1, 2]]
+        self.assertIsInstance(result, IdentityMatrix)
+        self.assertEqual(as_lists(result), expected,
+                         "The scalar added should be kept.")
+
+    def test8_identity_after_multiply_scalar(self):
+        matrix = IdentityMatrix(2)
+        matrix.multiply_scalar(4)
+        save_matrix(matrix, self.path)
+        self.assertEqual(as_lists(load_matrix(self.path)), [[4, 0], [0, 4]])
+
+    def test9_close(self):
+        matrix = samples()[0]
+        save_matrix(matrix, self.path)
+        with load_matrix(self.path, mapped=True) as result:
+            self.assertEqual(as_lists(result), as_lists(matrix))
+            buffer = result._buffer
+        self.assertTrue(buffer.closed)
+        self.assertRaises(ValueError, result.get_val, 0, 1)
+        # Closing twice does nothing
+        result.close()
+
+    def test10_missing_diagonal_value(self):
+        save_matrix(DiagonalMatrix(2, 3), self.path)
+        # Move the value of row 0 over to row 1
+        with open(self.path, 'r+b') as out:
+            out.seek(48 + 8)
+            out.write(bytes(8))
+        with self.assertRaises(MatrixFormatError):
+            load_matrix(self.path)
+
+
+class TestMatrixMarket(TempFileTestCase):
+    ''' Test reading and writing Matrix Market coordinate files. '''
+
+    def test1_round_trip_every_class(self):
+        for matrix in samples():
+            write_matrix_market(matrix, self.path)
+            result = read_matrix_market(self.path)
+            self.assertEqual(as_lists(result), as_lists(matrix),
+                             type(matrix).__name__)
+
+    def test2_symmetric(self):
+        matrix = samples()[2]
+        write_matrix_market(matrix, self.path)
+        with open(self.path) as source:
+            self.assertIn('symmetric', source.readline())
+        self.assertIsInstance(read_matrix_market(self.path), SymmetricMatrix)
+
+    def test3_read_pattern_with_default(self):
+        self.write('%%MatrixMarket matrix coordinate pattern general\n'
+                   '% default 2\n'
+                   '2 3 2\n'
+                   '1 1\n'
+                   '2 3\n')
+        result = read_matrix_market(self.path)
+        self.assertEqual(as_lists(result), [[1, 2, 2], [2, 2, 1]])
+
+    def test4_small_chunks(self):
+        matrix = Matrix.from_triplets(5, 5, [k for k in range(5)],
+                                      [4 - k for k in range(5)],
+                                      [k * 1.5 for k in range(5)])
+        write_matrix_market(matrix, self.path, chunk_size=8)
+        result = read_matrix_market(self.path, chunk_size=7)
+        self.assertEqual(as_lists(result), as_lists(matrix))
+
+    def test5_bad_files(self):
+        for text in ['%%MatrixMarket matrix array real general\n1 1\n1\n',
+                     '%%MatrixMarket matrix coordinate real general\n'
+                     '2 2 2\n1 1 1.0\n',
+                     'no header\n']:
+            self.write(text)
+            with self.assertRaises(MatrixFormatError):
+                read_matrix_market(self.path)
+
+    def test6_duplicates_across_chunks(self):
+        # The entries of row 0 come in several chunks, and (1, 1) twice
+        self.write('%%MatrixMarket matrix coordinate integer general\n'
+                   '2 3 5\n1 3 1\n2 2 4\n1 1 2\n2 2 5\n1 2 3\n')
+        result = read_matrix_market(self.path, chunk_size=6)
+        self.assertEqual(as_lists(result), [[2, 3, 1], [0, 9, 0]])
+
+    def test7_default_is_a_comment_elsewhere(self):
+        matrix = Matrix(2, 2, 1.5)
+        matrix.set_val(0, 1, 3)
+        write_matrix_market(matrix, self.path)
+        with open(self.path) as source:
+            lines = source.read().splitlines()
+        # The default is on a comment line, which other readers skip
+        self.assertEqual(lines[1], '% default 1.5')
+        self.assertEqual(as_lists(read_matrix_market(self.path)),
+                         as_lists(matrix))
+
+
+class TestCSV(TempFileTestCase):
+    ''' Test reading and writing CSV files of coordinates. '''
+
+    def test1_round_trip_every_class(self):
+        for matrix in samples():
+            write_csv(matrix, self.path)
+            # The unset values of a diagonal are not written
+            if(isinstance(matrix, DiagonalMatrix)):
+                default = 0
+            else:
+                default = matrix._default
+            result = read_csv(self.path, (matrix.get_num_rows(),
+                                          matrix.get_num_cols()),
+                              default, type(matrix), duplicates='last')
+            self.assertIs(type(result), type(matrix))
+            self.assertEqual(as_lists(result), as_lists(matrix),
+                             type(matrix).__name__)
+
+    def test2_header_and_delimiter(self):
+        self.write('row;col;value\n0;1;2\n2;0;3.5\n0;1;1\n')
+        result = read_csv(self.path, delimiter=';', skip_header=True)
+        self.assertEqual(as_lists(result), [[0, 3], [0, 0], [3.5, 0]])
+
+    def test3_duplicates(self):
+        self.write('0,0,1\n0,0,2\n')
+        self.assertEqual(read_csv(self.path, duplicates='last').get_val(
+            0, 0), 2)
+        with self.assertRaises(MatrixInvalidOperationError):
+            read_csv(self.path, duplicates='error')
+
+    def test4_small_chunks(self):
+        self.write('2,0,1\n0,1,2.5\n2,0,3\n1,2,4\n0,1,1\n')
+        result = read_csv(self.path, chunk_size=5)
+        self.assertEqual(as_lists(result), [[0, 3.5, 0], [0, 0, 4],
+                                            [4, 0, 0]])
+        with self.assertRaises(MatrixInvalidOperationError):
+            read_csv(self.path, duplicates='error', chunk_size=5)
+
+    def test5_symmetric_small_chunks(self):
+        self.write('1,0,2\n0,1,3\n2,2,1\n')
+        result = read_csv(self.path, cls=SymmetricMatrix, duplicates='last',
+                          chunk_size=4)
+        self.assertEqual(as_lists(result), [[0, 3, 0], [3, 0, 0],
+                                            [0, 0, 1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+'''Report how many bytes a Matrix uses per stored element, comparing
+MatrixNode with a copy of it that keeps a per-node __dict__ instead of
+__slots__.
+
+Usage: python NM_memory_benchmark.py [number of elements]
+'''
+import sys
+import tracemalloc
+import Node_Matrix
+
+
+class DictMatrixNode():
+    '''MatrixNode as it was before it used __slots__'''
+
+
+# Share every method with MatrixNode, but leave out the slots so each node
+# gets its own __dict__
+for name, attr in vars(Node_Matrix.MatrixNode).items():
+    if(callable(attr)):
+        setattr(DictMatrixNode, name, attr)
+
+
+def bytes_per_element(node_class, nnz, row_length):
+    '''(type, int, int) -> float
+    Build a matrix holding nnz elements, row_length per row, out of
+    node_class nodes and return the bytes allocated per element.
+    '''
+    rows = nnz // row_length
+    saved = Node_Matrix.MatrixNode
+    Node_Matrix.MatrixNode = node_class
+    try:
+        tracemalloc.start()
+        matrix = Node_Matrix.Matrix(rows, rows)
+        step = rows // row_length
+        matrix._link_rows((i, sorted((i + k * step) % rows
+                                     for k in range(row_length)),
+                           [float(i + k) for k in range(row_length)])
+                          for i in range(rows))
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+    finally:
+        Node_Matrix.MatrixNode = saved
+    del matrix
+    return used / nnz
+
+
+if __name__ == '__main__':
+    nnz = 10 ** 6
+    if(len(sys.argv) > 1):
+        nnz = int(sys.argv[1])
+    row_length = 100
+    before = bytes_per_element(DictMatrixNode, nnz, row_length)
+    after = bytes_per_element(Node_Matrix.MatrixNode, nnz, row_length)
+    print("Elements stored:           %d" % nnz)
+    print("Bytes/element (__dict__):  %.1f" % before)
+    print("Bytes/element (__slots__): %.1f" % after)
+    print("Saved:                     %.1f%%" % (100 * (1 - after / before)))
@@ -0,0 +1,293 @@
+import asyncio
+import inspect
+import sys
+import threading
+import unittest
+from array import array
+from Node_Matrix import *
+from Node_Matrix_concurrent import ConcurrentMatrix, ReadWriteLock
+from Node_Matrix_parallel import (elementwise_parallel,
+                                   multiply_matrix_parallel, _attached,
+                                   _share)
+from NM_unit_tests import (as_lists, check_invariants, dense_add,
+                           dense_multiply)
+
+
+def banded(m, n, default=0):
+    '''(int, int, float) -> Matrix
+    Return an m x n matrix with the given default, holding a value on the
+    diagonal and on the two columns to its right.
+    '''
+    rows = []
+    cols = []
+    values = []
+    for i in range(m):
+        for j in range(i, min(i + 3, n)):
+            rows.append(i)
+            cols.append(j)
+            values.append(i - j + 2)
+    return Matrix.from_triplets(m, n, rows, cols, values, default)
+
+
+class TestParallelMultiply(unittest.TestCase):
+    ''' Test the product worked out in a pool of processes. '''
+
+    def test1_matches_serial(self):
+        a = banded(12, 9, 1)
+        b = banded(9, 7)
+        result = multiply_matrix_parallel(a, b, workers=2, block_rows=5,
+                                          min_nnz=0)
+        self.assertEqual(as_lists(result), as_lists(a.multiply_matrix(b)))
+
+    def test2_small_matrices_stay_serial(self):
+        a = banded(3, 3)
+        result = multiply_matrix_parallel(a, a, workers=2)
+        self.assertEqual(as_lists(result),
+                         dense_multiply(as_lists(a), as_lists(a)))
+
+    def test3_bad_dimensions(self):
+        with self.assertRaises(MatrixDimensionError):
+            multiply_matrix_parallel(Matrix(2, 3), Matrix(2, 3))
+
+
+class TestParallelElementwise(unittest.TestCase):
+    ''' Test elementwise operations merged in chunks of rows. '''
+
+    def setUp(self):
+        self.a = banded(10, 6, 1)
+        self.b = banded(10, 6)
+        self.b.swap_rows(0, 9)
+
+    def test1_every_operation(self):
+        operations = {'add': lambda x, y: x + y,
+                      'subtract': lambda x, y: x - y,
+                      'multiply': lambda x, y: x * y,
+                      'max': max, 'min': min}
+        values_a = as_lists(self.a)
+        values_b = as_lists(self.b)
+        for name in operations:
+            expected = [[operations[name](values_a[i][j], values_b[i][j])
+                         for j in range(6)] for i in range(10)]
+            result = elementwise_parallel(self.a, self.b, name, workers=2,
+                                          chunk_rows=3, min_nnz=0)
+            self.assertEqual(as_lists(result), expected, name)
+
+    def test2_timings(self):
+        timings = []
+        elementwise_parallel(self.a, self.b, workers=1, timings=timings)
+        self.assertEqual(len(timings), 1)
+        self.assertEqual(timings[0][:2], (0, 10))
+
+    def test3_bad_operation(self):
+        with self.assertRaises(MatrixInvalidOperationError):
+            elementwise_parallel(self.a, self.b, 'divide')
+
+    def test4_workers_close_what_they_attach(self):
+        block, description = _share(array('q', [4, 5, 6]))
+        try:
+            with _attached([description]) as views:
+                self.assertEqual(list(views[0]), [4, 5, 6])
+            # The view is released, but the block is left to its maker
+            with self.assertRaises(ValueError):
+                views[0][0]
+            self.assertEqual(bytes(block.buf[:8]),
+                             (4).to_bytes(8, sys.byteorder))
+        finally:
+            block.close()
+            block.unlink()
+
+
+class TestConcurrentMatrix(unittest.TestCase):
+    ''' Test sharing a matrix between threads. '''
+
+    def test1_wrapped_methods(self):
+        shared = ConcurrentMatrix(Matrix(3, 3))
+        shared.set_val(0, 1, 4)
+        self.assertEqual(shared.get_val(0, 1), 4)
+        self.assertEqual(list(shared.iter_row(0)), [(0, 1, 4)])
+        self.assertEqual(shared.get_matrix().get_val(0, 1), 4)
+        other = ConcurrentMatrix(Matrix(3, 3, 1))
+        self.assertEqual(as_lists(shared.add_matrix(other)),
+                         [[1, 5, 1], [1, 1, 1], [1, 1, 1]])
+
+    def test2_threads_writing(self):
+        shared = ConcurrentMatrix(Matrix(8, 50))
+
+        def write(i):
+            for j in range(50):
+                shared.set_val(i, j, i + j + 1)
+        threads = [threading.Thread(target=write, args=(i,))
+                   for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        check_invariants(shared.get_matrix())
+        self.assertEqual(shared.nnz(), 400)
+
+    def test3_compressed_settles_under_lock(self):
+        shared = ConcurrentMatrix(CompressedMatrix(2, 2))
+        shared.set_val(1, 0, 5)
+        self.assertEqual(shared.get_row(1).get_item(0), 5)
+        check_invariants(shared.get_matrix())
+
+    def test4_lock_excludes_writers(self):
+        lock = ReadWriteLock()
+        lock.acquire_read()
+        lock.acquire_read()
+        taken = []
+        writer = threading.Thread(
+            target=lambda: (lock.acquire_write(), taken.append(True),
+                            lock.release_write()))
+        writer.start()
+        writer.join(0.05)
+        self.assertEqual(taken, [], "Readers should keep the writer out.")
+        lock.release_read()
+        lock.release_read()
+        writer.join()
+        self.assertEqual(taken, [True])
+
+    def test5_snapshot_and_views(self):
+        shared = ConcurrentMatrix(Matrix(2, 2))
+        snapshot = shared.snapshot()
+        view = shared.row_view(0, writable=True)
+        view.set_item(1, 3)
+        self.assertEqual(shared.get_val(0, 1), 3)
+        self.assertEqual(snapshot.get_val(0, 1), 0)
+
+    def test6_every_method_declared(self):
+        for cls in [MatrixSnapshot, Matrix, OneDimensionalMatrix,
+                    DenseOneDimensionalMatrix, SquareMatrix, SymmetricMatrix,
+                    DiagonalMatrix, IdentityMatrix, CompressedMatrix]:
+            for name, attr in vars(cls).items():
+                # Constructors and coroutines are not called through the
+                # wrapper
+                if(not name.startswith('_') and inspect.isfunction(attr) and
+                   not inspect.iscoroutinefunction(attr)):
+                    self.assertIn(getattr(attr, '_access', None),
+                                  ('read', 'write', 'read_value',
+                                   'write_value'), cls.__name__ + '.' + name)
+        shared = ConcurrentMatrix(Matrix(2, 2))
+        with self.assertRaises(MatrixInvalidOperationError):
+            shared.multiply_async
+
+    def test7_rows_in_other_stripes_write_together(self):
+        shared = ConcurrentMatrix(Matrix.from_triplets(
+            2, 3, [0, 0, 1, 1], [0, 1, 0, 1], [1, 2, 3, 4]))
+        version = shared.get_version()
+        # Hold the stripe of row 0 as a writer to that row would
+        shared._row_locks[0].acquire_write()
+        other = threading.Thread(target=shared.set_val, args=(1, 1, 9))
+        same = threading.Thread(target=shared.remove_val, args=(0, 1))
+        other.start()
+        same.start()
+        other.join(5)
+        same.join(0.05)
+        self.assertFalse(other.is_alive())
+        self.assertTrue(same.is_alive(), "Row 0 should be kept out.")
+        shared._row_locks[0].release_write()
+        same.join()
+        self.assertEqual(as_lists(shared), [[1, 0, 0], [3, 9, 0]])
+        self.assertEqual(shared.nnz(), 3)
+        self.assertEqual(shared.get_version(), version + 2)
+        check_invariants(shared.get_matrix())
+
+    def test8_frame_changes_have_the_matrix_to_themselves(self):
+        shared = ConcurrentMatrix(Matrix(3, 3))
+        shared.set_val(0, 0, 1)
+        shared._lock.acquire_read()
+        # Overwriting a value shares the matrix lock, while a new row needs
+        # an index node in the frame and so the matrix to itself
+        in_place = threading.Thread(target=shared.set_val, args=(0, 0, 4))
+        new_row = threading.Thread(target=shared.set_val, args=(1, 2, 5))
+        in_place.start()
+        new_row.start()
+        in_place.join(5)
+        new_row.join(0.05)
+        self.assertFalse(in_place.is_alive())
+        self.assertTrue(new_row.is_alive())
+        shared._lock.release_read()
+        new_row.join()
+        self.assertEqual(as_lists(shared), [[4, 0, 0], [0, 0, 5], [0] * 3])
+        check_invariants(shared.get_matrix())
+
+
+class TestAsync(unittest.TestCase):
+    ''' Test the asyncio versions of the bulk operations. '''
+
+    def test1_multiply_with_progress(self):
+        a = banded(20, 10, 1)
+        b = banded(10, 5)
+        reports = []
+        result = asyncio.run(a.multiply_async(
+            b, lambda done, total: reports.append((done, total))))
+        self.assertEqual(as_lists(result), as_lists(a.multiply_matrix(b)))
+        self.assertEqual(reports[-1], (20, 20))
+
+    def test2_add_and_transpose(self):
+        a = banded(4, 6, 2)
+        b = banded(4, 6)
+
+        async def both():
+            return (await a.add_async(b), await a.transpose_async())
+        total, transposed = asyncio.run(both())
+        self.assertEqual(as_lists(total),
+                         dense_add(as_lists(a), as_lists(b)))
+        self.assertEqual(as_lists(transposed),
+                         [list(row) for row in zip(*as_lists(a))])
+
+    def test3_square_and_diagonal(self):
+        square = SquareMatrix.from_triplets(3, [0, 1], [2, 0], [4, 5])
+        diagonal = DiagonalMatrix(3, 2)
+        expected = [list(row) for row in zip(*as_lists(square))]
+        asyncio.run(square.transpose_async())
+        self.assertEqual(as_lists(square), expected)
+        result = asyncio.run(diagonal.multiply_async(square))
+        self.assertEqual(as_lists(result),
+                         dense_multiply(as_lists(diagonal), expected))
+
+    def test4_progress_counts_rows_done(self):
+        # Only rows 0, 45 and 89 of the sum hold values, so only they count
+        a = Matrix.from_triplets(90, 2, [0, 45, 89], [1, 0, 1], [1, 2, 3])
+        reports = []
+        result = asyncio.run(a.add_async(
+            Matrix(90, 2), lambda done, total: reports.append((done, total))))
+        self.assertEqual(as_lists(result), as_lists(a))
+        self.assertEqual(reports, [(1, 90), (2, 90), (3, 90), (90, 90)])
+
+    def test5_same_path_as_blocking(self):
+        class Tracked(Matrix):
+            ''' A matrix which notes when it works out a full product. '''
+            products = []
+
+            def _product_rows(self, mult_matrix):
+                Tracked.products.append(mult_matrix)
+                return Matrix._product_rows(self, mult_matrix)
+        a = Tracked.from_triplets(3, 3, [0, 1, 2], [2, 0, 1], [1, 2, 3])
+        diagonal = DiagonalMatrix(3, 2)
+        result = asyncio.run(a.multiply_async(diagonal))
+        self.assertEqual(as_lists(result), as_lists(
+            a.multiply_matrix(diagonal)))
+        # Both only scale the columns of a, as a diagonal matrix allows
+        self.assertEqual(Tracked.products, [])
+        asyncio.run(a.multiply_async(a))
+        self.assertEqual(Tracked.products, [a])
+        total = asyncio.run(diagonal.add_async(DiagonalMatrix(3, 1)))
+        self.assertIsInstance(total, DiagonalMatrix)
+        self.assertEqual(as_lists(total), [[3, 0, 0], [0, 3, 0], [0, 0, 3]])
+
+    def test6_cancel(self):
+        a = banded(3000, 40)
+        b = banded(40, 40)
+
+        async def cancelled():
+            task = asyncio.ensure_future(a.multiply_async(b))
+            await asyncio.sleep(0)
+            task.cancel()
+            await task
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(cancelled())
+
+
+if __name__ == '__main__':
+    unittest.main()
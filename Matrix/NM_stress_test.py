@@ -0,0 +1,169 @@
+'''Share one matrix between many threads and check that it holds together.
+
+Writer threads each set and remove random values in their own rows, and
+keep a record of what those rows should hold. Writers whose rows fall in
+different lock stripes write at the same time, while writes which change
+the frame of the matrix have it to themselves. Reader threads read values,
+rows and counts all the while, and a checker thread walks the structure
+of the matrix every so often with check_invariants from NM_unit_tests.
+Threads are switched far more often than usual so that their calls
+interleave. At the end, the matrix must hold exactly what the writers
+recorded.
+
+Each write must change exactly the value it is given, so a SymmetricMatrix,
+which mirrors every write, and the one dimensional matrices, including
+DiagonalMatrix and IdentityMatrix, can not be stressed this way.
+
+Usage: python NM_stress_test.py [threads] [seconds] [class name]
+'''
+import random
+import sys
+import threading
+import time
+import Node_Matrix
+from Node_Matrix_concurrent import ConcurrentMatrix
+from NM_unit_tests import check_invariants
+
+# Rows each writer thread owns, and columns in the matrix
+_ROWS_PER_WRITER = 8
+_COLS = 40
+
+
+def write(matrix, rows, model, seed, stop, errors):
+    '''(ConcurrentMatrix, list of int, dict, int, threading.Event, list)
+    -> NoneType
+    Set and remove random values in rows of matrix until stop is set,
+    recording the values the rows hold in model under their coordinates,
+    and adding any exception raised to errors.
+    '''
+    rand = random.Random(seed)
+    try:
+        while(not stop.is_set()):
+            i = rand.choice(rows)
+            j = rand.randrange(_COLS)
+            if(rand.random() < 0.3):
+                matrix.remove_val(i, j)
+                model.pop((i, j), None)
+            else:
+                value = rand.randint(1, 9)
+                matrix.set_val(i, j, value)
+                model[(i, j)] = value
+    except Exception as error:
+        errors.append(error)
+
+
+def read(matrix, seed, stop, errors):
+    '''(ConcurrentMatrix, int, threading.Event, list) -> NoneType
+    Read values, rows and counts from matrix until stop is set, adding any
+    exception raised to errors.
+    '''
+    rand = random.Random(seed)
+    num_rows = matrix.get_num_rows()
+    try:
+        while(not stop.is_set()):
+            i = rand.randrange(num_rows)
+            matrix.get_val(i, rand.randrange(_COLS))
+            matrix.get_row(i)
+            list(matrix.iter_row(i))
+            matrix.nnz()
+    except Exception as error:
+        errors.append(error)
+
+
+def check(matrix, stop, errors, counts):
+    '''(ConcurrentMatrix, threading.Event, list, list) -> NoneType
+    Check the invariants of matrix every few milliseconds until stop is
+    set, adding any exception raised to errors and counting the checks in
+    counts[0].
+    '''
+    try:
+        while(not stop.is_set()):
+            with matrix.read_locked():
+                check_invariants(matrix.get_matrix())
+            counts[0] += 1
+            time.sleep(0.005)
+    except Exception as error:
+        errors.append(error)
+
+
+def stress(threads, seconds, cls):
+    '''(int, float, type) -> list
+    Share a new matrix of class cls between threads writers, as many
+    readers and a checker for seconds, and return every problem found.
+    Raise an error if cls does not store each value written on its own.
+    REQ: cls is Node_Matrix.Matrix or one of its subclasses
+    '''
+    if(issubclass(cls, (Node_Matrix.SymmetricMatrix,
+                        Node_Matrix.OneDimensionalMatrix))):
+        raise Node_Matrix.MatrixInvalidOperationError(
+            "%s can not be stressed, since its writes do not each change "
+            "a single value." % cls.__name__)
+    num_rows = threads * _ROWS_PER_WRITER
+    if(issubclass(cls, Node_Matrix.SquareMatrix)):
+        matrix = ConcurrentMatrix(cls(max(num_rows, _COLS)))
+    else:
+        matrix = ConcurrentMatrix(cls(num_rows, _COLS))
+    stop = threading.Event()
+    errors = []
+    counts = [0]
+    models = [{} for k in range(threads)]
+    workers = []
+    for k in range(threads):
+        rows = list(range(k * _ROWS_PER_WRITER, (k + 1) * _ROWS_PER_WRITER))
+        workers.append(threading.Thread(target=write, args=(
+            matrix, rows, models[k], k, stop, errors)))
+        workers.append(threading.Thread(target=read, args=(
+            matrix, threads + k, stop, errors)))
+    workers.append(threading.Thread(target=check, args=(
+        matrix, stop, errors, counts)))
+    # Switch threads every few microseconds rather than every few
+    # milliseconds, so that calls are interrupted part way through
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for worker in workers:
+            worker.start()
+        time.sleep(seconds)
+        stop.set()
+        for worker in workers:
+            worker.join()
+    finally:
+        sys.setswitchinterval(interval)
+    try:
+        check_invariants(matrix.get_matrix())
+    except AssertionError as error:
+        errors.append(error)
+    # Every value the writers recorded, and nothing else, must be stored
+    expected = {}
+    for model in models:
+        expected.update(model)
+    stored = dict(((i, j), value)
+                  for i, j, value in matrix.iter_nonzero())
+    if(stored != expected):
+        errors.append(AssertionError("Matrix does not match the writers."))
+    print("Invariant checks passed:   %d" % counts[0])
+    print("Values stored:             %d" % len(stored))
+    return errors
+
+
+if __name__ == '__main__':
+    threads = 4
+    seconds = 2.0
+    cls = Node_Matrix.Matrix
+    if(len(sys.argv) > 1):
+        threads = int(sys.argv[1])
+    if(len(sys.argv) > 2):
+        seconds = float(sys.argv[2])
+    if(len(sys.argv) > 3):
+        cls = getattr(Node_Matrix, sys.argv[3])
+    try:
+        errors = stress(threads, seconds, cls)
+    except Node_Matrix.MatrixInvalidOperationError as error:
+        print(error)
+        sys.exit(2)
+    for error in errors:
+        print("Problem: %r" % error)
+    if(errors):
+        print("FAILED")
+        sys.exit(1)
+    print("OK")
@@ -0,0 +1,1182 @@
+import random
+import unittest
+from Node_Matrix import *
+
+
+def as_lists(matrix):
+    '''(Matrix) -> list of list of float
+    Return every value of matrix, row by row.
+    '''
+    return [[matrix.get_val(i, j) for j in range(matrix.get_num_cols())]
+            for i in range(matrix.get_num_rows())]
+
+
+def random_writes(matrix, count, seed):
+    '''(Matrix, int, int) -> list of list of float
+    Set count random values in matrix, and return the values it should
+    then hold, row by row.
+    '''
+    rand = random.Random(seed)
+    expected = as_lists(matrix)
+    for k in range(count):
+        i = rand.randrange(matrix.get_num_rows())
+        j = rand.randrange(matrix.get_num_cols())
+        value = rand.randint(-9, 9)
+        matrix.set_val(i, j, value)
+        expected[i][j] = value
+    return expected
+
+
+def stored(matrix):
+    '''(Matrix) -> int
+    Return the number of values matrix holds a node or an entry for.
+    '''
+    return sum(len(cols) for i, cols, vals in matrix._row_entries())
+
+
+def samples():
+    '''() -> list of Matrix
+    Return a new matrix of every class, each holding a few values.
+    '''
+    matrix = Matrix(3, 4, 1)
+    matrix.set_val(0, 1, 5)
+    matrix.set_val(1, 0, 0)
+    matrix.set_val(2, 3, -2)
+    square = SquareMatrix(3)
+    square.set_val(0, 2, 4)
+    square.set_val(2, 0, 7.5)
+    symmetric = SymmetricMatrix(3)
+    symmetric.set_val(0, 1, 5)
+    symmetric.set_val(2, 2, 3)
+    diagonal = DiagonalMatrix(3, 2)
+    diagonal.set_val(1, 1, 6)
+    identity = IdentityMatrix(3)
+    row = OneDimensionalMatrix(1, 4)
+    row.set_item(2, 8)
+    col = DenseOneDimensionalMatrix(4, 1)
+    col.set_item(0, 3)
+    compressed = CompressedMatrix(3, 4)
+    compressed.set_val(1, 2, 9)
+    compressed.set_val(0, 0, 1)
+    return [matrix, square, symmetric, diagonal, identity, row, col,
+            compressed]
+
+
+def check_invariants(matrix):
+    '''(Matrix) -> NoneType
+    Walk the storage of matrix and raise an AssertionError if it is
+    broken, as for each kind of storage below.
+    '''
+    if(isinstance(matrix, CompressedMatrix)):
+        check_compressed(matrix)
+    elif(isinstance(matrix, DiagonalMatrix)):
+        check_diagonal(matrix)
+    elif(isinstance(matrix, DenseOneDimensionalMatrix)):
+        check_dense(matrix)
+    else:
+        check_linked(matrix)
+        if(isinstance(matrix, SymmetricMatrix)):
+            check_symmetric(matrix)
+
+
+def require(condition, message):
+    '''(bool, str) -> NoneType
+    Raise an AssertionError with message if condition is False, even when
+    assert statements are turned off.
+    '''
+    if(not condition):
+        raise AssertionError(message)
+
+
+def frame_nodes(matrix, is_row):
+    '''(Matrix, bool) -> list of MatrixNode
+    Return the row index nodes of matrix in the order they are linked
+    below the head if is_row is True, or the column index nodes linked
+    right of it otherwise.
+    '''
+    nodes = []
+    if(is_row):
+        curr = matrix._head.get_down()
+    else:
+        curr = matrix._head.get_right()
+    while(curr is not None):
+        nodes.append(curr)
+        if(is_row):
+            curr = curr.get_down()
+        else:
+            curr = curr.get_right()
+    return nodes
+
+
+def check_linked(matrix):
+    '''(Matrix) -> NoneType
+    Raise an AssertionError if the nodes of matrix are broken: index nodes
+    out of order or out of step with the indexes kept of them, value nodes
+    out of order, in the wrong row or column, not linked into both chains
+    or not counted, or seek overlays which do not match their chains.
+    '''
+    # The frame: row index nodes down from the head and column index
+    # nodes right of it, each in order and each indexed
+    rows = [node.get_contents() for node in frame_nodes(matrix, True)]
+    cols = [node.get_contents() for node in frame_nodes(matrix, False)]
+    require(rows == matrix._existing_rows and
+            cols == matrix._existing_cols, "Frame out of step.")
+    require(rows == sorted(set(rows)) and cols == sorted(set(cols)),
+            "Index nodes out of order.")
+    require(all(matrix._row_index.get(i) is node for i, node in
+                zip(rows, frame_nodes(matrix, True))) and
+            len(matrix._row_index) == len(rows), "Row index out of step.")
+    require(all(matrix._col_index.get(j) is node for j, node in
+                zip(cols, frame_nodes(matrix, False))) and
+            len(matrix._col_index) == len(cols),
+            "Column index out of step.")
+    require(not rows or (rows[0] >= 0 and rows[-1] <= matrix._rows),
+            "Row out of range.")
+    require(not cols or (cols[0] >= 0 and cols[-1] <= matrix._cols),
+            "Column out of range.")
+    # Every value node, once through its row and once through its column,
+    # in order and in the chains it says it belongs to
+    by_row = set()
+    for i in rows:
+        positions = []
+        for j, node in matrix._line_nodes(i, True):
+            require(node.get_row() == i and node.get_col() == j and
+                    j in matrix._col_index, "Node in the wrong row.")
+            positions.append(j)
+            by_row.add(id(node))
+        require(positions == sorted(set(positions)), "Row out of order.")
+    by_col = set()
+    for j in cols:
+        positions = []
+        for i, node in matrix._line_nodes(j, False):
+            require(node.get_col() == j, "Node in the wrong column.")
+            positions.append(i)
+            by_col.add(id(node))
+        require(positions == sorted(set(positions)), "Column out of order.")
+    require(by_row == by_col, "Rows and columns hold different nodes.")
+    require(len(by_row) == matrix._nnz, "Node count is off.")
+    # Any seek overlay must list its chain exactly
+    for table, is_row in ((matrix._row_seek, True),
+                          (matrix._col_seek, False)):
+        for index, overlay in table.items():
+            require(overlay.items() == matrix._line_nodes(index, is_row),
+                    "Seek overlay out of step.")
+
+
+def check_symmetric(matrix):
+    '''(SymmetricMatrix) -> NoneType
+    Raise an AssertionError if any node of matrix is below the diagonal or
+    the diagonal nodes are miscounted.
+    '''
+    diagonal = 0
+    for i in matrix._existing_rows:
+        for j, node in matrix._line_nodes(i, True):
+            require(i <= j, "Node below the diagonal.")
+            if(i == j):
+                diagonal += 1
+    require(diagonal == matrix._diag_nnz, "Diagonal count is off.")
+
+
+def check_dense(matrix):
+    '''(DenseOneDimensionalMatrix) -> NoneType
+    Raise an AssertionError if any node is linked into matrix, it does not
+    hold one item per index, or its items which differ from the default
+    are miscounted.
+    '''
+    default = matrix._default
+    require(matrix._head.get_down() is None and
+            matrix._head.get_right() is None, "Nodes in a dense matrix.")
+    require(len(matrix._items) == matrix.get_size(),
+            "Wrong number of items.")
+    require(matrix._nnz == sum(1 for value in matrix._items
+                               if value != default), "Item count is off.")
+
+
+def check_diagonal(matrix):
+    '''(DiagonalMatrix) -> NoneType
+    Raise an AssertionError if any node is linked into matrix, or its
+    diagonal does not have one value per index.
+    '''
+    require(matrix._head.get_down() is None and
+            matrix._head.get_right() is None, "Nodes in a DiagonalMatrix.")
+    require(matrix._diagonal is None or
+            len(matrix._diagonal) == matrix._rows + 1,
+            "Diagonal is the wrong size.")
+
+
+def check_compressed(matrix):
+    '''(CompressedMatrix) -> NoneType
+    Raise an AssertionError if the arrays of matrix are out of step: row
+    offsets which go backwards or do not cover every value, columns out of
+    range or out of order within a row, or changes which do not add or
+    remove an entry.
+    '''
+    indptr = matrix._indptr
+    indices = matrix._indices
+    require(len(indptr) == matrix._rows + 2 and indptr[0] == 0 and
+            indptr[-1] == len(indices) == len(matrix._data),
+            "Row offsets do not cover the values.")
+    for i in range(0, matrix._rows + 1):
+        cols = indices[indptr[i]:indptr[i + 1]].tolist()
+        require(indptr[i] <= indptr[i + 1] and
+                cols == sorted(set(cols)), "Row out of order.")
+        require(not cols or (cols[0] >= 0 and cols[-1] <= matrix._cols),
+                "Column out of range.")
+    added = 0
+    for (i, j), value in matrix._updates.items():
+        require(0 <= i <= matrix._rows and 0 <= j <= matrix._cols,
+                "Change out of range.")
+        require((value is None) == (matrix._find(i, j) is not None),
+                "Change does not add or remove an entry.")
+        added += (value is not None) - (value is None)
+    require(matrix._nnz == len(matrix._data) + added,
+            "Entry count is off.")
+
+
+def dense_add(a, b):
+    '''(list of list of float, list of list of float) ->
+    list of list of float
+    Return the sum of a and b, added index by index.
+    '''
+    return [[a[i][j] + b[i][j] for j in range(len(a[0]))]
+            for i in range(len(a))]
+
+
+def dense_multiply(a, b):
+    '''(list of list of float, list of list of float) ->
+    list of list of float
+    Return the product of a and b, worked out index by index.
+    '''
+    return [[sum(a[i][k] * b[k][j] for k in range(len(b)))
+             for j in range(len(b[0]))] for i in range(len(a))]
+
+
+class TestMatrixNode(unittest.TestCase):
+    ''' Test the compact node every value is stored in. '''
+
+    def test1_no_instance_dict(self):
+        node = MatrixNode(5, 1, 2)
+        self.assertFalse(hasattr(node, '__dict__'))
+        with self.assertRaises(AttributeError):
+            node.extra = 1
+
+    def test2_links_and_contents(self):
+        below = MatrixNode(2, 2, 2)
+        node = MatrixNode(5, 1, 2, down=below)
+        node.set_contents(7)
+        self.assertEqual((node.get_row(), node.get_col()), (1, 2))
+        self.assertEqual(node.get_contents(), 7)
+        self.assertIs(node.get_down(), below)
+        self.assertIsNone(node.get_right())
+
+
+class TestIndexedAccess(unittest.TestCase):
+    ''' Test reading and writing values through the row and column index. '''
+
+    def test1_random_writes(self):
+        matrix = Matrix(7, 5, 2)
+        expected = random_writes(matrix, 60, 1)
+        self.assertEqual(as_lists(matrix), expected)
+
+    def test2_overwrite_value(self):
+        matrix = Matrix(3, 3)
+        matrix.set_val(1, 2, 4)
+        matrix.set_val(1, 2, 6)
+        self.assertEqual(matrix.get_val(1, 2), 6)
+        self.assertEqual(matrix.get_row(1).get_item(2), 6)
+        self.assertEqual(matrix.get_col(2).get_item(1), 6)
+
+    def test3_unset_values_are_default(self):
+        matrix = Matrix(4, 4, 3)
+        matrix.set_val(3, 0, 1)
+        self.assertEqual(matrix.get_val(0, 0), 3)
+        self.assertEqual(matrix.get_val(3, 3), 3)
+
+    def test4_out_of_range(self):
+        matrix = Matrix(2, 3)
+        for i, j in [(2, 0), (0, 3), (-1, 0), (0, -1)]:
+            with self.assertRaises(MatrixIndexError):
+                matrix.get_val(i, j)
+            with self.assertRaises(MatrixIndexError):
+                matrix.set_val(i, j, 1)
+
+
+class TestSeekIndex(unittest.TestCase):
+    ''' Test that the seek overlay gives the same matrix. '''
+
+    def test1_same_values(self):
+        plain = Matrix(6, 40)
+        seeking = Matrix(6, 40)
+        seeking.set_seek_index(True)
+        self.assertEqual(random_writes(seeking, 200, 2),
+                         random_writes(plain, 200, 2))
+        self.assertEqual(as_lists(seeking), as_lists(plain))
+
+    def test2_turned_off_part_way(self):
+        matrix = Matrix(5, 30)
+        matrix.set_seek_index(True)
+        random_writes(matrix, 50, 3)
+        matrix.set_seek_index(False)
+        expected = random_writes(matrix, 50, 4)
+        matrix.set_seek_index(True)
+        self.assertEqual(as_lists(matrix), expected)
+
+    def test3_reads_leave_overlays_alone(self):
+        matrix = Matrix.from_triplets(3, 3, [0, 1], [1, 2], [4, 5])
+        matrix.set_seek_index(True)
+        matrix._row_seek.clear()
+        matrix._col_seek.clear()
+        self.assertEqual(as_lists(matrix), [[0, 4, 0], [0, 0, 5], [0] * 3])
+        self.assertEqual((matrix._row_seek, matrix._col_seek), ({}, {}))
+        matrix.set_val(1, 0, 6)
+        self.assertEqual(sorted(matrix._row_seek), [1])
+
+    def test4_blocks_split_and_empty(self):
+        block_size = SeekList.BLOCK_SIZE
+        SeekList.BLOCK_SIZE = 2
+        try:
+            matrix = Matrix(2, 30)
+            matrix.set_seek_index(True)
+            expected = random_writes(matrix, 60, 5)
+            self.assertEqual(as_lists(matrix), expected)
+            for j in range(30):
+                matrix.remove_val(0, j)
+                expected[0][j] = 0
+            self.assertEqual(as_lists(matrix), expected)
+        finally:
+            SeekList.BLOCK_SIZE = block_size
+
+
+class TestAddMatrix(unittest.TestCase):
+    ''' Test adding matrices by merging their rows. '''
+
+    def check_sum(self, a, b):
+        expected = dense_add(as_lists(a), as_lists(b))
+        self.assertEqual(as_lists(a.add_matrix(b)), expected)
+
+    def test1_random_matrices(self):
+        for seed in range(5):
+            a = Matrix(6, 5, seed % 2)
+            b = Matrix(6, 5, -1)
+            random_writes(a, 10, seed)
+            random_writes(b, 10, seed + 10)
+            self.check_sum(a, b)
+
+    def test2_values_cancelling_out(self):
+        a = Matrix(2, 2, 1)
+        b = Matrix(2, 2, 1)
+        a.set_val(0, 1, 3)
+        b.set_val(0, 1, -1)
+        b.set_val(1, 0, 5)
+        self.check_sum(a, b)
+
+    def test3_square_classes(self):
+        a = SymmetricMatrix(3)
+        a.set_val(0, 2, 4)
+        b = SquareMatrix(3, 2)
+        b.set_val(1, 1, 5)
+        self.check_sum(a, b)
+        self.check_sum(b, a)
+        self.check_sum(IdentityMatrix(3), b)
+
+    def test4_different_dimensions(self):
+        with self.assertRaises(MatrixDimensionError):
+            Matrix(2, 3).add_matrix(Matrix(3, 2))
+
+
+class TestMultiplyMatrix(unittest.TestCase):
+    ''' Test the sparse product, including nonzero defaults. '''
+
+    def check_product(self, a, b):
+        expected = dense_multiply(as_lists(a), as_lists(b))
+        self.assertEqual(as_lists(a.multiply_matrix(b)), expected)
+
+    def test1_zero_defaults(self):
+        a = Matrix(4, 3)
+        b = Matrix(3, 5)
+        random_writes(a, 6, 5)
+        random_writes(b, 6, 6)
+        self.check_product(a, b)
+
+    def test2_nonzero_defaults(self):
+        for seed in range(4):
+            a = Matrix(3, 4, 1)
+            b = Matrix(4, 2, seed - 2)
+            random_writes(a, 5, seed)
+            random_writes(b, 3, seed + 7)
+            c = Matrix(2, 3, 2)
+            random_writes(c, 2, seed + 3)
+            self.check_product(a, b)
+            self.check_product(c, a)
+
+    def test3_square_classes(self):
+        a = SymmetricMatrix(3)
+        a.set_val(0, 1, 2)
+        b = SquareMatrix(3, 1)
+        b.set_val(2, 0, 4)
+        self.check_product(a, b)
+        self.check_product(b, IdentityMatrix(3))
+
+    def test4_bad_dimensions(self):
+        with self.assertRaises(MatrixDimensionError):
+            Matrix(2, 3).multiply_matrix(Matrix(2, 3))
+
+
+class TestCompressedMatrix(unittest.TestCase):
+    ''' Test the array backed storage engine. '''
+
+    def setUp(self):
+        self.matrix = CompressedMatrix(5, 6, 1)
+        self.expected = random_writes(self.matrix, 25, 8)
+
+    def test1_values_rows_and_columns(self):
+        self.assertEqual(as_lists(self.matrix), self.expected)
+        row = self.matrix.get_row(2)
+        col = self.matrix.get_col(4)
+        self.assertEqual([row.get_item(j) for j in range(6)],
+                         self.expected[2])
+        self.assertEqual([col.get_item(i) for i in range(5)],
+                         [self.expected[i][4] for i in range(5)])
+
+    def test2_writes_after_reads(self):
+        as_lists(self.matrix)
+        self.expected = random_writes(self.matrix, 10, 9)
+        self.assertEqual(as_lists(self.matrix), self.expected)
+
+    def test3_scalar_operations(self):
+        self.matrix.multiply_scalar(2)
+        self.matrix.add_scalar(1)
+        self.assertEqual(as_lists(self.matrix),
+                         [[value * 2 + 1 for value in row]
+                          for row in self.expected])
+
+    def test4_with_linked_matrices(self):
+        other = Matrix(5, 6, 2)
+        random_writes(other, 8, 10)
+        self.assertEqual(as_lists(self.matrix.add_matrix(other)),
+                         dense_add(self.expected, as_lists(other)))
+        column = Matrix(6, 2)
+        random_writes(column, 5, 11)
+        self.assertEqual(as_lists(self.matrix.multiply_matrix(column)),
+                         dense_multiply(self.expected, as_lists(column)))
+
+    def test5_no_linked_nodes(self):
+        self.assertFalse(hasattr(self.matrix, '_head'))
+        self.assertFalse(hasattr(self.matrix, '_row_index'))
+
+    def test6_reads_do_not_merge(self):
+        matrix = CompressedMatrix.from_triplets(3, 3, [0, 2], [1, 2], [4, 5])
+        matrix.set_val(1, 0, 6)
+        matrix.remove_val(2, 2)
+        matrix.remove_val(1, 1)
+        indptr = matrix._indptr
+        self.assertEqual(matrix.get_val(1, 0), 6)
+        self.assertEqual(matrix.get_val(2, 2), 0)
+        self.assertEqual(matrix.nnz(), 2)
+        self.assertIs(matrix._indptr, indptr)
+        self.assertEqual(as_lists(matrix), [[0, 4, 0], [6, 0, 0], [0] * 3])
+        self.assertEqual(matrix.nnz(), len(matrix._data))
+
+    def test7_remove_then_set(self):
+        matrix = CompressedMatrix.from_triplets(2, 2, [0], [0], [3])
+        matrix.remove_val(0, 0)
+        matrix.set_val(0, 0, 7)
+        matrix.set_val(1, 1, 2)
+        matrix.remove_val(1, 1)
+        self.assertEqual(matrix.nnz(), 1)
+        self.assertEqual(as_lists(matrix), [[7, 0], [0, 0]])
+
+    def test8_swap_cols_keeps_snapshot(self):
+        matrix = CompressedMatrix.from_triplets(3, 3, [0, 1, 2], [0, 2, 1],
+                                                [1, 2, 3])
+        snapshot = matrix.snapshot()
+        matrix.swap_cols(0, 2)
+        self.assertFalse(snapshot.is_detached(),
+                         "Only the rows holding the columns are copied.")
+        self.assertEqual(as_lists(snapshot), [[1, 0, 0], [0, 0, 2],
+                                              [0, 3, 0]])
+        self.assertEqual(as_lists(matrix), [[0, 0, 1], [2, 0, 0],
+                                            [0, 3, 0]])
+
+
+class TestTriplets(unittest.TestCase):
+    ''' Test building matrices from coordinate triplets in one pass. '''
+
+    def test1_from_lists(self):
+        matrix = Matrix.from_triplets(3, 4, [2, 0, 0], [1, 3, 0], [5, 6, 7],
+                                      default=1)
+        self.assertEqual(as_lists(matrix),
+                         [[7, 1, 1, 6], [1, 1, 1, 1], [1, 5, 1, 1]])
+
+    def test2_from_triples(self):
+        matrix = SquareMatrix.from_triplets(2, [(1, 1, 3), (0, 1, 2)])
+        self.assertIsInstance(matrix, SquareMatrix)
+        self.assertEqual(as_lists(matrix), [[0, 2], [0, 3]])
+
+    def test3_duplicates(self):
+        rows, cols, values = [0, 1, 0], [0, 1, 0], [1, 2, 3]
+        self.assertEqual(Matrix.from_triplets(2, 2, rows, cols, values)
+                         .get_val(0, 0), 4)
+        self.assertEqual(Matrix.from_triplets(2, 2, rows, cols, values,
+                                              duplicates='last')
+                         .get_val(0, 0), 3)
+        with self.assertRaises(MatrixInvalidOperationError):
+            Matrix.from_triplets(2, 2, rows, cols, values,
+                                 duplicates='error')
+
+    def test4_load_replaces_values(self):
+        matrix = Matrix(3, 3)
+        matrix.set_val(0, 0, 9)
+        matrix.load_triplets([1], [2], [4])
+        self.assertEqual(as_lists(matrix), [[0, 0, 0], [0, 0, 4], [0, 0, 0]])
+        matrix.set_val(2, 0, 1)
+        self.assertEqual(matrix.get_val(2, 0), 1)
+
+    def test5_bad_triplets(self):
+        with self.assertRaises(MatrixIndexError):
+            Matrix.from_triplets(2, 2, [2], [0], [1])
+        with self.assertRaises(MatrixDimensionError):
+            Matrix.from_triplets(2, 2, [0, 1], [0], [1])
+
+    def test6_identity_from_triplets(self):
+        with self.assertRaises(MatrixInvalidOperationError):
+            IdentityMatrix.from_triplets(3, [0], [0], [1])
+
+
+class TestScalarOperations(unittest.TestCase):
+    ''' Test scalar operations left pending until the nodes are read. '''
+
+    def setUp(self):
+        self.matrix = Matrix.from_triplets(2, 3, [0, 1], [1, 2], [4, 6])
+
+    def test1_pending_values_read(self):
+        self.matrix.multiply_scalar(2)
+        self.matrix.add_scalar(1)
+        self.matrix.subtract_scalar(3)
+        self.assertEqual(as_lists(self.matrix), [[-2, 6, -2], [-2, -2, 10]])
+
+    def test2_set_while_pending(self):
+        self.matrix.add_scalar(5)
+        self.matrix.set_val(0, 0, 1)
+        self.matrix.multiply_scalar(2)
+        self.assertEqual(as_lists(self.matrix), [[2, 18, 10], [10, 10, 22]])
+
+    def test3_flush_keeps_values(self):
+        self.matrix.add_scalar(1)
+        self.matrix.multiply_scalar(3)
+        expected = as_lists(self.matrix)
+        self.matrix.flush()
+        self.assertEqual(as_lists(self.matrix), expected)
+
+    def test4_products_see_pending_values(self):
+        self.matrix.add_scalar(1)
+        expected = as_lists(self.matrix)
+        other = Matrix(3, 2, 2)
+        self.assertEqual(as_lists(self.matrix.multiply_matrix(other)),
+                         dense_multiply(expected, as_lists(other)))
+        self.assertEqual(as_lists(self.matrix.add_matrix(self.matrix)),
+                         dense_add(expected, expected))
+
+    def test5_bad_scalar(self):
+        with self.assertRaises(MatrixInvalidOperationError):
+            self.matrix.add_scalar('a')
+
+    def test6_set_keeps_operations_pending(self):
+        self.matrix.multiply_scalar(2)
+        self.matrix.add_scalar(1)
+        self.matrix.set_val(1, 0, 7)
+        self.matrix.set_val(0, 1, 0.25)
+        self.assertEqual(self.matrix._pending, (2, 1))
+        self.assertEqual(as_lists(self.matrix), [[1, 0.25, 1], [7, 1, 13]])
+        self.assertIs(type(self.matrix.get_val(1, 0)), int)
+
+    def test7_set_after_multiplying_by_zero(self):
+        self.matrix.multiply_scalar(0)
+        self.matrix.set_val(0, 0, 3)
+        self.assertEqual(as_lists(self.matrix), [[3, 0, 0], [0, 0, 0]])
+        self.matrix.set_val(1, 1, 4)
+        self.matrix.add_scalar(1)
+        self.assertEqual(as_lists(self.matrix), [[4, 1, 1], [1, 5, 1]])
+
+
+class TestTranspose(unittest.TestCase):
+    ''' Test transposing square matrices in place. '''
+
+    def test1_square_in_place(self):
+        matrix = SquareMatrix(5, 1)
+        expected = random_writes(matrix, 12, 12)
+        matrix.transpose()
+        self.assertEqual(as_lists(matrix),
+                         [list(row) for row in zip(*expected)])
+        matrix.transpose()
+        self.assertEqual(as_lists(matrix), expected)
+
+    def test2_writes_after_transpose(self):
+        matrix = SquareMatrix(4)
+        random_writes(matrix, 6, 13)
+        matrix.transpose()
+        expected = random_writes(matrix, 6, 14)
+        self.assertEqual(as_lists(matrix), expected)
+
+    def test3_pending_scalars(self):
+        matrix = SquareMatrix.from_triplets(3, [0, 1], [2, 0], [4, 5])
+        matrix.add_scalar(1)
+        expected = [list(row) for row in zip(*as_lists(matrix))]
+        matrix.transpose()
+        self.assertEqual(as_lists(matrix), expected)
+
+
+class TestSwaps(unittest.TestCase):
+    ''' Test swapping rows and columns by relinking nodes. '''
+
+    def setUp(self):
+        self.matrix = Matrix(5, 6, 1)
+        self.expected = random_writes(self.matrix, 14, 15)
+
+    def test1_swap_rows(self):
+        self.matrix.swap_rows(0, 3)
+        self.matrix.swap_rows(4, 1)
+        self.expected[0], self.expected[3] = self.expected[3], self.expected[0]
+        self.expected[4], self.expected[1] = self.expected[1], self.expected[4]
+        self.assertEqual(as_lists(self.matrix), self.expected)
+
+    def test2_swap_cols(self):
+        self.matrix.swap_cols(5, 2)
+        for row in self.expected:
+            row[5], row[2] = row[2], row[5]
+        self.assertEqual(as_lists(self.matrix), self.expected)
+
+    def test3_swap_with_empty_line(self):
+        matrix = Matrix(3, 3)
+        matrix.set_val(0, 0, 2)
+        matrix.swap_rows(0, 2)
+        matrix.swap_cols(0, 1)
+        self.assertEqual(as_lists(matrix), [[0, 0, 0], [0, 0, 0], [0, 2, 0]])
+        matrix.set_val(0, 0, 3)
+        self.assertEqual(matrix.get_val(0, 0), 3)
+
+    def test4_writes_after_swaps(self):
+        self.matrix.set_seek_index(True)
+        self.matrix.swap_rows(1, 2)
+        self.matrix.swap_cols(0, 4)
+        expected = random_writes(self.matrix, 10, 16)
+        self.assertEqual(as_lists(self.matrix), expected)
+
+    def test5_missing_lines(self):
+        with self.assertRaises(MatrixIndexError):
+            self.matrix.swap_rows(0, 5)
+        with self.assertRaises(MatrixIndexError):
+            self.matrix.swap_cols(6, 0)
+
+
+class TestRemoveAndPrune(unittest.TestCase):
+    ''' Test dropping values which hold the default. '''
+
+    def test1_remove_val(self):
+        matrix = Matrix(4, 4, 2)
+        expected = random_writes(matrix, 10, 17)
+        for i in range(4):
+            matrix.remove_val(i, 1)
+            expected[i][1] = 2
+        self.assertEqual(as_lists(matrix), expected)
+        matrix.remove_val(3, 3)
+        expected[3][3] = 2
+        self.assertEqual(as_lists(matrix), expected)
+        self.assertEqual(random_writes(matrix, 5, 18), as_lists(matrix))
+
+    def test2_remove_everything(self):
+        matrix = Matrix.from_triplets(2, 2, [0, 1], [1, 0], [3, 4])
+        matrix.remove_val(0, 1)
+        matrix.remove_val(1, 0)
+        matrix.remove_val(1, 1)
+        self.assertEqual(stored(matrix), 0)
+        self.assertEqual(as_lists(matrix), [[0, 0], [0, 0]])
+
+    def test3_prune_default(self):
+        matrix = Matrix(2, 2, 3)
+        matrix.set_prune_default(True)
+        matrix.set_val(0, 1, 4)
+        matrix.set_val(0, 1, 3)
+        self.assertEqual(stored(matrix), 0)
+        matrix.set_prune_default(False)
+        matrix.set_val(1, 1, 3)
+        self.assertEqual(stored(matrix), 1)
+
+    def test4_compact_after_scalar(self):
+        matrix = Matrix.from_triplets(2, 2, [0, 1, 1], [0, 1, 0], [0, 5, 0])
+        matrix.multiply_scalar(0)
+        matrix.compact()
+        self.assertEqual(stored(matrix), 0)
+        self.assertEqual(as_lists(matrix), [[0, 0], [0, 0]])
+
+    def test5_compressed(self):
+        matrix = CompressedMatrix.from_triplets(2, 2, [0, 1], [1, 0], [2, 3])
+        matrix.remove_val(0, 1)
+        matrix.set_val(1, 1, 0)
+        matrix.compact()
+        self.assertEqual(stored(matrix), 1)
+        self.assertEqual(as_lists(matrix), [[0, 0], [3, 0]])
+
+    def test6_remove_out_of_range(self):
+        with self.assertRaises(MatrixIndexError):
+            Matrix(2, 2).remove_val(2, 0)
+
+
+class TestDiagonalStorage(unittest.TestCase):
+    ''' Test diagonal and identity matrices stored without nodes. '''
+
+    def test1_diagonal_values(self):
+        matrix = DiagonalMatrix(3, 2)
+        matrix.set_val(1, 1, 6)
+        self.assertEqual(as_lists(matrix), [[2, 0, 0], [0, 6, 0], [0, 0, 2]])
+        self.assertEqual(stored(matrix), 3)
+        diagonal = matrix.get_diagonal()
+        self.assertEqual([diagonal.get_item(k) for k in range(3)], [2, 6, 2])
+
+    def test2_off_diagonal_write(self):
+        with self.assertRaises(MatrixInvalidOperationError):
+            DiagonalMatrix(3).set_val(0, 1, 1)
+
+    def test3_identity_refuses_writes(self):
+        matrix = IdentityMatrix(3)
+        with self.assertRaises(MatrixInvalidOperationError):
+            matrix.set_val(0, 0, 2)
+        self.assertEqual(as_lists(matrix), [[1, 0, 0], [0, 1, 0], [0, 0, 1]])
+
+    def test4_scalar_operations(self):
+        matrix = IdentityMatrix(2)
+        matrix.multiply_scalar(3)
+        matrix.add_scalar(1)
+        self.assertEqual(as_lists(matrix), [[4, 1], [1, 4]])
+
+    def test5_products_and_sums(self):
+        diagonal = DiagonalMatrix(3, 2)
+        diagonal.set_val(2, 2, 5)
+        other = SquareMatrix(3, 1)
+        random_writes(other, 5, 19)
+        for a, b in [(diagonal, other), (other, diagonal),
+                     (diagonal, diagonal), (IdentityMatrix(3), diagonal)]:
+            self.assertEqual(as_lists(a.multiply_matrix(b)),
+                             dense_multiply(as_lists(a), as_lists(b)))
+            self.assertEqual(as_lists(a.add_matrix(b)),
+                             dense_add(as_lists(a), as_lists(b)))
+
+    def test6_transpose(self):
+        matrix = DiagonalMatrix(3)
+        matrix.set_val(0, 0, 4)
+        matrix.transpose()
+        self.assertEqual(as_lists(matrix), [[4, 0, 0], [0, 0, 0], [0, 0, 0]])
+
+
+class TestSymmetricStorage(unittest.TestCase):
+    ''' Test symmetric matrices storing only their upper triangle. '''
+
+    def setUp(self):
+        self.matrix = SymmetricMatrix(4, 1)
+        self.matrix.set_val(0, 2, 5)
+        self.matrix.set_val(3, 1, 7)
+        self.matrix.set_val(2, 2, 3)
+
+    def test1_mirrored_values(self):
+        values = as_lists(self.matrix)
+        self.assertEqual(values, [list(row) for row in zip(*values)])
+        self.assertEqual(values[2][0], 5)
+        self.assertEqual(values[1][3], 7)
+        self.assertEqual(stored(self.matrix), 5)
+
+    def test2_rows_and_columns(self):
+        row = self.matrix.get_row(1)
+        col = self.matrix.get_col(1)
+        self.assertEqual([row.get_item(j) for j in range(4)], [1, 1, 1, 7])
+        self.assertEqual([col.get_item(i) for i in range(4)], [1, 1, 1, 7])
+
+    def test3_remove_both_halves(self):
+        self.matrix.remove_val(2, 0)
+        self.assertEqual(self.matrix.get_val(0, 2), 1)
+        self.assertEqual(self.matrix.get_val(2, 0), 1)
+
+    def test4_products_and_transpose(self):
+        other = SquareMatrix(4)
+        random_writes(other, 6, 20)
+        values = as_lists(self.matrix)
+        self.assertEqual(as_lists(self.matrix.multiply_matrix(other)),
+                         dense_multiply(values, as_lists(other)))
+        self.assertEqual(as_lists(other.multiply_matrix(self.matrix)),
+                         dense_multiply(as_lists(other), values))
+        self.assertEqual(as_lists(self.matrix.add_matrix(other)),
+                         dense_add(values, as_lists(other)))
+        self.matrix.transpose()
+        self.assertEqual(as_lists(self.matrix), values)
+
+
+class TestMatrixVector(unittest.TestCase):
+    ''' Test sparse matrix-vector products. '''
+
+    def setUp(self):
+        self.matrix = Matrix.from_triplets(2, 3, [0, 1], [2, 0], [4, 5],
+                                           default=1)
+
+    def test1_list_vectors(self):
+        self.assertEqual(self.matrix.matvec([1, 2, 3]), [15, 10])
+        self.assertEqual(self.matrix.rmatvec([1, 2]), [11, 3, 6])
+
+    def test2_one_dimensional_vector(self):
+        vector = OneDimensionalMatrix(3, 1, 1)
+        vector.set_item(0, 2)
+        result = self.matrix.matvec(vector)
+        self.assertTrue(isinstance(result, OneDimensionalMatrix))
+        self.assertEqual([result.get_item(i) for i in range(2)], [7, 12])
+
+    def test3_numpy_vector(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("NumPy is not installed")
+        result = self.matrix.matvec(numpy.array([1, 2, 3]))
+        self.assertTrue(isinstance(result, numpy.ndarray))
+        self.assertEqual(result.tolist(), [15, 10])
+
+    def test4_special_matrices(self):
+        vector = [1, 2, 3, 4]
+        symmetric = SymmetricMatrix(4, 1)
+        symmetric.set_val(0, 2, 5)
+        symmetric.set_val(3, 1, 7)
+        diagonal = DiagonalMatrix(4)
+        for i in range(4):
+            diagonal.set_val(i, i, i + 2)
+        for matrix in (symmetric, diagonal):
+            expected = [sum(a * b for a, b in zip(row, vector))
+                        for row in as_lists(matrix)]
+            self.assertEqual(matrix.matvec(vector), expected)
+            self.assertEqual(matrix.rmatvec(vector), expected)
+
+    def test5_size_mismatch(self):
+        self.assertRaises(MatrixDimensionError, self.matrix.matvec, [1, 2])
+
+
+class TestDenseVector(unittest.TestCase):
+    ''' Test the list-backed dense OneDimensionalMatrix. '''
+
+    def test1_items(self):
+        vector = DenseOneDimensionalMatrix(1, 5, 2)
+        vector.set_item(3, 7)
+        vector.set_val(0, 1, 4)
+        self.assertEqual([vector.get_item(i) for i in range(5)],
+                         [2, 4, 2, 7, 2])
+        self.assertEqual(vector.get_val(0, 3), 7)
+        self.assertRaises(MatrixIndexError, vector.get_item, 5)
+
+    def test2_rows_become_dense(self):
+        matrix = Matrix(3, 4)
+        for j in range(3):
+            matrix.set_val(1, j, j + 1)
+        matrix.set_val(2, 0, 9)
+        row = matrix.get_row(1)
+        self.assertTrue(isinstance(row, DenseOneDimensionalMatrix))
+        self.assertEqual([row.get_item(j) for j in range(4)], [1, 2, 3, 0])
+        sparse = matrix.get_row(2)
+        self.assertFalse(isinstance(sparse, DenseOneDimensionalMatrix))
+        self.assertEqual([sparse.get_item(j) for j in range(4)],
+                         [9, 0, 0, 0])
+
+    def test3_matvec_result(self):
+        matrix = Matrix.from_triplets(2, 3, [0, 1], [2, 0], [4, 5],
+                                      default=1)
+        vector = DenseOneDimensionalMatrix(3, 1)
+        for i in range(3):
+            vector.set_item(i, i + 1)
+        result = matrix.matvec(vector)
+        self.assertTrue(isinstance(result, DenseOneDimensionalMatrix))
+        self.assertEqual([result.get_item(i) for i in range(2)], [15, 10])
+
+
+class TestViews(unittest.TestCase):
+    ''' Test in-place row and column views. '''
+
+    def setUp(self):
+        self.matrix = Matrix.from_triplets(3, 4, [0, 1, 2], [1, 3, 1],
+                                           [5, 6, 7], default=1)
+
+    def test1_read(self):
+        row = self.matrix.row_view(1)
+        col = self.matrix.col_view(1)
+        self.assertEqual(len(row), 4)
+        self.assertEqual(list(row), [1, 1, 1, 6])
+        self.assertEqual(list(col), [5, 1, 7])
+        self.assertEqual(list(col.iter_sparse()), [(0, 5), (2, 7)])
+        self.assertRaises(MatrixIndexError, row.get_item, 4)
+
+    def test2_read_only(self):
+        view = self.matrix.row_view(0)
+        self.assertFalse(view.is_writable())
+        self.assertRaises(MatrixInvalidOperationError, view.set_item, 0, 3)
+
+    def test3_write_through(self):
+        view = self.matrix.col_view(2, writable=True)
+        view.set_item(1, 8)
+        self.assertEqual(self.matrix.get_val(1, 2), 8)
+        self.assertEqual(view.get_item(1), 8)
+
+    def test4_every_storage_kind(self):
+        symmetric = SymmetricMatrix(3)
+        symmetric.set_val(0, 2, 4)
+        diagonal = DiagonalMatrix(3)
+        diagonal.set_val(1, 1, 3)
+        compressed = CompressedMatrix(3, 3)
+        random_writes(compressed, 5, 7)
+        for matrix in (symmetric, diagonal, compressed):
+            values = as_lists(matrix)
+            for i in range(3):
+                self.assertEqual(list(matrix.row_view(i)), values[i])
+                self.assertEqual(list(matrix.col_view(i)),
+                                 [row[i] for row in values])
+
+    def test5_matvec_view(self):
+        vector = self.matrix.row_view(1)
+        other = Matrix(2, 4, 1)
+        self.assertEqual(other.matvec(vector), [9, 9])
+
+
+class TestIterationAndCount(unittest.TestCase):
+    ''' Test iteration over stored values and the nnz counter. '''
+
+    def setUp(self):
+        self.matrix = Matrix.from_triplets(3, 3, [0, 2, 1], [2, 0, 1],
+                                           [4, 5, 6])
+
+    def test1_orders(self):
+        self.assertEqual(list(self.matrix.iter_nonzero()),
+                         [(0, 2, 4), (1, 1, 6), (2, 0, 5)])
+        self.assertEqual(list(self.matrix.iter_nonzero('col')),
+                         [(2, 0, 5), (1, 1, 6), (0, 2, 4)])
+        self.assertRaises(MatrixInvalidOperationError,
+                          self.matrix.iter_nonzero, 'diagonal')
+
+    def test2_single_lines(self):
+        self.assertEqual(list(self.matrix.iter_row(0)), [(0, 2, 4)])
+        self.assertEqual(list(self.matrix.iter_col(1)), [(1, 1, 6)])
+
+    def test3_count_follows_writes(self):
+        self.assertEqual(self.matrix.nnz(), 3)
+        self.matrix.set_val(1, 2, 8)
+        self.matrix.remove_val(0, 2)
+        self.assertEqual(self.matrix.nnz(), 3)
+        self.assertEqual(self.matrix.nnz(),
+                         len(list(self.matrix.iter_nonzero())))
+
+    def test4_count_matches_iteration(self):
+        symmetric = SymmetricMatrix(4)
+        symmetric.set_val(0, 3, 2)
+        symmetric.set_val(1, 1, 5)
+        compressed = CompressedMatrix(4, 4)
+        random_writes(compressed, 6, 3)
+        dense = DenseOneDimensionalMatrix(1, 4)
+        dense.set_item(2, 9)
+        for matrix in (symmetric, DiagonalMatrix(4), compressed, dense):
+            self.assertEqual(matrix.nnz(), len(list(matrix.iter_nonzero())))
+        self.assertEqual(symmetric.nnz(), 3)
+
+
+class TestConversions(unittest.TestCase):
+    ''' Test conversions to and from NumPy and SciPy. '''
+
+    def setUp(self):
+        try:
+            import numpy
+            import scipy.sparse
+        except ImportError:
+            self.skipTest("NumPy and SciPy are not installed")
+        self.numpy = numpy
+        self.matrix = Matrix.from_triplets(2, 3, [0, 1], [2, 0], [4, 5])
+
+    def test1_to_numpy(self):
+        array = self.matrix.to_numpy()
+        self.assertEqual(array.tolist(), [[0, 0, 4], [5, 0, 0]])
+        shifted = Matrix(2, 2, 3).to_numpy()
+        self.assertEqual(shifted.tolist(), [[3, 3], [3, 3]])
+
+    def test2_to_scipy(self):
+        sparse = self.matrix.to_scipy_sparse()
+        self.assertEqual(sparse.format, 'csr')
+        self.assertEqual(sparse.nnz, 2)
+        self.assertEqual(sparse.toarray().tolist(), as_lists(self.matrix))
+        self.assertEqual(self.matrix.to_scipy_sparse('csc').format, 'csc')
+        self.assertRaises(MatrixInvalidOperationError,
+                          Matrix(2, 2, 1).to_scipy_sparse)
+
+    def test3_round_trips(self):
+        values = as_lists(self.matrix)
+        array = self.matrix.to_numpy()
+        self.assertEqual(as_lists(Matrix.from_numpy(array)), values)
+        sparse = self.matrix.to_scipy_sparse()
+        self.assertEqual(as_lists(Matrix.from_scipy(sparse)), values)
+        compressed = CompressedMatrix.from_numpy(array)
+        self.assertEqual(as_lists(compressed), values)
+        self.assertEqual(
+            compressed.to_scipy_sparse().toarray().tolist(), values)
+
+    def test4_square_classes(self):
+        array = self.numpy.array([[1, 2], [2, 3]])
+        symmetric = SymmetricMatrix.from_numpy(array)
+        self.assertEqual(as_lists(symmetric), [[1, 2], [2, 3]])
+        self.assertEqual(symmetric.nnz(), 4)
+        self.assertRaises(MatrixDimensionError, SquareMatrix.from_numpy,
+                          self.numpy.zeros((2, 3)))
+        self.assertRaises(MatrixInvalidOperationError,
+                          SymmetricMatrix.from_numpy,
+                          self.numpy.array([[1, 2], [3, 4]]))
+        diagonal = DiagonalMatrix.from_numpy(self.numpy.diag([4, 5]))
+        self.assertEqual(as_lists(diagonal), [[4, 0], [0, 5]])
+        self.assertRaises(MatrixInvalidOperationError,
+                          DiagonalMatrix.from_numpy, array)
+
+
+class TestSnapshots(unittest.TestCase):
+    ''' Test copy on write snapshots. '''
+
+    def setUp(self):
+        self.matrix = Matrix.from_triplets(3, 3, [0, 1, 2], [0, 1, 2],
+                                           [1, 2, 3])
+        self.before = as_lists(self.matrix)
+
+    def test1_unchanged_by_writes(self):
+        snapshot = self.matrix.snapshot()
+        self.matrix.set_val(0, 2, 9)
+        self.matrix.remove_val(1, 1)
+        self.matrix.swap_rows(0, 2)
+        self.assertEqual(as_lists(snapshot), self.before)
+        self.assertFalse(snapshot.is_detached())
+        self.assertEqual(snapshot.nnz(), 3)
+
+    def test2_unchanged_by_scalars(self):
+        snapshot = self.matrix.snapshot()
+        self.matrix.add_scalar(2)
+        self.matrix.flush()
+        self.assertEqual(as_lists(snapshot), self.before)
+
+    def test3_detached_by_transpose(self):
+        # Only a square matrix is transposed in place
+        matrix = SquareMatrix.from_triplets(3, [0, 2], [1, 0], [4, 5])
+        before = as_lists(matrix)
+        snapshot = matrix.snapshot()
+        matrix.transpose()
+        self.assertTrue(snapshot.is_detached())
+        self.assertEqual(as_lists(snapshot), before)
+
+    def test4_version(self):
+        snapshot = self.matrix.snapshot()
+        self.assertEqual(snapshot.get_version(), self.matrix.get_version())
+        self.matrix.set_val(0, 1, 4)
+        self.assertLess(snapshot.get_version(), self.matrix.get_version())
+
+    def test5_read_only(self):
+        snapshot = self.matrix.snapshot()
+        with self.assertRaises(MatrixInvalidOperationError):
+            snapshot.row_view(0, writable=True)
+        self.assertEqual(list(snapshot.col_view(2)), [0, 0, 3])
+
+    def test6_products(self):
+        snapshot = self.matrix.snapshot()
+        self.matrix.set_val(2, 0, 5)
+        self.assertEqual(as_lists(snapshot.add_matrix(self.matrix)),
+                         dense_add(self.before, as_lists(self.matrix)))
+        self.assertEqual(as_lists(snapshot.multiply_matrix(self.matrix)),
+                         dense_multiply(self.before, as_lists(self.matrix)))
+
+    def test7_to_matrix_every_class(self):
+        for matrix in samples():
+            result = matrix.snapshot().to_matrix()
+            self.assertEqual(as_lists(result), as_lists(matrix),
+                             type(matrix).__name__)
+
+    def test8_scalars_left_pending(self):
+        snapshot = self.matrix.snapshot()
+        self.matrix.multiply_scalar(3)
+        self.matrix.add_scalar(1)
+        self.assertEqual(as_lists(snapshot), self.before)
+        self.assertEqual(list(snapshot.iter_nonzero()),
+                         [(0, 0, 1), (1, 1, 2), (2, 2, 3)])
+        self.assertEqual(list(snapshot.col_view(1)), [0, 2, 0])
+        self.assertEqual(self.matrix.get_val(1, 1), 7)
+
+
+class TestDiagonalDefault(unittest.TestCase):
+    ''' Test that a diagonal matrix keeps the default of its diagonal. '''
+
+    def test1_from_triplets_keeps_diagonal_default(self):
+        matrix = DiagonalMatrix.from_triplets(3, [0], [0], [7], default=5)
+        expected = [[7, 0, 0], [0, 5, 0], [0, 0, 5]]
+        self.assertEqual(as_lists(matrix), expected,
+                         "Unset diagonal values should be the default.")
+
+    def test2_load_triplets_keeps_diagonal_default(self):
+        matrix = DiagonalMatrix(3, 2)
+        matrix.set_val(1, 1, 9)
+        matrix.load_triplets([2], [2], [4])
+        expected = [[2, 0, 0], [0, 2, 0], [0, 0, 4]]
+        self.assertEqual(as_lists(matrix), expected,
+                         "Loading should only replace the values set.")
+
+
+
+class TestIdentityLoad(unittest.TestCase):
+    ''' Test building an identity matrix from other formats. '''
+
+    def setUp(self):
+        try:
+            import numpy
+            import scipy.sparse
+        except ImportError:
+            self.skipTest("NumPy and SciPy are not installed")
+        self.numpy = numpy
+        self.sparse = scipy.sparse
+
+    def test1_from_numpy(self):
+        matrix = IdentityMatrix.from_numpy(self.numpy.eye(3))
+        self.assertIsInstance(matrix, IdentityMatrix)
+        self.assertEqual(as_lists(matrix), self.numpy.eye(3).tolist())
+
+    def test2_from_numpy_not_identity(self):
+        with self.assertRaises(MatrixInvalidOperationError):
+            IdentityMatrix.from_numpy(self.numpy.diag([1, 2, 1]))
+
+    def test3_from_scipy(self):
+        matrix = IdentityMatrix.from_scipy(self.sparse.identity(4))
+        self.assertEqual(as_lists(matrix), self.numpy.eye(4).tolist())
+
+    def test4_from_scipy_missing_diagonal(self):
+        with self.assertRaises(MatrixInvalidOperationError):
+            IdentityMatrix.from_scipy(
+                self.sparse.csr_matrix(self.numpy.diag([1, 0, 1])))
+
+
+
+class TestSwapColumns(unittest.TestCase):
+    ''' Test swapping the columns of a matrix. '''
+
+    def setUp(self):
+        self.matrix = Matrix.from_triplets(3, 4, [0, 0, 1, 2], [0, 3, 1, 3],
+                                           [1, 2, 3, 4])
+
+    def test1_swap_cols(self):
+        self.matrix.swap_cols(0, 3)
+        expected = [[2, 0, 0, 1], [0, 3, 0, 0], [4, 0, 0, 0]]
+        self.assertEqual(as_lists(self.matrix), expected)
+
+    def test2_swap_with_empty_column(self):
+        self.matrix.set_seek_index(True)
+        self.matrix.swap_cols(1, 2)
+        expected = [[1, 0, 0, 2], [0, 0, 3, 0], [0, 0, 0, 4]]
+        self.assertEqual(as_lists(self.matrix), expected)
+
+    def test3_snapshot_stays_attached(self):
+        snapshot = self.matrix.snapshot()
+        self.matrix.swap_cols(1, 2)
+        self.assertFalse(snapshot.is_detached(),
+                         "Only the rows holding the columns are copied.")
+        self.assertEqual(as_lists(snapshot),
+                         [[1, 0, 0, 2], [0, 3, 0, 0], [0, 0, 0, 4]])
+
+
+if __name__ == '__main__':
+    unittest.main()
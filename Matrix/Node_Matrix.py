@@ -1,3 +1,19 @@
+import asyncio
+import threading
+from array import array
+from bisect import bisect_left
+import weakref
+from operator import add, itemgetter
+try:
+    import numpy
+except ImportError:
+    numpy = None
+try:
+    import scipy.sparse
+except ImportError:
+    scipy = None
+
+
 class MatrixIndexError(Exception):
     '''An attempt has been made to access an invalid index in this matrix'''
 
@@ -12,9 +28,312 @@ class MatrixInvalidOperationError(Exception):
     not valid given its type'''
 
 
+def _merge_rows(rows_a, rows_b, default_a, default_b, combine):
+    '''(iterable, iterable, float, float, function) -> generator
+    Merge two streams of (row, columns, values) triples, each in order of
+    rows and columns, where any coordinate missing from a stream holds that
+    stream's default. Yield the (row, columns, values) triples of
+    combine(a, b) for every coordinate stored in either stream, leaving out
+    values equal to combine(default_a, default_b).
+    '''
+    default = combine(default_a, default_b)
+    rows_a = iter(rows_a)
+    rows_b = iter(rows_b)
+    next_a = next(rows_a, None)
+    next_b = next(rows_b, None)
+    while(next_a is not None or next_b is not None):
+        cols = []
+        vals = []
+        # A row stored in only one of the streams is combined with the
+        # other stream's default
+        if(next_b is None or
+           (next_a is not None and next_a[0] < next_b[0])):
+            i, cols_a, vals_a = next_a
+            for k in range(len(cols_a)):
+                val = combine(vals_a[k], default_b)
+                if(val != default):
+                    cols.append(cols_a[k])
+                    vals.append(val)
+            next_a = next(rows_a, None)
+        elif(next_a is None or next_b[0] < next_a[0]):
+            i, cols_b, vals_b = next_b
+            for k in range(len(cols_b)):
+                val = combine(default_a, vals_b[k])
+                if(val != default):
+                    cols.append(cols_b[k])
+                    vals.append(val)
+            next_b = next(rows_b, None)
+        # Otherwise walk both rows together, column by column
+        else:
+            i, cols_a, vals_a = next_a
+            cols_b, vals_b = next_b[1], next_b[2]
+            k_a = 0
+            k_b = 0
+            while(k_a < len(cols_a) or k_b < len(cols_b)):
+                if(k_b == len(cols_b) or
+                   (k_a < len(cols_a) and cols_a[k_a] < cols_b[k_b])):
+                    j = cols_a[k_a]
+                    val = combine(vals_a[k_a], default_b)
+                    k_a += 1
+                elif(k_a == len(cols_a) or cols_b[k_b] < cols_a[k_a]):
+                    j = cols_b[k_b]
+                    val = combine(default_a, vals_b[k_b])
+                    k_b += 1
+                else:
+                    j = cols_a[k_a]
+                    val = combine(vals_a[k_a], vals_b[k_b])
+                    k_a += 1
+                    k_b += 1
+                if(val != default):
+                    cols.append(j)
+                    vals.append(val)
+            next_a = next(rows_a, None)
+            next_b = next(rows_b, None)
+        if(cols):
+            yield i, cols, vals
+
+
+def _scale_rows(rows, factor, by_row):
+    '''(iterable, function, bool) -> generator
+    Yield every (row, columns, values) triple of rows with each value
+    multiplied by factor(row) if by_row is True, or by factor(column)
+    otherwise, leaving out values which become 0.
+    '''
+    for i, cols, vals in rows:
+        if(by_row):
+            scaled = [(cols[k], vals[k] * factor(i))
+                      for k in range(len(cols))]
+        else:
+            scaled = [(cols[k], vals[k] * factor(cols[k]))
+                      for k in range(len(cols))]
+        scaled = [(j, value) for j, value in scaled if value != 0]
+        if(scaled):
+            yield i, [j for j, value in scaled], [value for j, value in scaled]
+
+
+def _link_all(result, rows, watch=None):
+    '''(Matrix, generator, function) -> Matrix
+    Link the stream of (row, columns, values) triples rows into result,
+    passing it through watch first if watch is given, and return result.
+    result is returned as it is if rows is None.
+    '''
+    if(rows is not None):
+        if(watch is not None):
+            rows = watch(rows)
+        result._link_rows(rows)
+    return result
+
+
+def _group_triplets(triples, duplicates):
+    '''(list of (int, int, float), str) -> generator
+    Yield the (row, columns, values) triples of the (row, col, value)
+    triples, which are sorted by coordinate. Repeated coordinates are
+    summed, reduced to the last one, or raise a MatrixInvalidOperationError
+    when duplicates is 'sum', 'last' or 'error' respectively.
+    '''
+    cols = []
+    vals = []
+    curr_row = None
+    for i, j, value in triples:
+        if(i != curr_row):
+            if(cols):
+                yield curr_row, cols, vals
+            curr_row = i
+            cols = []
+            vals = []
+        if(cols and cols[-1] == j):
+            if(duplicates == 'sum'):
+                vals[-1] = vals[-1] + value
+            elif(duplicates == 'last'):
+                vals[-1] = value
+            else:
+                raise MatrixInvalidOperationError("Duplicate coordinate.")
+        else:
+            cols.append(j)
+            vals.append(value)
+    if(cols):
+        yield curr_row, cols, vals
+
+
+def _require(module, name):
+    '''(module, str) -> NoneType
+    Raise an ImportError naming the optional package name if module, the
+    result of importing it, is None.
+    '''
+    if(module is None):
+        raise ImportError(name + " is needed for this operation.")
+
+
+def _reads(method):
+    '''(function) -> function
+    Declare that method only reads the matrix it is called on, so that a
+    ConcurrentMatrix lets several threads call it at once.
+    '''
+    method._access = 'read'
+    return method
+
+
+def _writes(method):
+    '''(function) -> function
+    Declare that method may change the matrix it is called on, so that a
+    ConcurrentMatrix gives the thread calling it the matrix to itself.
+    '''
+    method._access = 'write'
+    return method
+
+
+def _reads_value(method):
+    '''(function) -> function
+    Declare that method only reads the value at the row and column given
+    as its first two arguments, so that a ConcurrentMatrix only keeps out
+    writers to rows sharing a lock with that row while it runs.
+    '''
+    method._access = 'read_value'
+    return method
+
+
+def _writes_value(method):
+    '''(function) -> function
+    Declare that method changes only the value at the row and column given
+    as its first two arguments, setting it to its third argument if it
+    has one and removing it otherwise. A ConcurrentMatrix then makes the
+    write with _write_in_place where it can, while other rows are written.
+    '''
+    method._access = 'write_value'
+    return method
+
+
+def _flatten_entries(entries, by_row):
+    '''(iterable, bool) -> generator of (int, int, float)
+    Yield a (row, column, value) triple for every value in entries, a
+    stream of (row, columns, values) triples if by_row is True, or of
+    (column, rows, values) triples otherwise.
+    '''
+    for index, others, vals in entries:
+        for k in range(len(others)):
+            if(by_row):
+                yield index, others[k], vals[k]
+            else:
+                yield others[k], index, vals[k]
+
+
+def _vector_items(vector, size):
+    '''(object, int) -> list of float
+    Return the items of vector, which is a OneDimensionalMatrix, a
+    MatrixView, a list or tuple, or a NumPy array, as a list of the given
+    size.
+    '''
+    if(isinstance(vector, DenseOneDimensionalMatrix)):
+        items = list(vector._items)
+    elif(isinstance(vector, OneDimensionalMatrix)):
+        if(vector.get_size() != size):
+            raise MatrixDimensionError("Matrix sizes not compatible.")
+        # Read the stored entries in one pass rather than item by item
+        items = [vector._default] * size
+        is_row = vector.get_num_rows() == 1
+        for i, cols, vals in vector._row_entries():
+            if(is_row):
+                for k in range(len(cols)):
+                    items[cols[k]] = vals[k]
+            else:
+                items[i] = vals[0]
+    elif(isinstance(vector, MatrixView)):
+        items = list(vector)
+    elif(numpy is not None and isinstance(vector, numpy.ndarray)):
+        items = vector.ravel().tolist()
+    else:
+        items = list(vector)
+    if(len(items) != size):
+        raise MatrixDimensionError("Matrix sizes not compatible.")
+    return items
+
+
+def _vector_like(vector, items):
+    '''(object, list of float) -> object
+    Return items in the same kind of container as vector: a column
+    OneDimensionalMatrix, a NumPy array or a list.
+    '''
+    if(isinstance(vector, OneDimensionalMatrix)):
+        result = DenseOneDimensionalMatrix(len(items), 1)
+        result._set_items(items)
+    elif(numpy is not None and isinstance(vector, numpy.ndarray)):
+        result = numpy.array(items)
+    else:
+        result = items
+    return result
+
+
+def _make_vector(is_row, size, default, positions, values):
+    '''(bool, int, float, list of int, list of float) -> OneDimensionalMatrix
+    Return a row (if is_row is True) or column of the given size and
+    default, holding values at the given positions. Mostly filled vectors
+    come back as a DenseOneDimensionalMatrix, the rest as a linked
+    OneDimensionalMatrix.
+    '''
+    if(is_row):
+        m, n = 1, size
+    else:
+        m, n = size, 1
+    # Once half of the items are set, a flat list costs less than the nodes
+    if(2 * len(positions) >= size):
+        result = DenseOneDimensionalMatrix(m, n, default)
+        items = [default] * size
+        for k in range(len(positions)):
+            items[positions[k]] = values[k]
+        result._set_items(items)
+    else:
+        result = OneDimensionalMatrix(m, n, default)
+        if(is_row):
+            result._link_rows([(0, positions, values)])
+        else:
+            result._link_rows((positions[k], [0], [values[k]])
+                              for k in range(len(positions)))
+    return result
+
+
+def _shift_rows(rows, shift):
+    '''(iterable, float) -> generator
+    Yield every (row, columns, values) triple of rows with shift taken away
+    from each value, leaving out values which become 0.
+    '''
+    for i, cols, vals in rows:
+        if(shift != 0):
+            shifted = [(cols[k], vals[k] - shift) for k in range(len(cols))
+                       if vals[k] != shift]
+            cols = [j for j, val in shifted]
+            vals = [val for j, val in shifted]
+        yield i, cols, vals
+
+
+def _sparse_product(rows_a, rows_b):
+    '''(iterable, dict of {int: (list of int, list of float)}) -> generator
+    Yield the (row, columns, values) triples of the product of the sparse
+    matrices given by the stream rows_a and the rows of rows_b, where
+    anything not stored is 0. Each row of the product is gathered in a
+    dict accumulator, so only stored entries are ever visited.
+    '''
+    for i, cols_a, vals_a in rows_a:
+        acc = {}
+        for k in range(len(cols_a)):
+            row_b = rows_b.get(cols_a[k])
+            if(row_b is not None):
+                val_a = vals_a[k]
+                cols_b, vals_b = row_b
+                for t in range(len(cols_b)):
+                    acc[cols_b[t]] = (acc.get(cols_b[t], 0) +
+                                      val_a * vals_b[t])
+        cols = [j for j in sorted(acc) if acc[j] != 0]
+        if(cols):
+            yield i, cols, [acc[j] for j in cols]
+
+
 class MatrixNode():
     '''A general node class for a matrix'''
 
+    # Nodes are made by the million, so keep their attributes in fixed
+    # slots rather than a per-node __dict__
+    __slots__ = ('_contents', '_right', '_down', '_row', '_col')
+
     def __init__(self, contents, row=None, col=None, right=None, down=None):
         '''(MatrixNode, obj, MatrixNode, MatrixNode) -> NoneType
         Create a new node holding contents, that is linked to right
@@ -83,6 +402,197 @@ class MatrixNode():
         self._down = new_node
 
 
+class SeekList():
+    '''The nodes of one row or column chain, sorted by their position in
+    the chain and kept in blocks, so that seeking, inserting and removing a
+    node each take O(log n) comparisons and move at most one block'''
+
+    # A block is split in two once it holds twice this many nodes
+    BLOCK_SIZE = 256
+
+    def __init__(self, keys, nodes):
+        '''(SeekList, list of int, list of MatrixNode) -> NoneType
+        Create a seek list holding nodes, where keys are their positions in
+        the chain in increasing order.
+        '''
+        # self._keys and self._nodes are parallel lists of blocks, and
+        # self._maxes holds the last key of every block, so a bisect on it
+        # finds the block a key belongs to
+        size = SeekList.BLOCK_SIZE
+        self._keys = [keys[k:k + size] for k in range(0, len(keys), size)]
+        self._nodes = [nodes[k:k + size] for k in range(0, len(nodes), size)]
+        self._maxes = [block[-1] for block in self._keys]
+
+    def seek(self, key):
+        '''(SeekList, int) -> (MatrixNode, MatrixNode)
+        Return the last node whose position is less than key and the node
+        after it, either of which is None if there is no such node.
+        '''
+        block = bisect_left(self._maxes, key)
+        if(block == len(self._maxes)):
+            if(block == 0):
+                return None, None
+            return self._nodes[block - 1][-1], None
+        pos = bisect_left(self._keys[block], key)
+        nodes = self._nodes[block]
+        if(pos > 0):
+            prev = nodes[pos - 1]
+        elif(block > 0):
+            prev = self._nodes[block - 1][-1]
+        else:
+            prev = None
+        return prev, nodes[pos]
+
+    def insert(self, key, node):
+        '''(SeekList, int, MatrixNode) -> NoneType
+        Add node to this seek list at position key.
+        REQ: no node is held at position key
+        '''
+        if(not self._maxes):
+            self._keys.append([key])
+            self._nodes.append([node])
+            self._maxes.append(key)
+            return
+        # A key past the end goes on the last block
+        block = min(bisect_left(self._maxes, key), len(self._maxes) - 1)
+        keys = self._keys[block]
+        nodes = self._nodes[block]
+        pos = bisect_left(keys, key)
+        keys.insert(pos, key)
+        nodes.insert(pos, node)
+        self._maxes[block] = keys[-1]
+        size = SeekList.BLOCK_SIZE
+        if(len(keys) > 2 * size):
+            self._keys[block:block + 1] = [keys[:size], keys[size:]]
+            self._nodes[block:block + 1] = [nodes[:size], nodes[size:]]
+            self._maxes[block:block + 1] = [keys[size - 1], keys[-1]]
+
+    def delete(self, key):
+        '''(SeekList, int) -> NoneType
+        Remove the node at position key from this seek list.
+        REQ: a node is held at position key
+        '''
+        block = bisect_left(self._maxes, key)
+        keys = self._keys[block]
+        pos = bisect_left(keys, key)
+        del keys[pos]
+        del self._nodes[block][pos]
+        if(keys):
+            self._maxes[block] = keys[-1]
+        else:
+            del self._keys[block]
+            del self._nodes[block]
+            del self._maxes[block]
+
+    def items(self):
+        '''(SeekList) -> list of (int, MatrixNode)
+        Return the position and node of everything in this seek list, in
+        order.
+        '''
+        return [(key, node) for keys, nodes in zip(self._keys, self._nodes)
+                for key, node in zip(keys, nodes)]
+
+
+class MatrixView():
+    '''A row or column of a matrix, read in place from the matrix itself
+    rather than copied out of it. A view sees every later change to the
+    matrix, and if it is writable, changes made through it go straight to
+    the matrix. The matrix should not be changed while a view of it is
+    being iterated over.'''
+
+    def __init__(self, matrix, index, is_row, writable=False):
+        '''(MatrixView, Matrix, int, bool, bool) -> NoneType
+        Create a view of row index of matrix if is_row is True, or of
+        column index otherwise. Items can only be set through the view if
+        writable is True.
+        REQ: index is a row (or column) of matrix
+        '''
+        # REPRESENTATION INVARIANT
+
+        # self._matrix is the matrix being viewed, and self._index the row
+        # (if self._is_row is True) or column of it that the view shows
+        # Nothing about the row or column is kept in the view itself, so
+        # every read goes through to the matrix
+        self._matrix = matrix
+        self._index = index
+        self._is_row = is_row
+        self._writable = writable
+
+    def get_size(self):
+        '''(MatrixView) -> int
+        Return the number of items in this view.
+        REQ: None
+        '''
+        if(self._is_row):
+            return self._matrix.get_num_cols()
+        return self._matrix.get_num_rows()
+
+    def is_writable(self):
+        '''(MatrixView) -> bool
+        Return True if items can be set through this view.
+        REQ: None
+        '''
+        return self._writable
+
+    def get_item(self, i):
+        '''(MatrixView, int) -> float
+        Return the i'th item in this view
+        REQ: i is an integer within the size of the view
+        '''
+        if(i < 0 or i >= self.get_size()):
+            raise MatrixIndexError("The item is not in the view.")
+        if(self._is_row):
+            return self._matrix.get_val(self._index, i)
+        return self._matrix.get_val(i, self._index)
+
+    def set_item(self, i, new_val):
+        '''(MatrixView, int, float) -> NoneType
+        Set the i'th item in this view, and so in the matrix, to new_val
+        REQ: i is an integer within the size of the view
+        REQ: the view is writable
+        '''
+        if(not self._writable):
+            raise MatrixInvalidOperationError("The view is read only.")
+        if(i < 0 or i >= self.get_size()):
+            raise MatrixIndexError("The item is not in the view.")
+        if(self._is_row):
+            self._matrix.set_val(self._index, i, new_val)
+        else:
+            self._matrix.set_val(i, self._index, new_val)
+
+    def iter_sparse(self):
+        '''(MatrixView) -> generator of (int, float)
+        Yield the position and value of every item the matrix stores in
+        this row or column, in order. Items which are not stored hold the
+        default value of the matrix.
+        REQ: None
+        '''
+        return self._matrix._line_items(self._index, self._is_row)
+
+    def __len__(self):
+        '''(MatrixView) -> int
+        Return the number of items in this view.
+        '''
+        return self.get_size()
+
+    def __iter__(self):
+        '''(MatrixView) -> generator of float
+        Yield every item in this view in order, defaults included.
+        '''
+        default = self._matrix._default
+        next_pos = 0
+        # Fill the gaps between the stored items with the default
+        for pos, value in self.iter_sparse():
+            while(next_pos < pos):
+                yield default
+                next_pos += 1
+            yield value
+            next_pos = pos + 1
+        while(next_pos < self.get_size()):
+            yield default
+            next_pos += 1
+
+
 class Matrix():
     '''A class to represent a mathematical matrix
     Note: Uses 0-indexing, so an m x n matrix will have
@@ -101,11 +611,14 @@ class Matrix():
         # self._cols in an integer indicating # of columns in the matrix
         # if self._rows == self._cols, then Matrix is a Square Matrix
         # if self._rows == self._cols == 0, the Matrix is a single Node
-        # self._existing_rows is a list containing rows that exist in
+        # self._existing_rows is a sorted list containing rows that exist in
         # the matrix, entered by the user
-        # self._existing_cols is a list containing columns which exist in
-        # the matrix
-        # if i is in self._existing_rows, then i is an index node in the matrix
+        # self._existing_cols is a sorted list containing columns which exist
+        # in the matrix
+        # self._row_index is a dict mapping each existing row to its index
+        # node, and self._col_index does the same for columns
+        # if i is a key of self._row_index, then i is an index node in the
+        # matrix, and i is in self._existing_rows
         # self._default is a float value representing every value in the
         # matrix at the time of creation
         # If Matrix[m,n] does not have a node, then it is the default value
@@ -114,11 +627,37 @@ class Matrix():
         self._cols = n - 1
         self._existing_rows = []
         self._existing_cols = []
+        self._row_index = {}
+        self._col_index = {}
+        # self._seek_index is True if seeks within a row or column use the
+        # sorted overlay below instead of walking the chain one node at a time
+        # self._row_seek maps a row to a SeekList of the nodes in that row,
+        # keyed by their columns, and self._col_seek does the same for
+        # columns. Chains without an entry have their overlay built the first
+        # time they are written to, and are walked node by node until then
+        self._seek_index = False
+        self._row_seek = {}
+        self._col_seek = {}
+        # self._pending is None, or a pair (scale, shift) of scalar
+        # operations not yet applied to the nodes, so the value of a node is
+        # its contents * scale + shift
+        self._pending = None
+        # self._prune_default is True if setting a value equal to
+        # self._default removes its node instead of storing it
+        self._prune_default = False
+        # self._nnz is the number of value nodes in the matrix
+        self._nnz = 0
+        # self._version counts the changes made to the matrix, and
+        # self._snapshots holds weak references to the snapshots still
+        # reading rows they share with it
+        self._version = 0
+        self._snapshots = []
         self._default = default
         # Check if the dimensions are valid
         if (self._rows < 0 or self._cols < 0):
             raise MatrixDimensionError("Invalid dimension input.")
 
+    @_reads
     def get_num_cols(self):
         '''
         (self) -> int
@@ -128,6 +667,7 @@ class Matrix():
         '''
         return self._cols + 1
 
+    @_reads
     def get_num_rows(self):
         '''
         (self) -> int
@@ -137,6 +677,7 @@ class Matrix():
         '''
         return self._rows + 1
 
+    @_reads_value
     def get_val(self, i, j):
         '''(Matrix, int, int) -> float
         Return the value of m[i,j] for this matrix m
@@ -146,39 +687,21 @@ class Matrix():
         # First check if the coordinate is valid and within the matrix
         if (i > self._rows or i < 0 or j > self._cols or j < 0):
             raise MatrixIndexError("Dimension does not exist in the Matrix.")
-        value = None
+        value = self._default
+        # Jump straight to the row index node, if the row exists at all
+        row_node = self._row_index.get(i)
         # If the coordinate has a new row or a new col, then there does not
-        # exist a node in the matrix for that value. Therefore, return the
-        # default value
-        if(i not in self._existing_rows or j not in self._existing_cols):
-            # Set value to default
-            value = self._default
-        # Otherwise, we have to look to see if a node exists at the coordinate
-        else:
-            # Create a pointer to help navigate
-            curr = self._head.get_down()
-            # Check if the row the user entered already exists
-            while(curr is not None and i > curr.get_contents()):
-                curr = curr.get_down()
-            # If we can't find the row index, then the node does
-            # not exist, so return the default value
-            if(curr is None or curr.get_contents() != i):
-                value = self._default
-            # If we find the row, check to see if there is a corresponding col
-            else:
-                curr = curr.get_right()
-                while(curr is not None and j > curr.get_col()):
-                    curr = curr.get_right()
-
-                # If we find a corresponding column, then a node does exist
-                # so return the value the node holds
-                if(curr is not None and j == curr.get_col()):
-                    value = curr.get_contents()
-                # Otherwise, return the default value
-                else:
-                    value = self._default
+        # exist a node in the matrix for that value, so keep the default
+        if(row_node is not None and j in self._col_index):
+            # Look along the row for a node in the given column
+            curr = self._seek_right(row_node, j)[1]
+            # If we find a corresponding column, then a node does exist
+            # so return the value the node holds
+            if(curr is not None and j == curr.get_col()):
+                value = self._read(curr.get_contents())
         return value
 
+    @_writes_value
     def set_val(self, i, j, new_val):
         '''(Matrix, int, int, float) -> NoneType
         Set the value of m[i,j] to new_val for this matrix m
@@ -189,166 +712,695 @@ class Matrix():
         # First check if the coordinate is valid and within the matrix
         if (i > self._rows or i < 0 or j > self._cols or j < 0):
             raise MatrixIndexError("Dimension does not exist in the Matrix.")
-        # Create a new Node to hold the new value and its row and col
-        val_node = MatrixNode(new_val, i, j)
-
-        # Consider the dimension the user entered:
-        # If it is a new row and/or column to our current Matrix:
-        # If it is the first value the user entered:
-        if (self._head.get_right() is None and self._head.get_down() is None):
-            # Create the index nodes, which act like an outer frame
-            row_node = MatrixNode(i)
-            col_node = MatrixNode(j)
-            # Link the head of the Matrix to the index nodes
-            self._head.set_right(col_node)
-            self._head.set_down(row_node)
-            # Link the index nodes to the new value node
-            col_node.set_down(val_node)
-            row_node.set_right(val_node)
-            # Add the row number and column number to a list of existing nodes
-            self._existing_rows.append(i)
-            self._existing_cols.append(j)
+        self._before_set(i, j)
+        # A value equal to the default needs no node at all
+        if(self._prune_default and new_val == self._default):
+            self.remove_val(i, j)
+            return
+        # Store the contents that read back as new_val under any pending
+        # scalar operations, so the other nodes can be left as they are
+        contents = new_val
+        if(self._pending is not None):
+            contents = self._unread(new_val)
+            # Only when no contents read back as new_val exactly, such as
+            # after multiplying by 0, is every node brought up to date
+            if(contents is None):
+                self.flush()
+                contents = new_val
+        # Find the index nodes for the row and column, creating any which
+        # do not exist yet
+        row_node = self._row_index.get(i)
+        if(row_node is None):
+            row_node = self._add_row_index(i)
+        col_node = self._col_index.get(j)
+        if(col_node is None):
+            col_node = self._add_col_index(j)
+        # Find the place the value belongs in the row
+        prev, curr = self._seek_right(row_node, j, True)
+        # If a node already exists at that coordinate, replace its value
+        if(curr is not None and j == curr.get_col()):
+            curr.set_contents(contents)
+        # Otherwise, link a new node into both the row and the column
+        else:
+            self._link_node(MatrixNode(contents, i, j), prev, curr, col_node)
 
-        # If the user enters a value at a new row and column
-        elif (i not in self._existing_rows and j not in self._existing_cols):
-            # Create the new index nodes
-            row_node = MatrixNode(i)
-            col_node = MatrixNode(j)
-            # Set a pointer to the first row index
-            curr = self._head.get_down()
-            # Make a temporary pointer to point at the previous node
+    @_writes_value
+    def remove_val(self, i, j):
+        '''(Matrix, int, int) -> NoneType
+        Reset m[i,j] to the default value for this matrix m, removing its
+        node and any index nodes left without nodes.
+        REQ: i >= 0 and i < number of rows in the matrix
+        REQ: j >= 0 and j < number of columns in the matrix
+        '''
+        if (i > self._rows or i < 0 or j > self._cols or j < 0):
+            raise MatrixIndexError("Dimension does not exist in the Matrix.")
+        self._before_set(i, j)
+        row_node = self._row_index.get(i)
+        if(row_node is not None and j in self._col_index):
+            prev, curr = self._seek_right(row_node, j, True)
+            if(curr is not None and j == curr.get_col()):
+                # Take the node out of its row, then out of its column
+                prev.set_right(curr.get_right())
+                curr.set_right(None)
+                if(self._seek_index):
+                    self._seek_delete(self._row_seek.get(i), j)
+                self._unlink_down(curr)
+                self._nnz -= 1
+                if(row_node.get_right() is None):
+                    self._remove_row_index(i)
+                if(self._col_index[j].get_down() is None):
+                    self._remove_col_index(j)
+
+    def _write_in_place(self, i, j, new_val):
+        '''(Matrix, int, int, float) -> int
+        Set m[i,j] to new_val for this matrix m, or remove it if new_val is
+        None, provided that touches nothing but the chains of row i and
+        column j, and return how much that changed the number of values
+        stored. Otherwise leave this matrix as it is and return None: when
+        an index node would be added to or taken out of the frame, when
+        nodes would be brought up to date under pending scalar operations,
+        or when rows may be shared with a snapshot. The write is not
+        counted; see _count_write.
+        '''
+        if(self._pending is not None or self._snapshots or
+           i > self._rows or i < 0 or j > self._cols or j < 0):
+            return None
+        if(self._prune_default and new_val == self._default):
+            new_val = None
+        # Matrices storing no nodes have no index nodes either
+        row_node = self._row_index.get(i)
+        col_node = self._col_index.get(j)
+        if(row_node is None or col_node is None):
+            return None
+        prev, curr = self._seek_right(row_node, j, True)
+        found = curr is not None and j == curr.get_col()
+        if(new_val is not None):
+            if(found):
+                curr.set_contents(new_val)
+                return 0
+            self._splice_node(MatrixNode(new_val, i, j), prev, curr,
+                              col_node)
+            return 1
+        if(not found):
+            return 0
+        # Removing the last node of a row or column takes its index node
+        # out of the frame
+        if((prev is row_node and curr.get_right() is None) or
+           (col_node.get_down() is curr and curr.get_down() is None)):
+            return None
+        prev.set_right(curr.get_right())
+        curr.set_right(None)
+        if(self._seek_index):
+            self._seek_delete(self._row_seek.get(i), j)
+        self._unlink_down(curr)
+        return -1
+
+    def _count_write(self, nnz_change):
+        '''(Matrix, int) -> NoneType
+        Count a write made by _write_in_place, which changed the number of
+        values stored in this matrix by nnz_change.
+        '''
+        self._nnz += nnz_change
+        self._version += 1
+
+    @_writes
+    def set_prune_default(self, enabled=True):
+        '''(Matrix, bool) -> NoneType
+        Turn automatic pruning on or off for this matrix. While it is on,
+        setting a value equal to the default removes its node rather than
+        storing the value.
+        REQ: None
+        '''
+        self._prune_default = enabled
+
+    @_writes
+    def compact(self):
+        '''(Matrix) -> NoneType
+        Remove every node of this matrix whose value equals the default,
+        such as the nodes a scalar operation has brought level with it.
+        REQ: None
+        '''
+        default = self._default
+        rows = []
+        # Go through the nodes as stored, which for some kinds of matrix is
+        # not how their rows read
+        for i, cols, vals in Matrix._row_entries(self):
+            kept = [k for k in range(len(cols)) if vals[k] != default]
+            rows.append((i, [cols[k] for k in kept], [vals[k] for k in kept]))
+        # Relinking what is left drops the pruned nodes and any index nodes
+        # left empty in one pass
+        self._clear()
+        self._link_rows(rows)
+
+    @_writes
+    def snapshot(self):
+        '''(Matrix) -> MatrixSnapshot
+        Return a read only copy of this matrix as it is now, which later
+        changes to the matrix do not show up in. The snapshot is taken in
+        O(1): it shares every row with the matrix, and each row is only
+        copied into it when the matrix is about to change that row.
+        REQ: None
+        '''
+        snapshot = MatrixSnapshot(self)
+        self._snapshots.append(weakref.ref(snapshot))
+        return snapshot
+
+    @_reads
+    def get_version(self):
+        '''(Matrix) -> int
+        Return a number which goes up every time this matrix is changed.
+        REQ: None
+        '''
+        return self._version
+
+    def _line_nodes(self, index, is_row):
+        '''(Matrix, int, bool) -> list of (int, MatrixNode)
+        Return the position and node of every node in row index of this
+        matrix if is_row is True, or in column index otherwise.
+        '''
+        result = []
+        if(is_row):
+            node = self._row_index.get(index)
+            curr = node and node.get_right()
+            while(curr is not None):
+                result.append((curr.get_col(), curr))
+                curr = curr.get_right()
+        else:
+            node = self._col_index.get(index)
+            curr = node and node.get_down()
+            while(curr is not None):
+                result.append((curr.get_row(), curr))
+                curr = curr.get_down()
+        return result
+
+    def _unsettled(self):
+        '''(Matrix) -> bool
+        Return True if reading this matrix would first change how it is
+        stored, so readers can not share it until _settle is called.
+        '''
+        return False
+
+    def _settle(self):
+        '''(Matrix) -> NoneType
+        Bring anything this matrix builds lazily when it is read up to
+        date.
+        '''
+        pass
+
+    def _before_write(self, rows):
+        '''(Matrix, tuple of int) -> NoneType
+        Count a change to this matrix which is about to be made to rows,
+        or to every row if rows is None, first copying those rows into
+        any snapshot still sharing them.
+        '''
+        self._version += 1
+        if(self._snapshots):
+            live = []
+            for ref in self._snapshots:
+                snapshot = ref()
+                # Snapshots which were dropped or have let go of this
+                # matrix need nothing more
+                if(snapshot is not None and not snapshot.is_detached()):
+                    if(rows is None):
+                        snapshot.detach()
+                    else:
+                        for i in rows:
+                            snapshot._keep(i)
+                        live.append(ref)
+            self._snapshots = live
+
+    def _before_set(self, i, j):
+        '''(Matrix, int, int) -> NoneType
+        Get ready for the value at [i, j] of this matrix to change.
+        '''
+        self._before_write((i,))
+
+    def _before_scale(self):
+        '''(Matrix) -> NoneType
+        Get ready for a scalar operation on this matrix. Snapshots keep the
+        scalar operations pending when they were taken, so nodes shared
+        with them can be left as they are.
+        '''
+        self._before_write(())
+
+    def _stored_items(self, index, is_row, pending):
+        '''(Matrix, int, bool, tuple) -> list of (int, float)
+        Return the position and value of every node in row index of this
+        matrix if is_row is True, or in column index otherwise, reading
+        the nodes as if pending, a pair (scale, shift) or None, were the
+        scalar operations pending on this matrix.
+        '''
+        scale, shift = pending or (1, 0)
+        return [(pos, node.get_contents() * scale + shift)
+                for pos, node in self._line_nodes(index, is_row)]
+
+    # A MatrixSnapshot reads the matrix it was taken from only through the
+    # four methods below
+
+    def _snapshot_state(self):
+        '''(Matrix) -> (tuple, int, int, int, float, int, function)
+        Return what a snapshot taken of this matrix now keeps of it: the
+        scalar operations pending on it, its version, its last row and
+        column, its default, the number of values it stores and the method
+        making blank matrices of its class.
+        '''
+        return (self._pending, self._version, self._rows, self._cols,
+                self._default, self.nnz(), self._blank)
+
+    def _snapshot_value(self, i, j, pending, default):
+        '''(Matrix, int, int, tuple, float) -> float
+        Return the value at [i, j] of this matrix as a snapshot taken while
+        the scalar operations pending were pending on it reads it, or
+        default if nothing is stored there.
+        '''
+        if(self._pending == pending):
+            return self.get_val(i, j)
+        for pos, value in self._stored_items(i, True, pending):
+            if(pos == j):
+                return value
+        return default
+
+    def _snapshot_line(self, index, is_row, pending):
+        '''(Matrix, int, bool, tuple) -> list of (int, float)
+        Return the position and value of every entry stored in row index
+        of this matrix if is_row is True, or in column index otherwise, as
+        a snapshot taken while the scalar operations pending were pending
+        on it reads them.
+        '''
+        if(self._pending == pending):
+            return list(self._line_items(index, is_row))
+        return self._stored_items(index, is_row, pending)
+
+    def _snapshot_rows(self, pending):
+        '''(Matrix, tuple) -> iterable of (int, list of int, list of float)
+        Return the row number, the columns and the values of every row of
+        this matrix with stored entries, in order, as a snapshot taken
+        while the scalar operations pending were pending on it reads them.
+        '''
+        if(self._pending == pending):
+            return self._row_entries()
+        rows = ((i, self._stored_items(i, True, pending))
+                for i in range(0, self._rows + 1))
+        return ((i, [pos for pos, value in items],
+                 [value for pos, value in items])
+                for i, items in rows if items)
+
+    @_writes
+    def set_seek_index(self, enabled=True):
+        '''(Matrix, bool) -> NoneType
+        Turn the sorted seek overlay on the row and column chains of this
+        matrix on or off. With it on, finding a position inside a chain
+        takes O(log n) for a chain of n nodes instead of O(n), at the cost
+        of a SeekList per chain.
+        REQ: None
+        '''
+        self._seek_index = enabled
+        self._row_seek = {}
+        self._col_seek = {}
+        if(enabled):
+            self._build_seek()
+
+    def _build_seek(self):
+        '''(Matrix) -> NoneType
+        Build the seek overlay of every row and column chain of this matrix
+        that does not have one yet, so later reads find them all built.
+        '''
+        for table, index, is_row in ((self._row_seek, self._row_index, True),
+                                     (self._col_seek, self._col_index,
+                                      False)):
+            for index_node in index.values():
+                self._seek_overlay(table, index_node, is_row, True)
+
+    def _link_node(self, val_node, prev, curr, col_node):
+        '''(Matrix, MatrixNode, MatrixNode, MatrixNode, MatrixNode) ->
+        NoneType
+        Link val_node into its row between prev and curr, and into the
+        column of col_node at the position matching its row.
+        REQ: prev and curr are the result of seeking val_node's column in
+        its row
+        '''
+        self._splice_node(val_node, prev, curr, col_node)
+        self._nnz += 1
+
+    def _splice_node(self, val_node, prev, curr, col_node):
+        '''(Matrix, MatrixNode, MatrixNode, MatrixNode, MatrixNode) ->
+        NoneType
+        Link val_node into its row and column as _link_node does, touching
+        nothing but the two chains and their overlays, and so without
+        counting it.
+        REQ: prev and curr are the result of seeking val_node's column in
+        its row
+        '''
+        prev.set_right(val_node)
+        val_node.set_right(curr)
+        col_prev, col_curr = self._seek_down(col_node, val_node.get_row(),
+                                             True)
+        col_prev.set_down(val_node)
+        val_node.set_down(col_curr)
+        # Keep any overlays of the two chains in step with the new node
+        if(self._seek_index):
+            self._seek_insert(self._row_seek.get(val_node.get_row()),
+                              val_node.get_col(), val_node)
+            self._seek_insert(self._col_seek.get(val_node.get_col()),
+                              val_node.get_row(), val_node)
+
+    def _seek_insert(self, overlay, key, node):
+        '''(Matrix, SeekList, int, MatrixNode) -> NoneType
+        Add node to overlay under key, if the chain has an overlay.
+        '''
+        if(overlay is not None):
+            overlay.insert(key, node)
+
+    def _seek_delete(self, overlay, key):
+        '''(Matrix, SeekList, int) -> NoneType
+        Remove the node under key from overlay, if the chain has an overlay.
+        '''
+        if(overlay is not None):
+            overlay.delete(key)
+
+    def _add_row_index(self, i):
+        '''(Matrix, int) -> MatrixNode
+        Create the index node for row i, link it into the outer frame of
+        this matrix and return it.
+        REQ: row i does not have an index node yet
+        '''
+        row_node = MatrixNode(i)
+        # The sorted list of existing rows tells us which index node the
+        # new one goes below, without walking the frame
+        pos = bisect_left(self._existing_rows, i)
+        if(pos == 0):
             prev = self._head
-            # Find a place for the new row index node
-            if(i not in self._existing_rows):
-                while(curr is not None and i > curr.get_contents()):
-                    prev = curr
-                    curr = curr.get_down()
-                # Set the previous node's link to the new row node
-                prev.set_down(row_node)
-                # Set the new row node to the current node
-                row_node.set_down(curr)
-                # Now link the row node to the new value node
-                row_node.set_right(val_node)
-            # Find a place for the new column node
-            # Repeat process similar to the one above
-            curr = self._head.get_right()
+        else:
+            prev = self._row_index[self._existing_rows[pos - 1]]
+        row_node.set_down(prev.get_down())
+        prev.set_down(row_node)
+        self._existing_rows.insert(pos, i)
+        self._row_index[i] = row_node
+        return row_node
+
+    def _add_col_index(self, j):
+        '''(Matrix, int) -> MatrixNode
+        Create the index node for column j, link it into the outer frame of
+        this matrix and return it.
+        REQ: column j does not have an index node yet
+        '''
+        col_node = MatrixNode(j)
+        pos = bisect_left(self._existing_cols, j)
+        if(pos == 0):
             prev = self._head
-            if(j not in self._existing_cols):
-                while(curr is not None and j > curr.get_contents()):
-                    prev = curr
-                    curr = curr.get_right()
-                prev.set_right(col_node)
-                col_node.set_right(curr)
-                col_node.set_down(val_node)
-            # Add the column and row to the list of existing ones
-            self._existing_rows.append(i)
-            self._existing_cols.append(j)
+        else:
+            prev = self._col_index[self._existing_cols[pos - 1]]
+        col_node.set_right(prev.get_right())
+        prev.set_right(col_node)
+        self._existing_cols.insert(pos, j)
+        self._col_index[j] = col_node
+        return col_node
 
-        # If the user adds a value at a new row, but existing columm:
-        elif (i not in self._existing_rows and j in self._existing_cols):
-            # Create the new row node
-            row_node = MatrixNode(i)
-            # Add the row to existing rows list
-            self._existing_rows.append(i)
-            # Create temporary pointers to the index nodes
+    def _remove_row_index(self, i):
+        '''(Matrix, int) -> NoneType
+        Take the index node for row i out of the outer frame of this matrix.
+        REQ: row i has an index node, and no nodes in its row
+        '''
+        pos = bisect_left(self._existing_rows, i)
+        if(pos == 0):
             prev = self._head
-            curr = self._head.get_down()
-            # Find the place to insert the new row node
-            while(curr is not None and i > curr.get_contents()):
-                prev = curr
-                curr = curr.get_down()
-            # Link the previous node to the new row node
-            prev.set_down(row_node)
-            # Link the row node to the current node
-            row_node.set_down(curr)
-            # Link the row node to its column value
-            row_node.set_right(val_node)
-            # Now find the column index node
-            curr = self._head.get_right()
-            while(curr.get_contents() != j):
-                curr = curr.get_right()
-            # Now that we've found the column, find the row to link the node
-            prev = curr
-            curr = curr.get_down()
-            while(curr is not None and val_node.get_row() > curr.get_row()):
-                prev = curr
-                curr = curr.get_down()
-            # Link the previous node to the value node, and value node to curr
-            prev.set_down(val_node)
-            val_node.set_down(curr)
-
-        # If the user adds a value at an existing row but new column:
-        elif (i in self._existing_rows and j not in self._existing_cols):
-            # Create the new column index node
-            col_node = MatrixNode(j)
-            # Add the column to the list of existing columns
-            self._existing_cols.append(j)
-            # Create temporary pointers for index nodes
+        else:
+            prev = self._row_index[self._existing_rows[pos - 1]]
+        prev.set_down(self._row_index[i].get_down())
+        del self._existing_rows[pos]
+        del self._row_index[i]
+        self._row_seek.pop(i, None)
+
+    def _remove_col_index(self, j):
+        '''(Matrix, int) -> NoneType
+        Take the index node for column j out of the outer frame of this
+        matrix.
+        REQ: column j has an index node, and no nodes in its column
+        '''
+        pos = bisect_left(self._existing_cols, j)
+        if(pos == 0):
             prev = self._head
-            curr = self._head.get_right()
-            # Find where to insert the new column index node
-            while(curr is not None and j > curr.get_contents()):
-                prev = curr
-                curr = curr.get_right()
-            # Link previous node to new column index node
-            prev.set_right(col_node)
-            # Link col idx node to current node
-            col_node.set_right(curr)
-            # Link column index node to new value node
-            col_node.set_down(val_node)
-            # Now find the row index node
-            curr = self._head.get_down()
-            while(curr.get_contents() != i):
-                curr = curr.get_down()
-            # Find the node to link the row index chain to
+        else:
+            prev = self._col_index[self._existing_cols[pos - 1]]
+        prev.set_right(self._col_index[j].get_right())
+        del self._existing_cols[pos]
+        del self._col_index[j]
+        self._col_seek.pop(j, None)
+
+    def _seek_right(self, row_node, j, writing=False):
+        '''(Matrix, MatrixNode, int, bool) -> (MatrixNode, MatrixNode)
+        Return the last node in the row of row_node whose column is less
+        than j (possibly row_node itself), and the node after it. writing
+        is True if the row is about to change, so its overlay may be built.
+        '''
+        if(self._seek_index):
+            overlay = self._seek_overlay(self._row_seek, row_node, True,
+                                         writing)
+            if(overlay is not None):
+                prev, curr = overlay.seek(j)
+                return prev or row_node, curr
+        prev = row_node
+        curr = row_node.get_right()
+        while(curr is not None and j > curr.get_col()):
             prev = curr
             curr = curr.get_right()
-            while(curr is not None and val_node.get_col() > curr.get_col()):
-                prev = curr
-                curr = curr.get_right()
-            # Link the nodes accordingly
-            prev.set_right(val_node)
-            val_node.set_right(curr)
+        return prev, curr
 
-        # Otherwise, the user enters a value at an existing row and col
-        else:
-            # Start by finding the row the input is at
-            curr = self._head.get_down()
-            while(curr.get_contents() != i):
-                curr = curr.get_down()
-            # Find the column the input is asking for
+    def _seek_down(self, col_node, i, writing=False):
+        '''(Matrix, MatrixNode, int, bool) -> (MatrixNode, MatrixNode)
+        Return the last node in the column of col_node whose row is less
+        than i (possibly col_node itself), and the node below it. writing
+        is True if the column is about to change, so its overlay may be
+        built.
+        '''
+        if(self._seek_index):
+            overlay = self._seek_overlay(self._col_seek, col_node, False,
+                                         writing)
+            if(overlay is not None):
+                prev, curr = overlay.seek(i)
+                return prev or col_node, curr
+        prev = col_node
+        curr = col_node.get_down()
+        while(curr is not None and i > curr.get_row()):
             prev = curr
-            curr = curr.get_right()
-            while(curr is not None and j > curr.get_col()):
-                prev = curr
-                curr = curr.get_right()
-            # If a node already exists at that coordinate:
-            if(curr is not None and j == curr.get_col()):
-                # Replace the nodes value with the new value
-                curr.set_contents(new_val)
-            # Otherwise, set a new node to the matrix
-            else:
-                # Link the previous pointer to the new node
-                prev.set_right(val_node)
-                # Link the new nodes right pointer to the current node
-                val_node.set_right(curr)
-                # Now link the column's chain appropriately
-                curr = self._head.get_right()
-                while(curr.get_contents() != j):
+            curr = curr.get_down()
+        return prev, curr
+
+    def _seek_overlay(self, table, index_node, is_row, writing):
+        '''(Matrix, dict, MatrixNode, bool, bool) -> SeekList
+        Return the overlay in table of the chain of index_node, which starts
+        a row if is_row is True or a column otherwise. A chain without one
+        only gets it built when writing is True, so reads never change the
+        matrix, and None is returned otherwise.
+        '''
+        overlay = table.get(index_node.get_contents())
+        if(overlay is None and writing):
+            # Walk the chain once to record every node in order
+            keys = []
+            nodes = []
+            if(is_row):
+                curr = index_node.get_right()
+                while(curr is not None):
+                    keys.append(curr.get_col())
+                    nodes.append(curr)
                     curr = curr.get_right()
-                # Now that we've found the column, find the row to link
-                # the node
-                prev = curr
-                curr = curr.get_down()
-                while(curr is not None and
-                      val_node.get_row() > curr.get_row()):
-                    prev = curr
+            else:
+                curr = index_node.get_down()
+                while(curr is not None):
+                    keys.append(curr.get_row())
+                    nodes.append(curr)
                     curr = curr.get_down()
-                # Link the previous node to the value node, and value node
-                # to curr
-                prev.set_down(val_node)
-                val_node.set_down(curr)
+            overlay = SeekList(keys, nodes)
+            table[index_node.get_contents()] = overlay
+        return overlay
+
+    @classmethod
+    def from_triplets(cls, m, n, rows, cols=None, values=None, default=0,
+                      duplicates='sum'):
+        '''(type, int, int, list of int, list of int, list of float, float,
+        str) -> Matrix
+        Return a new m x n matrix with the given default, holding
+        values[k] at (rows[k], cols[k]) for every k. If cols and values are
+        not given, rows is an iterable of (row, col, value) triples instead.
+        See load_triplets for how duplicate coordinates are handled.
+        REQ: m is an int > 0
+        REQ: n is an int > 0
+        '''
+        matrix = cls(m, n, default)
+        matrix.load_triplets(rows, cols, values, duplicates)
+        return matrix
+
+    @_writes
+    def load_triplets(self, rows, cols=None, values=None, duplicates='sum'):
+        '''(Matrix, list of int, list of int, list of float, str) ->
+        NoneType
+        Replace every value set in this matrix with values[k] at
+        (rows[k], cols[k]) for every k, linking all of them in a single
+        pass. If cols and values are not given, rows is an iterable of
+        (row, col, value) triples instead. When a coordinate is given more
+        than once, duplicates decides what happens: 'sum' adds the values
+        up, 'last' keeps the last one given, and 'error' raises a
+        MatrixInvalidOperationError.
+        REQ: every coordinate is within the matrix
+        '''
+        triples = self._check_triplets(rows, cols, values, duplicates)
+        self._clear()
+        self._link_rows(_group_triplets(triples, duplicates))
+
+    @classmethod
+    def from_numpy(cls, array, default=0):
+        '''(type, numpy.ndarray, float) -> Matrix
+        Return a new matrix with the given default, holding the values of
+        the 2 dimensional array. Only the values which differ from the
+        default get a node, and they are all linked in a single pass.
+        REQ: NumPy is installed
+        '''
+        _require(numpy, "NumPy")
+        array = numpy.asarray(array)
+        if(array.ndim != 2):
+            raise MatrixDimensionError("Array must have 2 dimensions.")
+        matrix = cls._sized(array.shape[0], array.shape[1], default)
+        matrix._load_array(array)
+        return matrix
+
+    @classmethod
+    def from_scipy(cls, sparse):
+        '''(type, scipy.sparse matrix) -> Matrix
+        Return a new matrix with a default of 0, holding a node for every
+        value stored in sparse, a SciPy sparse matrix of any format. Values
+        stored more than once at a coordinate are added up, as SciPy does.
+        REQ: SciPy is installed
+        '''
+        _require(scipy, "SciPy")
+        shape = sparse.shape
+        matrix = cls._sized(shape[0], shape[1], 0)
+        # Work on a copy, since summing duplicates changes it in place
+        coo = sparse.tocoo(copy=True)
+        coo.sum_duplicates()
+        matrix._load_coordinates(coo.row, coo.col, coo.data)
+        return matrix
+
+    @_reads
+    def to_numpy(self):
+        '''(Matrix) -> numpy.ndarray
+        Return a 2 dimensional NumPy array holding every value of this
+        matrix, filled in from a single pass over its stored values.
+        REQ: NumPy is installed
+        '''
+        _require(numpy, "NumPy")
+        indptr, indices, data = self._csr_arrays()
+        data = numpy.asarray(data)
+        result = numpy.full((self._rows + 1, self._cols + 1), self._default,
+                            dtype=numpy.result_type(data, self._default))
+        # Row i owns indptr[i + 1] - indptr[i] of the values
+        rows = numpy.repeat(numpy.arange(self._rows + 1),
+                            numpy.diff(numpy.asarray(indptr)))
+        result[rows, numpy.asarray(indices, dtype=numpy.intp)] = data
+        return result
+
+    @_reads
+    def to_scipy_sparse(self, format='csr'):
+        '''(Matrix, str) -> scipy.sparse matrix
+        Return a SciPy sparse matrix in the given format ('csr', 'coo',
+        'csc', ...) holding every value stored in this matrix.
+        REQ: SciPy is installed
+        REQ: the default of this matrix is 0, as SciPy assumes
+        '''
+        _require(scipy, "SciPy")
+        if(self._default != 0):
+            raise MatrixInvalidOperationError("Only a matrix with a default "
+                                              "of 0 can be made sparse.")
+        indptr, indices, data = self._csr_arrays()
+        result = scipy.sparse.csr_matrix(
+            (numpy.asarray(data), numpy.asarray(indices),
+             numpy.asarray(indptr)),
+            shape=(self._rows + 1, self._cols + 1))
+        return result.asformat(format)
+
+    @classmethod
+    def _sized(cls, m, n, default):
+        '''(type, int, int, float) -> Matrix
+        Return a new, empty m x n matrix of this class with the given
+        default.
+        '''
+        return cls(m, n, default)
+
+    def _csr_arrays(self):
+        '''(Matrix) -> (list of int, list of int, list of float)
+        Return the values of this matrix in compressed rows: the columns
+        and values of row i are indices and data from indptr[i] up to
+        indptr[i + 1].
+        '''
+        indptr = [0] * (self._rows + 2)
+        indices = []
+        data = []
+        for i, cols, vals in self._row_entries():
+            indices.extend(cols)
+            data.extend(vals)
+            indptr[i + 1] = len(indices)
+        # Rows without values end where the row above them does
+        for i in range(1, self._rows + 2):
+            if(indptr[i] < indptr[i - 1]):
+                indptr[i] = indptr[i - 1]
+        return indptr, indices, data
+
+    def _load_array(self, array):
+        '''(Matrix, numpy.ndarray) -> NoneType
+        Replace every value set in this matrix with the values of array
+        which differ from the default.
+        '''
+        rows, cols = numpy.nonzero(array != self._default)
+        self._load_coordinates(rows, cols, array[rows, cols])
+
+    def _load_coordinates(self, rows, cols, values):
+        '''(Matrix, numpy.ndarray, numpy.ndarray, numpy.ndarray) ->
+        NoneType
+        Replace every value set in this matrix with values[k] at
+        (rows[k], cols[k]) for every k, where no coordinate is repeated.
+        '''
+        # tolist gives back plain Python numbers for the nodes to hold
+        self.load_triplets(rows.tolist(), cols.tolist(), values.tolist(),
+                           'error')
 
+    def _check_triplets(self, rows, cols, values, duplicates):
+        '''(Matrix, list of int, list of int, list of float, str) ->
+        list of (int, int, float)
+        Return the triples given to load_triplets as a list sorted by
+        coordinate, keeping the order they were given in for equal
+        coordinates. Raise an error if any of them cannot be loaded.
+        '''
+        if(duplicates not in ('sum', 'last', 'error')):
+            raise MatrixInvalidOperationError("Unknown duplicate policy.")
+        if(cols is None):
+            triples = list(rows)
+        else:
+            if(len(rows) != len(cols) or len(rows) != len(values)):
+                raise MatrixDimensionError("Triplet sequences differ in size.")
+            triples = list(zip(rows, cols, values))
+        for i, j, value in triples:
+            if (i > self._rows or i < 0 or j > self._cols or j < 0):
+                raise MatrixIndexError("Dimension does not exist in the "
+                                       "Matrix.")
+        # The sort is stable, so later duplicates stay after earlier ones
+        triples.sort(key=itemgetter(0, 1))
+        return triples
+
+    def _clear(self):
+        '''(Matrix) -> NoneType
+        Remove every node from this matrix, leaving only its head.
+        '''
+        self._before_write(None)
+        self._head = MatrixNode(None)
+        self._existing_rows = []
+        self._existing_cols = []
+        self._row_index = {}
+        self._col_index = {}
+        self._row_seek = {}
+        self._col_seek = {}
+        self._pending = None
+        self._nnz = 0
+
+    @_reads
     def get_row(self, row_num):
         '''(Matrix, int) -> OneDimensionalMatrix
         Return the row_num'th row of this matrix.
@@ -357,29 +1409,23 @@ class Matrix():
         # Check if the row to be returned exists in the matrix
         if (row_num < 0 or row_num > self._rows):
             raise MatrixIndexError("Given row does not exist in this matrix.")
-        result = None
+        cols = []
+        vals = []
         # Find the row to be returned
-        curr = self._head.get_down()
-        while(curr is not None and row_num > curr.get_contents()):
-            curr = curr.get_down()
-        # If current is not pointing to the matching row index, then the
-        # row hasn't been created, so the row contains all default values
-        if(curr is None or curr.get_contents() != row_num):
-            # Create a OneDimensionalMatrix to return
-            # add 1 to the number of columns because of 0 indexing
-            result = OneDimensionalMatrix(1, self._cols + 1, self._default)
-
-        # Otherwise, the current row is linked to existing nodes
-        else:
-            result = OneDimensionalMatrix(1, self._cols + 1, self._default)
-            # Find the nodes to link to the new row matrix
+        curr = self._row_index.get(row_num)
+        # If there is no matching row index, then the row hasn't been
+        # created, so the row contains all default values
+        if(curr is not None):
+            # Otherwise, collect the values of the nodes in the row
             curr = curr.get_right()
             while(curr is not None):
-                # Copy over the values
-                result.set_val(0, curr.get_col(), curr.get_contents())
+                cols.append(curr.get_col())
+                vals.append(self._read(curr.get_contents()))
                 curr = curr.get_right()
-        return result
+        # add 1 to the number of columns because of 0 indexing
+        return _make_vector(True, self._cols + 1, self._default, cols, vals)
 
+    @_writes
     def set_row(self, row_num, new_row):
         '''(Matrix, int, OneDimensionalMatrix) -> NoneType
         Set the value of the row_num'th row of this matrix to those of new_row
@@ -409,6 +1455,7 @@ class Matrix():
                 # Use set_val to add values to self one at a time
                 self.set_val(row_num, i, new_row.get_item(i))
 
+    @_reads
     def get_col(self, col_num):
         '''(Matrix, int) -> OneDimensionalMatrix
         Return the col_num'th column of this matrix.
@@ -417,26 +1464,21 @@ class Matrix():
         # Check if the column exists in the matrix
         if (col_num > self._cols or col_num < 0):
             raise MatrixIndexError("Given column not in the matrix.")
-        result = None
+        rows = []
+        vals = []
         # Find the column to be returned
-        curr = self._head.get_right()
-        while (curr is not None and col_num > curr.get_contents()):
-            curr = curr.get_right()
-        # If current is not pointing to an index node return a default value
-        # one dimensional column matrix
-        if(curr is None or curr.get_contents() != col_num):
-            result = OneDimensionalMatrix(self._rows + 1, 1, self._default)
-        # Otherwise the current index is linked to existing nodes
-        else:
-            result = OneDimensionalMatrix(self._rows + 1, 1, self._default)
-            # Find the nodes to link to the new column matrix
+        curr = self._col_index.get(col_num)
+        # If there is no matching index node, the column is all default
+        # values. Otherwise collect the values of the nodes in the column
+        if(curr is not None):
             curr = curr.get_down()
             while(curr is not None):
-                # Copy the values to the new column matrix
-                result.set_val(curr.get_row(), 0, curr.get_contents())
+                rows.append(curr.get_row())
+                vals.append(self._read(curr.get_contents()))
                 curr = curr.get_down()
-        return result
+        return _make_vector(False, self._rows + 1, self._default, rows, vals)
 
+    @_writes
     def set_col(self, col_num, new_col):
         '''(Matrix, int, OneDimensionalMatrix) -> NoneType
         Set the value of the col_num'th column of this matrix to
@@ -465,40 +1507,299 @@ class Matrix():
                 # Use set_val to help add new values to self one at a time
                 self.set_val(i, col_num, new_col.get_item(i))
 
-    def swap_rows(self, i, j):
-        '''(Matrix, int, int) -> NoneType
-        Swap the values of rows i and j in this matrix
-        REQ: i > 0 and i <= number of rows in the matrix
-        REQ: j > 0 and j <= number of rows in the matrix
+    @_reads
+    def nnz(self):
+        '''(Matrix) -> int
+        Return the number of values stored in this matrix, which is the
+        number of entries iter_nonzero yields.
+        REQ: None
         '''
-        # Make sure the given rows are in the matrix
-        if(i < 0 or j < 0 or i > self.get_num_rows() - 1 or
-           j > self.get_num_cols() - 1):
-            raise MatrixIndexError("Given row(s) does not exist.")
-        # First, get the rows to be swapped
-        row_1 = self.get_row(i)
-        row_2 = self.get_row(j)
-        # Now switch the rows by setting them in each others place
-        self.set_row(j, row_1)
-        self.set_row(i, row_2)
+        return self._nnz
 
-    def swap_cols(self, i, j):
-        '''(Matrix, int, int) -> NoneType
-        Swap the values of columns i and j in this matrix
-        REQ: i > 0 and i <= number of columns in the matrix
-        REQ: j > 0 and j <= number of columns in the matrix
+    @_reads
+    def iter_nonzero(self, order='row'):
+        '''(Matrix, str) -> generator of (int, int, float)
+        Return a generator of (row, column, value) for every value stored in
+        this matrix, in order of rows and then columns if order is 'row', or
+        of columns and then rows if order is 'col'. Coordinates not yielded
+        hold the default value.
+        REQ: order is 'row' or 'col'
         '''
-        # Make sure the given columns are in the matrix
+        if(order == 'row'):
+            entries = self._row_entries()
+        elif(order == 'col'):
+            entries = self._col_entries()
+        else:
+            raise MatrixInvalidOperationError("Order must be 'row' or 'col'.")
+        return _flatten_entries(entries, order == 'row')
+
+    @_reads
+    def iter_row(self, row_num):
+        '''(Matrix, int) -> generator of (int, int, float)
+        Return a generator of (row, column, value) for every value stored in
+        the row_num'th row of this matrix, in order of columns.
+        REQ: row_num >= 0 and row_num <= number of rows in the matrix
+        '''
+        if (row_num < 0 or row_num > self._rows):
+            raise MatrixIndexError("Given row does not exist in this matrix.")
+        return ((row_num, j, value)
+                for j, value in self._line_items(row_num, True))
+
+    @_reads
+    def iter_col(self, col_num):
+        '''(Matrix, int) -> generator of (int, int, float)
+        Return a generator of (row, column, value) for every value stored in
+        the col_num'th column of this matrix, in order of rows.
+        REQ: col_num >= 0 and col_num <= number of columns in the matrix
+        '''
+        if (col_num > self._cols or col_num < 0):
+            raise MatrixIndexError("Given column not in the matrix.")
+        return ((i, col_num, value)
+                for i, value in self._line_items(col_num, False))
+
+    @_reads
+    def row_view(self, row_num, writable=False):
+        '''(Matrix, int, bool) -> MatrixView
+        Return a view of the row_num'th row of this matrix, which reads the
+        row in place instead of copying it. Items set through the view are
+        set in this matrix if writable is True.
+        REQ: row_num >= 0 and row_num <= number of rows in the matrix
+        '''
+        if (row_num < 0 or row_num > self._rows):
+            raise MatrixIndexError("Given row does not exist in this matrix.")
+        return MatrixView(self, row_num, True, writable)
+
+    @_reads
+    def col_view(self, col_num, writable=False):
+        '''(Matrix, int, bool) -> MatrixView
+        Return a view of the col_num'th column of this matrix, which reads
+        the column in place instead of copying it. Items set through the
+        view are set in this matrix if writable is True.
+        REQ: col_num >= 0 and col_num <= number of columns in the matrix
+        '''
+        if (col_num > self._cols or col_num < 0):
+            raise MatrixIndexError("Given column not in the matrix.")
+        return MatrixView(self, col_num, False, writable)
+
+    @_reads
+    def _line_items(self, index, is_row):
+        '''(Matrix, int, bool) -> generator of (int, float)
+        Yield the position and value of every node in row index of this
+        matrix if is_row is True, or in column index otherwise, walking the
+        chain from its index node in place.
+        '''
+        if(is_row):
+            curr = self._row_index.get(index)
+        else:
+            curr = self._col_index.get(index)
+        # A row or column without an index node has no nodes at all
+        if(curr is not None):
+            if(is_row):
+                curr = curr.get_right()
+            else:
+                curr = curr.get_down()
+            while(curr is not None):
+                if(is_row):
+                    yield curr.get_col(), self._read(curr.get_contents())
+                    curr = curr.get_right()
+                else:
+                    yield curr.get_row(), self._read(curr.get_contents())
+                    curr = curr.get_down()
+
+    @_writes
+    def swap_rows(self, i, j):
+        '''(Matrix, int, int) -> NoneType
+        Swap the values of rows i and j in this matrix
+        REQ: i > 0 and i <= number of rows in the matrix
+        REQ: j > 0 and j <= number of rows in the matrix
+        '''
+        # Make sure the given rows are in the matrix
+        if(i < 0 or j < 0 or i > self.get_num_rows() - 1 or
+           j > self.get_num_rows() - 1):
+            raise MatrixIndexError("Given row(s) does not exist.")
+        if(i == j):
+            return
+        self._before_write((i, j))
+        row_i = self._row_index.get(i)
+        row_j = self._row_index.get(j)
+        # Take the nodes of both rows out of their columns, since their
+        # place in each column depends on their row
+        moved = self._row_nodes(row_i) + self._row_nodes(row_j)
+        for node in moved:
+            self._unlink_down(node)
+        # Hand each row's chain of nodes over to the other row's index node,
+        # creating or dropping index nodes if only one of the rows exists
+        chain_i = self._take_chain(i, row_i, True)
+        chain_j = self._take_chain(j, row_j, True)
+        self._give_chain(i, chain_j, True)
+        self._give_chain(j, chain_i, True)
+        # Now relabel the nodes and put them back into their columns
+        for node in moved:
+            if(node.get_row() == i):
+                node._row = j
+            else:
+                node._row = i
+            self._link_down(node)
+
+    @_writes
+    def swap_cols(self, i, j):
+        '''(Matrix, int, int) -> NoneType
+        Swap the values of columns i and j in this matrix
+        REQ: i > 0 and i <= number of columns in the matrix
+        REQ: j > 0 and j <= number of columns in the matrix
+        '''
+        # Make sure the given columns are in the matrix
         if(i < 0 or j < 0 or i > self.get_num_cols() - 1 or
            j > self.get_num_cols() - 1):
             raise MatrixIndexError("Given column(s) does not exist.")
-        # Get the two columns to be swapped
-        col_1 = self.get_col(i)
-        col_2 = self.get_col(j)
-        # Switch the two columns
-        self.set_col(j, col_1)
-        self.set_col(i, col_2)
+        if(i == j):
+            return
+        col_i = self._col_index.get(i)
+        col_j = self._col_index.get(j)
+        # Only the rows holding either column change
+        moved = self._col_nodes(col_i) + self._col_nodes(col_j)
+        self._before_write(tuple(set(node.get_row() for node in moved)))
+        # Take the nodes of both columns out of their rows, since their
+        # place in each row depends on their column
+        for node in moved:
+            self._unlink_right(node)
+        # Hand each column's chain of nodes over to the other column's
+        # index node, as swap_rows does for rows
+        chain_i = self._take_chain(i, col_i, False)
+        chain_j = self._take_chain(j, col_j, False)
+        self._give_chain(i, chain_j, False)
+        self._give_chain(j, chain_i, False)
+        # Now relabel the nodes and put them back into their rows
+        for node in moved:
+            if(node.get_col() == i):
+                node._col = j
+            else:
+                node._col = i
+            self._link_right(node)
+
+    def _row_nodes(self, row_node):
+        '''(Matrix, MatrixNode) -> list of MatrixNode
+        Return the value nodes in the row of row_node, or an empty list if
+        row_node is None.
+        '''
+        nodes = []
+        if(row_node is not None):
+            curr = row_node.get_right()
+            while(curr is not None):
+                nodes.append(curr)
+                curr = curr.get_right()
+        return nodes
+
+    def _col_nodes(self, col_node):
+        '''(Matrix, MatrixNode) -> list of MatrixNode
+        Return the value nodes in the column of col_node, or an empty list
+        if col_node is None.
+        '''
+        nodes = []
+        if(col_node is not None):
+            curr = col_node.get_down()
+            while(curr is not None):
+                nodes.append(curr)
+                curr = curr.get_down()
+        return nodes
+
+    def _unlink_down(self, node):
+        '''(Matrix, MatrixNode) -> NoneType
+        Take node out of its column chain.
+        '''
+        col_node = self._col_index[node.get_col()]
+        prev = self._seek_down(col_node, node.get_row(), True)[0]
+        prev.set_down(node.get_down())
+        node.set_down(None)
+        if(self._seek_index):
+            self._seek_delete(self._col_seek.get(node.get_col()),
+                              node.get_row())
+
+    def _link_down(self, node):
+        '''(Matrix, MatrixNode) -> NoneType
+        Put node back into its column chain, at the place its row belongs.
+        REQ: node's column has an index node
+        '''
+        prev, curr = self._seek_down(self._col_index[node.get_col()],
+                                     node.get_row(), True)
+        prev.set_down(node)
+        node.set_down(curr)
+        if(self._seek_index):
+            self._seek_insert(self._col_seek.get(node.get_col()),
+                              node.get_row(), node)
+
+    def _unlink_right(self, node):
+        '''(Matrix, MatrixNode) -> NoneType
+        Take node out of its row chain.
+        '''
+        row_node = self._row_index[node.get_row()]
+        prev = self._seek_right(row_node, node.get_col(), True)[0]
+        prev.set_right(node.get_right())
+        node.set_right(None)
+        if(self._seek_index):
+            self._seek_delete(self._row_seek.get(node.get_row()),
+                              node.get_col())
+
+    def _link_right(self, node):
+        '''(Matrix, MatrixNode) -> NoneType
+        Put node back into its row chain, at the place its column belongs.
+        REQ: node's row has an index node
+        '''
+        prev, curr = self._seek_right(self._row_index[node.get_row()],
+                                      node.get_col(), True)
+        prev.set_right(node)
+        node.set_right(curr)
+        if(self._seek_index):
+            self._seek_insert(self._row_seek.get(node.get_row()),
+                              node.get_col(), node)
+
+    def _take_chain(self, i, index_node, is_row):
+        '''(Matrix, int, MatrixNode, bool) -> (MatrixNode, SeekList)
+        Detach the chain of nodes after index_node, the index node of row i
+        if is_row is True or of column i otherwise, and return its first
+        node along with the chain's seek overlay. Return (None, None) if
+        index_node is None.
+        '''
+        if(index_node is None):
+            return None, None
+        if(is_row):
+            first = index_node.get_right()
+            index_node.set_right(None)
+            return first, self._row_seek.pop(i, None)
+        first = index_node.get_down()
+        index_node.set_down(None)
+        return first, self._col_seek.pop(i, None)
+
+    def _give_chain(self, i, chain, is_row):
+        '''(Matrix, int, (MatrixNode, SeekList), bool) -> NoneType
+        Attach a chain taken by _take_chain to row i if is_row is True or
+        to column i otherwise, creating the index node if needed, or
+        dropping it if the chain is empty.
+        '''
+        first, overlay = chain
+        if(is_row):
+            index, add, remove, seek = (self._row_index, self._add_row_index,
+                                        self._remove_row_index,
+                                        self._row_seek)
+        else:
+            index, add, remove, seek = (self._col_index, self._add_col_index,
+                                        self._remove_col_index,
+                                        self._col_seek)
+        index_node = index.get(i)
+        if(first is None):
+            if(index_node is not None):
+                remove(i)
+        else:
+            if(index_node is None):
+                index_node = add(i)
+            if(is_row):
+                index_node.set_right(first)
+            else:
+                index_node.set_down(first)
+            if(overlay is not None):
+                seek[i] = overlay
 
+    @_writes
     def add_scalar(self, add_value):
         '''(Matrix, float) -> NoneType
         Increase all values in this matrix by add_value
@@ -507,24 +1808,13 @@ class Matrix():
         # Make sure the given value is a float
         if(type(add_value) is not int and type(add_value) is not float):
             raise MatrixInvalidOperationError("Given input is not a float.")
+        self._before_scale()
         # Add to the default value first
         self._default = self._default + add_value
-        # Now add the value to each individual node
-        curr_row = self._head.get_down()
-        curr_col = self._head.get_right()
-        # Go through each node in the matrix and add one by one
-        while(curr_row is not None):
-            # Create a nested loop to go through each column, moving down 1
-            # row at a time after visiting every column
-            curr_col = curr_row.get_right()
-            while(curr_col is not None):
-                # Add the value given to the nodes contents
-                curr_col.set_contents(curr_col.get_contents() + add_value)
-                # Move 1 column right
-                curr_col = curr_col.get_right()
-            # Move 1 row down
-            curr_row = curr_row.get_down()
+        # Leave adding the value to each individual node until it is read
+        self._transform(1, add_value)
 
+    @_writes
     def subtract_scalar(self, sub_value):
         '''Matrix, float) -> NoneType
         Decrease all values in this matrix by sub_value
@@ -533,24 +1823,14 @@ class Matrix():
         # Make sure the given value is a float
         if(type(sub_value) is not int and type(sub_value) is not float):
             raise MatrixInvalidOperationError("Given input is not a float.")
+        self._before_scale()
         # Subtract to the default value first
         self._default = self._default - sub_value
-        # Now subtract the value to each individual node
-        curr_row = self._head.get_down()
-        curr_col = self._head.get_right()
-        # Go through each node in the matrix and subtract one by one
-        while(curr_row is not None):
-            # Create a nested loop to go through each column, moving down 1
-            # row at a time after visiting every column
-            curr_col = curr_row.get_right()
-            while(curr_col is not None):
-                # subtract the value given to the nodes contents
-                curr_col.set_contents(curr_col.get_contents() - sub_value)
-                # Move 1 column right
-                curr_col = curr_col.get_right()
-            # Move 1 row down
-            curr_row = curr_row.get_down()
+        # Leave subtracting the value from each individual node until it
+        # is read
+        self._transform(1, -sub_value)
 
+    @_writes
     def multiply_scalar(self, mult_value):
         '''(Matrix, float) -> NoneType
         Multiply all values in this matrix by mult_value
@@ -559,74 +1839,531 @@ class Matrix():
         # Make sure the given value is a float
         if(type(mult_value) is not int and type(mult_value) is not float):
             raise MatrixInvalidOperationError("Given input is not a float.")
+        self._before_scale()
         # Multiply default value of matrix by the value given
         self._default = self._default * mult_value
-        # Now multiply by the value for each individual node
+        # Leave multiplying each individual node until it is read
+        self._transform(mult_value, 0)
+
+    @_writes
+    def flush(self):
+        '''(Matrix) -> NoneType
+        Apply any scalar operations still pending on this matrix to each of
+        its nodes. Reading the matrix gives the same values before and after.
+        REQ: None
+        '''
+        if(self._pending is not None):
+            # The contents of every node change, even though their values
+            # do not, so snapshots can no longer read them
+            self._before_write(None)
+            scale, shift = self._pending
+            self._pending = None
+            self._map_values(lambda value: value * scale + shift)
+
+    def _transform(self, scale, shift):
+        '''(Matrix, float, float) -> NoneType
+        Scale every node in this matrix by scale and then add shift to it,
+        by recording the operation to be applied when the nodes are read.
+        '''
+        if(self._pending is not None):
+            old_scale, old_shift = self._pending
+            scale, shift = old_scale * scale, old_shift * scale + shift
+        # Operations which cancel out leave nothing to do
+        if(scale == 1 and shift == 0):
+            self._pending = None
+        else:
+            self._pending = (scale, shift)
+
+    def _read(self, contents):
+        '''(Matrix, float) -> float
+        Return the value of a node holding contents, once any pending scalar
+        operations are applied to it.
+        '''
+        if(self._pending is not None):
+            contents = contents * self._pending[0] + self._pending[1]
+        return contents
+
+    def _unread(self, value):
+        '''(Matrix, float) -> float
+        Return the contents of a node which reads as value under the scalar
+        operations pending on this matrix, or None if no contents read as
+        exactly value, with the same type.
+        REQ: this matrix has scalar operations pending
+        '''
+        scale, shift = self._pending
+        if(scale == 0):
+            return None
+        # Whole numbers stay whole when the division leaves nothing over
+        if(type(value) is int and type(scale) is int and
+           type(shift) is int):
+            contents, left = divmod(value - shift, scale)
+            if(left != 0):
+                return None
+        else:
+            contents = (value - shift) / scale
+        read = self._read(contents)
+        if(read != value or type(read) is not type(value)):
+            return None
+        return contents
+
+    def _map_values(self, func):
+        '''(Matrix, function) -> NoneType
+        Replace the contents of every node in this matrix with func applied
+        to them.
+        '''
         curr_row = self._head.get_down()
-        curr_col = self._head.get_right()
-        # Go through each node in the matrix and multiply one by one
+        # Go through each node in the matrix one by one
         while(curr_row is not None):
             # Create a nested loop to go through each column, moving down 1
             # row at a time after visiting every column
             curr_col = curr_row.get_right()
             while(curr_col is not None):
-                # Multiply the value given to the nodes contents
-                curr_col.set_contents(curr_col.get_contents() * mult_value)
+                curr_col.set_contents(func(curr_col.get_contents()))
                 # Move 1 column right
                 curr_col = curr_col.get_right()
             # Move 1 row down
             curr_row = curr_row.get_down()
 
+    @_reads
     def add_matrix(self, adder_matrix):
         '''(Matrix, Matrix) -> Matrix
         Return a new matrix that is the sum of this matrix and adder_matrix
         REQ: adder_matrix has same dimensions as self
         '''
+        return _link_all(*self._start_sum(adder_matrix))
+
+    def _start_sum(self, adder_matrix):
+        '''(Matrix, Matrix) -> (Matrix, generator)
+        Return a blank matrix for the sum of this matrix and adder_matrix,
+        with the stream of (row, columns, values) triples to link into it,
+        or None for the stream if the sum is already complete.
+        add_matrix and add_async both build the sum this way.
+        REQ: adder_matrix has same dimensions as self
+        '''
         # Make sure the matrix are the same dimensions
         if(self.get_num_rows() != adder_matrix.get_num_rows() or
-           self.get_num_cols() is not adder_matrix.get_num_cols()):
+           self.get_num_cols() != adder_matrix.get_num_cols()):
             raise MatrixDimensionError("The matrices are not the same size.")
-        # Create a new matrix representing the sum of the other two
-        sum_matrix = Matrix(self.get_num_rows(), self.get_num_cols())
-        # Go through every row in the matrices
-        for i in range(0, self.get_num_rows()):
-            # Go through every column in the matrices
-            for j in range(0, self.get_num_cols()):
-                # Add the contents of the matrices for the current coordinate
-                sum_matrix.set_val(i, j, self.get_val(i, j) +
-                                   adder_matrix.get_val(i, j))
+        # Every coordinate without a node in either matrix adds up to the
+        # sum of the two defaults, so that is the default of the sum
+        sum_matrix = self._blank(self.get_num_rows(), self.get_num_cols(),
+                                 self._default + adder_matrix._default)
+        # Merge the rows of both matrices in order, only linking nodes
+        # whose sum differs from the new default
+        return sum_matrix, _merge_rows(self._row_entries(),
+                                       adder_matrix._row_entries(),
+                                       self._default, adder_matrix._default,
+                                       add)
+
+    @_reads
+    def transpose(self):
+        '''(Matrix) -> Matrix
+        Return a new matrix which is the transpose of this matrix
+        REQ: None
+        '''
+        return _link_all(*self._start_transpose())
+
+    def _start_transpose(self):
+        '''(Matrix) -> (Matrix, generator)
+        Return a blank matrix for the transpose of this matrix, with the
+        stream of (row, columns, values) triples to link into it.
+        transpose and transpose_async both build the transpose this way.
+        '''
+        # Reading down the columns of this matrix gives the rows of its
+        # transpose in order
+        result = self._blank(self.get_num_cols(), self.get_num_rows(),
+                             self._default)
+        return result, self._col_entries()
+
+    def _swap_axes(self):
+        '''(Matrix) -> NoneType
+        Turn this m x n matrix into its n x m transpose in place, by
+        swapping the right and down links and the row and column of every
+        node. No nodes are created or copied.
+        '''
+        row_node = self._head.get_down()
+        while(row_node is not None):
+            # Every value node is in exactly one row, so walking the rows
+            # reaches each of them once
+            curr = row_node.get_right()
+            while(curr is not None):
+                next_node = curr.get_right()
+                curr.set_right(curr.get_down())
+                curr.set_down(next_node)
+                curr._row, curr._col = curr._col, curr._row
+                curr = next_node
+            row_node = row_node.get_down()
+        # The index nodes and the head just trade their two links, so row
+        # index nodes become column index nodes and the other way around
+        for index_node in ([self._head] + list(self._row_index.values()) +
+                           list(self._col_index.values())):
+            right = index_node.get_right()
+            index_node.set_right(index_node.get_down())
+            index_node.set_down(right)
+        self._rows, self._cols = self._cols, self._rows
+        self._existing_rows, self._existing_cols = (self._existing_cols,
+                                                    self._existing_rows)
+        self._row_index, self._col_index = self._col_index, self._row_index
+        # A row's overlay lists the same nodes in the same order as the
+        # column it becomes, so the overlays carry over as they are
+        self._row_seek, self._col_seek = self._col_seek, self._row_seek
+
+    @_reads
+    def _col_entries(self):
+        '''(Matrix) -> generator of (int, list of int, list of float)
+        Yield the column number, the rows and the values of the nodes in
+        every column of this matrix that has any, in order of columns and
+        rows.
+        '''
+        col_node = self._head.get_right()
+        while(col_node is not None):
+            rows = []
+            vals = []
+            curr = col_node.get_down()
+            while(curr is not None):
+                rows.append(curr.get_row())
+                vals.append(curr.get_contents())
+                curr = curr.get_down()
+            if(self._pending is not None):
+                scale, shift = self._pending
+                vals = [value * scale + shift for value in vals]
+            if(rows):
+                yield col_node.get_contents(), rows, vals
+            col_node = col_node.get_right()
+
+    @_reads
+    def matvec(self, vector):
+        '''(Matrix, object) -> object
+        Return the product of this matrix and vector, a column of as many
+        items as this matrix has columns. vector may be a
+        OneDimensionalMatrix, a list or a NumPy array, and the result is
+        given back in the same kind of container.
+        REQ: vector has as many items as this matrix has columns
+        '''
+        items = _vector_items(vector, self.get_num_cols())
+        # Every coordinate without a node contributes default * item, so
+        # start each row from the default times the sum of the items and
+        # only correct it at the nodes
+        default = self._default
+        result = [0] * self.get_num_rows()
+        if(default != 0):
+            result = [default * sum(items)] * self.get_num_rows()
+        for i, cols, vals in self._row_entries():
+            total = 0
+            if(default != 0):
+                for k in range(len(cols)):
+                    total += (vals[k] - default) * items[cols[k]]
+            else:
+                for k in range(len(cols)):
+                    total += vals[k] * items[cols[k]]
+            result[i] = result[i] + total
+        return _vector_like(vector, result)
+
+    @_reads
+    def rmatvec(self, vector):
+        '''(Matrix, object) -> object
+        Return the product of the transpose of this matrix and vector, a
+        column of as many items as this matrix has rows. vector may be a
+        OneDimensionalMatrix, a list or a NumPy array, and the result is
+        given back in the same kind of container.
+        REQ: vector has as many items as this matrix has rows
+        '''
+        items = _vector_items(vector, self.get_num_rows())
+        default = self._default
+        result = [0] * self.get_num_cols()
+        if(default != 0):
+            result = [default * sum(items)] * self.get_num_cols()
+        # Walk the rows once, scattering each node into its column
+        for i, cols, vals in self._row_entries():
+            item = items[i]
+            for k in range(len(cols)):
+                result[cols[k]] += (vals[k] - default) * item
+        return _vector_like(vector, result)
+
+    def _blank(self, m, n, default):
+        '''(Matrix, int, int, float) -> Matrix
+        Return a new, empty m x n matrix with the given default, stored the
+        same way as this one, to hold the result of an operation.
+        '''
+        return Matrix(m, n, default)
+
+    @_reads
+    def _row_entries(self):
+        '''(Matrix) -> generator of (int, list of int, list of float)
+        Yield the row number, the columns and the values of the nodes in
+        every row of this matrix that has any, in order of rows and columns.
+        '''
+        row_node = self._head.get_down()
+        while(row_node is not None):
+            cols = []
+            vals = []
+            curr = row_node.get_right()
+            while(curr is not None):
+                cols.append(curr.get_col())
+                vals.append(curr.get_contents())
+                curr = curr.get_right()
+            if(self._pending is not None):
+                scale, shift = self._pending
+                vals = [value * scale + shift for value in vals]
+            if(cols):
+                yield row_node.get_contents(), cols, vals
+            row_node = row_node.get_down()
 
-        return sum_matrix
+    def _link_rows(self, rows):
+        '''(Matrix, iterable of (int, list of int, list of float)) ->
+        NoneType
+        Link nodes for every (row, columns, values) triple in rows into this
+        matrix in a single pass.
+        REQ: this matrix has no nodes yet
+        REQ: rows are given in increasing order, each with increasing
+        columns inside the range of the matrix
+        '''
+        # Rows arrive in order, so each new row goes below the last one
+        last_row = self._head
+        # Columns can appear in any order, so remember the bottom node of
+        # every column and only put the column index nodes in order at the
+        # end
+        col_tails = {}
+        col_index = self._col_index
+        for i, cols, vals in rows:
+            if(not cols):
+                continue
+            row_node = MatrixNode(i)
+            last_row.set_down(row_node)
+            last_row = row_node
+            self._existing_rows.append(i)
+            self._row_index[i] = row_node
+            self._nnz += len(cols)
+            prev = row_node
+            for k in range(len(cols)):
+                j = cols[k]
+                val_node = MatrixNode(vals[k], i, j)
+                prev.set_right(val_node)
+                prev = val_node
+                above = col_tails.get(j)
+                if(above is None):
+                    above = MatrixNode(j)
+                    col_index[j] = above
+                above.set_down(val_node)
+                col_tails[j] = val_node
+        # Now chain the column index nodes together in order
+        self._existing_cols = sorted(col_index)
+        prev = self._head
+        for j in self._existing_cols:
+            prev.set_right(col_index[j])
+            prev = col_index[j]
+        if(self._seek_index):
+            self._build_seek()
 
+    @_reads
     def multiply_matrix(self, mult_matrix):
         '''(Matrix, Matrix) -> Matrix
         Return a new matrix that is the product of this matrix and mult_matrix
         REQ: Matrices are MxN and NxW, that is, first matrix has an amount of
         columns equal to the second matrix's rows
         '''
+        return _link_all(*self._start_product(mult_matrix))
+
+    def _start_product(self, mult_matrix):
+        '''(Matrix, Matrix) -> (Matrix, generator)
+        Return a blank matrix for the product of this matrix and
+        mult_matrix, with the stream of (row, columns, values) triples to
+        link into it, or None for the stream if the product is already
+        complete. multiply_matrix and multiply_async both build the product
+        this way.
+        REQ: the number of columns of self equals the rows of mult_matrix
+        '''
         # Make sure the first matrix has an amount of columns equal to the
         # second matrix's rows (i.e MxN and NxW)
         if(self.get_num_cols() != mult_matrix.get_num_rows()):
             raise MatrixDimensionError("Unable to multiply given dimensions.")
-        # Create a new matrix with the first matrix's amount of columns
-        # and the second matrix's amount of rows
-        product_matrix = Matrix(self.get_num_rows(),
-                                mult_matrix.get_num_cols(), 0)
-        # Loop to go through each row
-        for i in range(0, self.get_num_rows()):
-            # Loop to go through each column
-            for j in range(0, mult_matrix.get_num_cols()):
-                # Get the dot product of the first matrix's row and the
-                # second matrix's column
-                # Essentially go through each matrices' coordinates one
-                # at a time and multiplying them respectively
-                for k in range(0, self.get_num_cols()):
-                    # Update the new matrix's values each iteration by
-                    # adding to the current value
-                    product_matrix.set_val(i, j, product_matrix.get_val(i, j) +
-                                           (self.get_val(i, k) *
-                                            mult_matrix.get_val(k, j)))
-        return product_matrix
+        # Multiplying by a diagonal matrix just scales each column of this
+        # matrix, as long as neither matrix has a default to spread around
+        if(isinstance(mult_matrix, DiagonalMatrix) and self._default == 0 and
+           mult_matrix._default == 0):
+            product_matrix = self._blank(self.get_num_rows(),
+                                         mult_matrix.get_num_cols(), 0)
+            return product_matrix, _scale_rows(self._row_entries(),
+                                               mult_matrix._diag_value, False)
+        # Every coordinate of the product away from the stored nodes works
+        # out to N times the product of the two defaults
+        product_matrix = self._blank(self.get_num_rows(),
+                                     mult_matrix.get_num_cols(),
+                                     self.get_num_cols() * self._default *
+                                     mult_matrix._default)
+        return product_matrix, self._product_rows(mult_matrix)
+
+    async def multiply_async(self, mult_matrix, progress=None):
+        '''(Matrix, Matrix, function) -> Matrix
+        Return a new matrix that is the product of this matrix and
+        mult_matrix, as multiply_matrix does, worked out in a thread of the
+        default executor so that the event loop keeps running meanwhile.
+        If progress is given, it is called in the event loop with the
+        number of rows of the product linked so far and the total number of
+        rows. Rows left at the default need no work and are not counted, so
+        the count can stay below the total until the last call, which is
+        always (total, total). Cancelling the task stops the work at the
+        next row.
+        REQ: the number of columns of self equals the rows of mult_matrix
+        REQ: neither matrix is changed until the product is done
+        '''
+        if(self.get_num_cols() != mult_matrix.get_num_rows()):
+            raise MatrixDimensionError("Unable to multiply given dimensions.")
+        return await self._run_async(
+            lambda watch: _link_all(*self._start_product(mult_matrix),
+                                    watch=watch),
+            self.get_num_rows(), progress)
+
+    async def add_async(self, adder_matrix, progress=None):
+        '''(Matrix, Matrix, function) -> Matrix
+        Return a new matrix that is the sum of this matrix and adder_matrix,
+        as add_matrix does, worked out in a thread of the default executor.
+        progress and cancelling work as they do for multiply_async.
+        REQ: adder_matrix has same dimensions as self
+        REQ: neither matrix is changed until the sum is done
+        '''
+        if(self.get_num_rows() != adder_matrix.get_num_rows() or
+           self.get_num_cols() != adder_matrix.get_num_cols()):
+            raise MatrixDimensionError("The matrices are not the same size.")
+        return await self._run_async(
+            lambda watch: _link_all(*self._start_sum(adder_matrix),
+                                    watch=watch),
+            self.get_num_rows(), progress)
+
+    async def transpose_async(self, progress=None):
+        '''(Matrix, function) -> Matrix
+        Return a new matrix which is the transpose of this matrix, as
+        transpose does, worked out in a thread of the default executor.
+        progress and cancelling work as they do for multiply_async, counting
+        the rows of the transpose.
+        REQ: this matrix is not changed until the transpose is done
+        '''
+        return await self._run_async(
+            lambda watch: _link_all(*self._start_transpose(), watch=watch),
+            self.get_num_cols(), progress)
+
+    async def _run_async(self, work, total, progress):
+        '''(Matrix, function, int, function) -> object
+        Return work(watch) called in a thread of the default executor, where
+        watch passes on a stream of (row, columns, values) triples for work
+        to consume, reporting the number of rows it has finished to
+        progress as it goes (if it is not None).
+        The work is stopped at the next row if the task is cancelled.
+        '''
+        loop = asyncio.get_running_loop()
+        stop = threading.Event()
+        # Report about every hundredth of the rows, rather than every row
+        step = max(1, total // 100)
+
+        def watch(rows):
+            done = 0
+            reported = 0
+            for row in rows:
+                if(stop.is_set()):
+                    raise asyncio.CancelledError()
+                yield row
+                # work only asks for the next row once it has linked this
+                # one, so only now is the row finished
+                done += 1
+                # The last report is left until the result is ready
+                if(progress is not None and done - reported >= step and
+                   done < total):
+                    reported = done
+                    # Callbacks run in the event loop, not in this thread
+                    loop.call_soon_threadsafe(progress, done, total)
+        future = loop.run_in_executor(None, work, watch)
+        try:
+            # Shielded, so that cancelling the task leaves the work to be
+            # stopped below rather than abandoned while it runs
+            result = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            stop.set()
+            # Wait until the thread has let go of the matrices. It stops
+            # by raising, which is expected, so the error is dropped
+            await asyncio.wait([future])
+            if(not future.cancelled()):
+                future.exception()
+            raise
+        if(progress is not None):
+            progress(total, total)
+        return result
+
+    def _product_rows(self, mult_matrix, product=_sparse_product):
+        '''(Matrix, Matrix, function) -> generator of (int, list of int,
+        list of float)
+        Yield the rows of the product of this matrix and mult_matrix which
+        differ from N * (this default) * (mult_matrix's default), in order.
+        The product of the stored parts of the two is worked out by product,
+        which takes the same arguments as _sparse_product and yields the
+        same rows.
+        REQ: the number of columns of self equals the rows of mult_matrix
+        '''
+        # Write A = A' + a*J and B = B' + b*J, where a and b are the
+        # defaults, J is all ones and A', B' are only nonzero at nodes. Then
+        # AB[i,j] = A'B'[i,j] + b*(row i sum of A') + a*(col j sum of B')
+        # + N*a*b, so the sparse product A'B' plus a few sums is exact
+        default_a = self._default
+        default_b = mult_matrix._default
+        default = self.get_num_cols() * default_a * default_b
+        rows_a = _shift_rows(self._row_entries(), default_a)
+        # Keep the rows of B' by row number, so each row of A' can pick out
+        # the rows it needs
+        rows_b = {}
+        for k, cols, vals in _shift_rows(mult_matrix._row_entries(),
+                                         default_b):
+            rows_b[k] = (cols, vals)
+        # With both defaults at 0 the product is just A'B'
+        if(default_a == 0 and default_b == 0):
+            for row in product(rows_a, rows_b):
+                yield row
+        else:
+            # Otherwise collect the row and column corrections first
+            rows_a = list(rows_a)
+            row_fix = {}
+            if(default_b != 0):
+                for i, cols, vals in rows_a:
+                    fix = default_b * sum(vals)
+                    if(fix != 0):
+                        row_fix[i] = fix
+            col_fix = {}
+            if(default_a != 0):
+                for cols, vals in rows_b.values():
+                    for k in range(len(cols)):
+                        col_fix[cols[k]] = (col_fix.get(cols[k], 0) +
+                                            vals[k])
+                col_fix = {j: default_a * col_fix[j] for j in col_fix
+                           if col_fix[j] != 0}
+            fix_cols = sorted(col_fix)
+            all_cols = range(0, mult_matrix.get_num_cols())
+            sparse_rows = product(iter(rows_a), rows_b)
+            next_row = next(sparse_rows, None)
+            # A column correction reaches every row, otherwise only the rows
+            # of A'B' and the corrected rows can differ from the default
+            if(col_fix):
+                row_nums = range(0, self.get_num_rows())
+            else:
+                row_nums = sorted(set(row_fix).union(
+                    i for i, cols, vals in rows_a if cols))
+            for i in row_nums:
+                sparse = {}
+                if(next_row is not None and next_row[0] == i):
+                    sparse = dict(zip(next_row[1], next_row[2]))
+                    next_row = next(sparse_rows, None)
+                fix = row_fix.get(i, 0)
+                if(fix != 0):
+                    cols = all_cols
+                else:
+                    cols = sorted(set(sparse).union(fix_cols))
+                result_cols = []
+                result_vals = []
+                for j in cols:
+                    val = (sparse.get(j, 0) + fix + col_fix.get(j, 0) +
+                           default)
+                    if(val != default):
+                        result_cols.append(j)
+                        result_vals.append(val)
+                if(result_cols):
+                    yield i, result_cols, result_vals
 
 
 class OneDimensionalMatrix(Matrix):
@@ -656,17 +2393,13 @@ class OneDimensionalMatrix(Matrix):
         #    self._existing_rows is empty
         #    self._existing_cols is empty
         #    self._head is the sole node in the OneDimensionalMatrix
-        self._head = MatrixNode(None)
-        self._rows = m - 1
-        self._cols = n - 1
-        self._default = default
-        self._existing_rows = []
-        self._existing_cols = []
+        Matrix.__init__(self, m, n, default)
         # The row or column must be only a single dimension, by definition
         if(self._rows != 0 and self._cols != 0 or
            self._rows < 0 or self._cols < 0):
             raise MatrixDimensionError("Invalid 1D matrix dimension input.")
 
+    @_reads
     def get_item(self, i):
         '''(OneDimensionalMatrix, int) -> float
         Return the i'th item in this matrix
@@ -690,6 +2423,7 @@ class OneDimensionalMatrix(Matrix):
             result = self.get_val(i, 0)
         return result
 
+    @_writes
     def set_item(self, i, new_val):
         '''(OneDimensionalMatrix, int, float) -> NoneType
         Set the i'th item in this matrix to new_val
@@ -709,6 +2443,7 @@ class OneDimensionalMatrix(Matrix):
                 raise MatrixIndexError("The row is not in the matrix.")
             self.set_val(i, 0, new_val)
 
+    @_reads
     def get_size(self):
         '''
         (OneDimensionalMatrix) -> int
@@ -729,110 +2464,688 @@ class OneDimensionalMatrix(Matrix):
         return result
 
 
-class SquareMatrix(Matrix):
-    '''A matrix where the number of rows and columns are equal'''
+class DenseOneDimensionalMatrix(OneDimensionalMatrix):
+    '''A 1xn or nx1 matrix which keeps every item in one flat list instead
+    of linked nodes, so any item is read or set in constant time. Suited to
+    vectors which have a value set at most of their items.'''
 
-    def __init__(self, dimensions, default=0):
+    def __init__(self, m, n, default=0):
         '''
-        (SquareMatrix, int, float) -> NoneType
-        Create a SquareMatrix.
-        REQ: dimensions is an int > 0
+        (DenseOneDimensionalMatrix, int, int, float) -> NoneType
+        Create a DenseOneDimensionalMatrix with every item set to default.
+        REQ: m is an int > 0
+        REQ: n is an int > 0
         REQ: default is some real number
         '''
-        # REPRESENTAION INVARIANT
-
-        # self._head is a single MatrixNode representing start of the matrix
-        # self._default is a float representing the default value of this
-        # matrix
-        # self._existing_rows is a list containing all existing index
-        # row node values
-        # self._existing_cols is a list containing all existing index
-        # column node values
-        # If the matrix has no manually set values, then
-        #     self._default is the value for all coordinates in the matrix
-        #     self._existing_rows is empty
-        #     self._existing_cols is empty
-        #     self._head is the sole node in SquareMatrix
-        # If there is a value at SquareMatrix[m,n] not equal to self._default
-        #     self._existing_rows contains m
-        #     self._existing_cols contains n
-        # If self._rows = n, then
-        #    self._cols = n and vice versa
+        # REPRESENTATION INVARIANT
 
-        self._head = MatrixNode(None)
-        self._default = default
-        self._rows = dimensions - 1
-        self._cols = dimensions - 1
-        self._existing_rows = []
-        self._existing_cols = []
+        # self._items is a list of self.get_size() values, where
+        # self._items[i] is the i'th item of the matrix
+        # self._nnz is the number of items which differ from self._default
+        # No nodes are ever linked to self._head
+        # Otherwise the same as for OneDimensionalMatrix
+        OneDimensionalMatrix.__init__(self, m, n, default)
+        self._items = [default] * self.get_size()
 
-    def transpose(self):
-        '''(SquareMatrix) -> NoneType
-        Transpose this matrix
-        REQ: None
+    @_reads
+    def get_item(self, i):
+        '''(DenseOneDimensionalMatrix, int) -> float
+        Return the i'th item in this matrix
+        REQ: i is an integer within the number of rows/cols the matrix has
         '''
-        # Create a new temporary matrix to hold the transposed matrix
-        transpose = SquareMatrix(self.get_num_rows())
-        # Go through every row in self and set that current row to the
-        # temporary matrix's corresponding column
-        # self[Row 1] -> transpose[Column 1]
-        for i in range(0, self.get_num_rows()):
-            transpose.set_col(i, self.get_row(i))
-        # Update this matrix so it becomes its own transpose by copying
-        # the temporary matrix
-        for i in range(0, self.get_num_cols()):
-            self.set_col(i, transpose.get_col(i))
+        if(i < 0 or i >= len(self._items)):
+            raise MatrixIndexError("The item is not in the matrix.")
+        return self._items[i]
 
-    def get_diagonal(self):
-        '''(Squarematrix) -> OneDimensionalMatrix
-        Return a one dimensional matrix with the values of the diagonal
-        of this matrix
-        REQ: None
+    @_writes
+    def set_item(self, i, new_val):
+        '''(DenseOneDimensionalMatrix, int, float) -> NoneType
+        Set the i'th item in this matrix to new_val
+        REQ: i is an integer within amount of rows/cols the matrix has
+        REQ: new_val is some real number
         '''
-        # Create a new OneDimensionalMatrix to hold the diagonal values
-        diag_matrix = OneDimensionalMatrix(1, self.get_num_rows())
-        # Go through each diagonal coordinate in the matrix
-        for i in range(0, self.get_num_rows()):
-            # Add current value of the matrix to the new 1D Matrix
-            diag_matrix.set_item(i, self.get_val(i, i))
-        return diag_matrix
+        if(i < 0 or i >= len(self._items)):
+            raise MatrixIndexError("The item is not in the matrix.")
+        self._put(i, new_val)
 
-    def set_diagonal(self, new_diagonal):
-        '''(SquareMatrix, OneDimensionalMatrix) -> NoneType
-        Set the values of the diagonal of this matrix to those of new_diagonal
-        REQ: new_diagonal is a OneDimensionalMatrix
-        REQ: the size of new_diagonal is equal to that of self's rows/cols
+    @_reads_value
+    def get_val(self, i, j):
+        '''(DenseOneDimensionalMatrix, int, int) -> float
+        Return the value of m[i,j] for this matrix m
+        REQ: i >= 0 and i <= number of rows in the matrix
+        REQ: j >= 0 and j <= number of columns in the matrix
         '''
-        # Make sure the matrix has an acceptable amount of values
-        if(new_diagonal.get_size() != self.get_num_rows()):
-            raise MatrixDimensionError("Matrix sizes not compatible.")
-        # Loop through all the columns and set the values to the diagonal
-        for i in range(0, new_diagonal.get_size()):
-            Matrix.set_val(self, i, i, new_diagonal.get_item(i))
-
-
-class SymmetricMatrix(SquareMatrix):
-    '''A Symmetric Matrix, where m[i, j] = m[j, i] for all i and j'''
+        if (i > self._rows or i < 0 or j > self._cols or j < 0):
+            raise MatrixIndexError("Dimension does not exist in the Matrix.")
+        # One of i and j is always 0, so their sum is the item's position
+        return self._items[i + j]
 
+    @_writes_value
     def set_val(self, i, j, new_val):
-        '''
-        (int, int, float) -> NoneType
-        Set the value at position [i, j] in the SymmetricMatrix to new_val,
-        and also set position [j, i] in the matrix to new_val.
+        '''(DenseOneDimensionalMatrix, int, int, float) -> NoneType
+        Set the value of m[i,j] to new_val for this matrix m
         REQ: i >= 0 and i <= number of rows in the matrix
         REQ: j >= 0 and j <= number of columns in the matrix
         REQ: new_val is some real number
         '''
-        # Make sure the given indexes are valid
-        if(i < 0 or i > self.get_num_rows() - 1 or
-           j < 0 or j > self.get_num_cols() - 1):
-            raise MatrixIndexError("Dimension does not exist in the matrix.")
-        # First set the value of the given coordinate with parent class method
-        Matrix.set_val(self, i, j, new_val)
-        # Now set the value at the matrix's mirror coordinate to be the same
-        Matrix.set_val(self, j, i, new_val)
+        if (i > self._rows or i < 0 or j > self._cols or j < 0):
+            raise MatrixIndexError("Dimension does not exist in the Matrix.")
+        self._put(i + j, new_val)
 
-    def set_row(self, row_num, new_row):
+    @_writes_value
+    def remove_val(self, i, j):
+        '''(DenseOneDimensionalMatrix, int, int) -> NoneType
+        Reset m[i,j] to the default value for this matrix m
+        REQ: i >= 0 and i <= number of rows in the matrix
+        REQ: j >= 0 and j <= number of columns in the matrix
+        '''
+        self.set_val(i, j, self._default)
+
+    @_reads
+    def get_row(self, row_num):
+        '''(DenseOneDimensionalMatrix, int) -> DenseOneDimensionalMatrix
+        Return the row_num'th row of this matrix.
+        REQ: row_num >= 0 and row_num <= number of rows in the matrix
+        '''
+        if (row_num < 0 or row_num > self._rows):
+            raise MatrixIndexError("Given row does not exist in this matrix.")
+        if(self._rows == 0):
+            return self._copy(1, self._cols + 1, self._items)
+        return self._copy(1, 1, [self._items[row_num]])
+
+    @_reads
+    def get_col(self, col_num):
+        '''(DenseOneDimensionalMatrix, int) -> DenseOneDimensionalMatrix
+        Return the col_num'th column of this matrix.
+        REQ: col_num >= 0 and col_num <= number of columns in the matrix
+        '''
+        if (col_num > self._cols or col_num < 0):
+            raise MatrixIndexError("Given column not in the matrix.")
+        if(self._cols == 0):
+            return self._copy(self._rows + 1, 1, self._items)
+        return self._copy(1, 1, [self._items[col_num]])
+
+    @_writes
+    def swap_rows(self, i, j):
+        '''(DenseOneDimensionalMatrix, int, int) -> NoneType
+        Swap the values of rows i and j in this matrix
+        REQ: i >= 0 and i <= number of rows in the matrix
+        REQ: j >= 0 and j <= number of rows in the matrix
+        '''
+        if(i < 0 or j < 0 or i > self._rows or j > self._rows):
+            raise MatrixIndexError("Given row(s) does not exist.")
+        if(self._cols == 0):
+            self._before_write((i, j))
+            self._items[i], self._items[j] = self._items[j], self._items[i]
+
+    @_writes
+    def swap_cols(self, i, j):
+        '''(DenseOneDimensionalMatrix, int, int) -> NoneType
+        Swap the values of columns i and j in this matrix
+        REQ: i >= 0 and i <= number of columns in the matrix
+        REQ: j >= 0 and j <= number of columns in the matrix
+        '''
+        if(i < 0 or j < 0 or i > self._cols or j > self._cols):
+            raise MatrixIndexError("Given column(s) does not exist.")
+        if(self._rows == 0):
+            self._before_write((0,))
+            self._items[i], self._items[j] = self._items[j], self._items[i]
+
+    @_reads
+    def transpose(self):
+        '''(DenseOneDimensionalMatrix) -> DenseOneDimensionalMatrix
+        Return a new matrix which is the transpose of this matrix
+        REQ: None
+        '''
+        return self._copy(self._cols + 1, self._rows + 1, self._items)
+
+    async def transpose_async(self, progress=None):
+        '''(DenseOneDimensionalMatrix, function) ->
+        DenseOneDimensionalMatrix
+        Return a new matrix which is the transpose of this matrix, as
+        transpose does, in a thread of the default executor. progress is
+        only called once, when it is done.
+        REQ: None
+        '''
+        return await self._run_async(lambda watch: self.transpose(),
+                                     self.get_size(), progress)
+
+    @_writes
+    def compact(self):
+        '''(DenseOneDimensionalMatrix) -> NoneType
+        Does nothing, since every item is kept in the list anyway.
+        REQ: None
+        '''
+        pass
+
+    def _copy(self, m, n, items):
+        '''(DenseOneDimensionalMatrix, int, int, list of float) ->
+        DenseOneDimensionalMatrix
+        Return a new m x n dense matrix with this matrix's default, holding
+        a copy of items.
+        '''
+        result = DenseOneDimensionalMatrix(m, n, self._default)
+        result._set_items(list(items))
+        return result
+
+    def _put(self, i, new_val):
+        '''(DenseOneDimensionalMatrix, int, float) -> NoneType
+        Set the i'th item of this matrix to new_val, keeping count of the
+        items which differ from the default.
+        '''
+        # The item is in row 0 of a row matrix, or row i of a column one
+        if(self._rows == 0):
+            self._before_write((0,))
+        else:
+            self._before_write((i,))
+        default = self._default
+        self._nnz += (new_val != default) - (self._items[i] != default)
+        self._items[i] = new_val
+
+    def _set_items(self, items):
+        '''(DenseOneDimensionalMatrix, list of float) -> NoneType
+        Replace the items of this matrix with items, of the same size.
+        '''
+        self._before_write(None)
+        default = self._default
+        self._items = items
+        self._nnz = sum(1 for value in items if value != default)
+
+    def _before_scale(self):
+        '''(DenseOneDimensionalMatrix) -> NoneType
+        Get ready for a scalar operation on this matrix, which changes
+        every item at once.
+        '''
+        self._before_write(None)
+
+    def _transform(self, scale, shift):
+        '''(DenseOneDimensionalMatrix, float, float) -> NoneType
+        Scale every item in this matrix by scale and then add shift to it.
+        '''
+        self._set_items([value * scale + shift for value in self._items])
+
+    @_reads
+    def _line_items(self, index, is_row):
+        '''(DenseOneDimensionalMatrix, int, bool) -> generator of
+        (int, float)
+        Yield the position and value of every item different from the
+        default in row index of this matrix if is_row is True, or in column
+        index otherwise.
+        '''
+        default = self._default
+        items = self._items
+        if(is_row == (self._rows == 0)):
+            for k in range(len(items)):
+                if(items[k] != default):
+                    yield k, items[k]
+        elif(items[index] != default):
+            yield 0, items[index]
+
+    @_reads
+    def _row_entries(self):
+        '''(DenseOneDimensionalMatrix) -> generator of (int, list of int,
+        list of float)
+        Yield the row number, the columns and the values of every row of
+        this matrix with an item different from the default, in order.
+        '''
+        default = self._default
+        items = self._items
+        if(self._rows == 0):
+            cols = [j for j in range(len(items)) if items[j] != default]
+            if(cols):
+                yield 0, cols, [items[j] for j in cols]
+        else:
+            for i in range(len(items)):
+                if(items[i] != default):
+                    yield i, [0], [items[i]]
+
+    @_reads
+    def _col_entries(self):
+        '''(DenseOneDimensionalMatrix) -> generator of (int, list of int,
+        list of float)
+        Yield the column number, the rows and the values of every column of
+        this matrix with an item different from the default, in order.
+        '''
+        for j, rows, vals in self.transpose()._row_entries():
+            yield j, rows, vals
+
+    def _link_rows(self, rows):
+        '''(DenseOneDimensionalMatrix, iterable of (int, list of int,
+        list of float)) -> NoneType
+        Set the items of this matrix from the (row, columns, values) triples
+        in rows.
+        '''
+        for i, cols, vals in rows:
+            for k in range(len(cols)):
+                self._put(i + cols[k], vals[k])
+
+    def _clear(self):
+        '''(DenseOneDimensionalMatrix) -> NoneType
+        Reset every item of this matrix to the default.
+        '''
+        self._before_write(None)
+        self._items = [self._default] * len(self._items)
+        self._nnz = 0
+
+
+class SquareMatrix(Matrix):
+    '''A matrix where the number of rows and columns are equal'''
+
+    def __init__(self, dimensions, default=0):
+        '''
+        (SquareMatrix, int, float) -> NoneType
+        Create a SquareMatrix.
+        REQ: dimensions is an int > 0
+        REQ: default is some real number
+        '''
+        # REPRESENTAION INVARIANT
+
+        # self._head is a single MatrixNode representing start of the matrix
+        # self._default is a float representing the default value of this
+        # matrix
+        # self._existing_rows is a list containing all existing index
+        # row node values
+        # self._existing_cols is a list containing all existing index
+        # column node values
+        # If the matrix has no manually set values, then
+        #     self._default is the value for all coordinates in the matrix
+        #     self._existing_rows is empty
+        #     self._existing_cols is empty
+        #     self._head is the sole node in SquareMatrix
+        # If there is a value at SquareMatrix[m,n] not equal to self._default
+        #     self._existing_rows contains m
+        #     self._existing_cols contains n
+        # If self._rows = n, then
+        #    self._cols = n and vice versa
+
+        Matrix.__init__(self, dimensions, dimensions, default)
+
+    @classmethod
+    def from_triplets(cls, dimensions, rows, cols=None, values=None,
+                      default=0, duplicates='sum'):
+        '''(type, int, list of int, list of int, list of float, float, str)
+        -> SquareMatrix
+        Return a new square matrix of the given dimensions and default,
+        holding values[k] at (rows[k], cols[k]) for every k. If cols and
+        values are not given, rows is an iterable of (row, col, value)
+        triples instead. See Matrix.load_triplets for how duplicate
+        coordinates are handled.
+        REQ: dimensions is an int > 0
+        '''
+        matrix = cls._sized(dimensions, dimensions, default)
+        matrix.load_triplets(rows, cols, values, duplicates)
+        return matrix
+
+    @classmethod
+    def _sized(cls, m, n, default):
+        '''(type, int, int, float) -> SquareMatrix
+        Return a new, empty m x n matrix of this class with the given
+        default.
+        REQ: m == n
+        '''
+        if(m != n):
+            raise MatrixDimensionError("Matrix must be square.")
+        return cls(m, default)
+
+    @_writes
+    def transpose(self):
+        '''(SquareMatrix) -> NoneType
+        Transpose this matrix
+        REQ: None
+        '''
+        self._before_write(None)
+        # Turn every row into a column in place by relinking the nodes
+        self._swap_axes()
+
+    async def transpose_async(self, progress=None):
+        '''(SquareMatrix, function) -> NoneType
+        Transpose this matrix in place, as transpose does, in a thread of
+        the default executor. progress is only called once, when it is
+        done, as the nodes are relinked in a single pass.
+        REQ: this matrix is not read or changed until it is done
+        '''
+        return await self._run_async(lambda watch: self.transpose(),
+                                     self.get_num_rows(), progress)
+
+    @_reads
+    def get_diagonal(self):
+        '''(Squarematrix) -> OneDimensionalMatrix
+        Return a one dimensional matrix with the values of the diagonal
+        of this matrix
+        REQ: None
+        '''
+        # The diagonal is read in full, so hold it in a dense 1D matrix
+        diag_matrix = DenseOneDimensionalMatrix(1, self.get_num_rows())
+        # Go through each diagonal coordinate in the matrix
+        for i in range(0, self.get_num_rows()):
+            # Add current value of the matrix to the new 1D Matrix
+            diag_matrix.set_item(i, self.get_val(i, i))
+        return diag_matrix
+
+    @_writes
+    def set_diagonal(self, new_diagonal):
+        '''(SquareMatrix, OneDimensionalMatrix) -> NoneType
+        Set the values of the diagonal of this matrix to those of new_diagonal
+        REQ: new_diagonal is a OneDimensionalMatrix
+        REQ: the size of new_diagonal is equal to that of self's rows/cols
+        '''
+        # Make sure the matrix has an acceptable amount of values
+        if(new_diagonal.get_size() != self.get_num_rows()):
+            raise MatrixDimensionError("Matrix sizes not compatible.")
+        # Loop through all the columns and set the values to the diagonal
+        for i in range(0, new_diagonal.get_size()):
+            Matrix.set_val(self, i, i, new_diagonal.get_item(i))
+
+
+class SymmetricMatrix(SquareMatrix):
+    '''A Symmetric Matrix, where m[i, j] = m[j, i] for all i and j'''
+
+    # REPRESENTATION INVARIANT
+
+    # Only the upper triangle is stored: every node at [i, j] has i <= j,
+    # and SymmetricMatrix[j, i] is read from the node at [i, j]
+    # self._diag_nnz is the number of nodes on the diagonal, which unlike
+    # the rest stand for a single value each
+    # Otherwise the same as for SquareMatrix
+
+    def __init__(self, dimensions, default=0):
+        '''(SymmetricMatrix, int, float) -> NoneType
+        Create a new dimensions x dimensions symmetric matrix with all values
+        set to default
+        REQ: dimensions is an int > 0
+        REQ: default is some real number
+        '''
+        SquareMatrix.__init__(self, dimensions, default)
+        self._diag_nnz = 0
+
+    @_reads_value
+    def get_val(self, i, j):
+        '''
+        (SymmetricMatrix, int, int) -> float
+        Return the value at position [i, j] in the SymmetricMatrix, which is
+        also the value at position [j, i].
+        REQ: i >= 0 and i <= number of rows in the matrix
+        REQ: j >= 0 and j <= number of columns in the matrix
+        '''
+        return Matrix.get_val(self, min(i, j), max(i, j))
+
+    @_writes_value
+    def set_val(self, i, j, new_val):
+        '''
+        (int, int, float) -> NoneType
+        Set the value at position [i, j] in the SymmetricMatrix to new_val,
+        and also set position [j, i] in the matrix to new_val.
+        REQ: i >= 0 and i <= number of rows in the matrix
+        REQ: j >= 0 and j <= number of columns in the matrix
+        REQ: new_val is some real number
+        '''
+        # Make sure the given indexes are valid
+        if(i < 0 or i > self.get_num_rows() - 1 or
+           j < 0 or j > self.get_num_cols() - 1):
+            raise MatrixIndexError("Dimension does not exist in the matrix.")
+        # Both coordinates share the one node in the upper triangle
+        Matrix.set_val(self, min(i, j), max(i, j), new_val)
+
+    @_writes_value
+    def remove_val(self, i, j):
+        '''
+        (SymmetricMatrix, int, int) -> NoneType
+        Reset position [i, j] and its mirror [j, i] in the SymmetricMatrix
+        to the default value.
+        REQ: i >= 0 and i <= number of rows in the matrix
+        REQ: j >= 0 and j <= number of columns in the matrix
+        '''
+        before = self._nnz
+        Matrix.remove_val(self, min(i, j), max(i, j))
+        if(i == j):
+            self._diag_nnz -= before - self._nnz
+
+    def _before_set(self, i, j):
+        '''(SymmetricMatrix, int, int) -> NoneType
+        Get ready for the value at [i, j] of this matrix, and so at [j, i],
+        to change.
+        '''
+        self._before_write((i, j))
+
+    def _stored_items(self, index, is_row, pending):
+        '''(SymmetricMatrix, int, bool, tuple) -> list of (int, float)
+        Return the position and value of every stored entry in row index
+        of this matrix, which is also column index, reading the nodes as if
+        pending, a pair (scale, shift) or None, were the scalar operations
+        pending on this matrix.
+        '''
+        scale, shift = pending or (1, 0)
+        # Nodes above the diagonal in column index, then those of row index
+        nodes = [(pos, node) for pos, node in self._line_nodes(index, False)
+                 if pos < index]
+        nodes.extend(self._line_nodes(index, True))
+        return [(pos, node.get_contents() * scale + shift)
+                for pos, node in nodes]
+
+    @_reads
+    def nnz(self):
+        '''(SymmetricMatrix) -> int
+        Return the number of values stored in this matrix, counting every
+        node off the diagonal twice since it stands for [i, j] and [j, i].
+        REQ: None
+        '''
+        return 2 * self._nnz - self._diag_nnz
+
+    def _link_node(self, val_node, prev, curr, col_node):
+        '''(SymmetricMatrix, MatrixNode, MatrixNode, MatrixNode,
+        MatrixNode) -> NoneType
+        Link val_node into the matrix, counting it if it is on the diagonal.
+        '''
+        Matrix._link_node(self, val_node, prev, curr, col_node)
+        if(val_node.get_row() == val_node.get_col()):
+            self._diag_nnz += 1
+
+    def _write_in_place(self, i, j, new_val):
+        '''(SymmetricMatrix, int, int, float) -> NoneType
+        Return None, since every write to this matrix may touch the row
+        and column of its mirror as well.
+        '''
+        return None
+
+    def _link_rows(self, rows):
+        '''(SymmetricMatrix, iterable of (int, list of int,
+        list of float)) -> NoneType
+        Link nodes for every (row, columns, values) triple in rows, which
+        all lie in the upper triangle, into this matrix in a single pass.
+        '''
+        def count_diagonal(rows):
+            for i, cols, vals in rows:
+                # Columns are sorted and never left of the diagonal
+                if(cols and cols[0] == i):
+                    self._diag_nnz += 1
+                yield i, cols, vals
+        Matrix._link_rows(self, count_diagonal(rows))
+
+    def _clear(self):
+        '''(SymmetricMatrix) -> NoneType
+        Remove every node from this matrix, leaving only its head.
+        '''
+        Matrix._clear(self)
+        self._diag_nnz = 0
+
+    @_reads
+    def get_row(self, row_num):
+        '''
+        (SymmetricMatrix, int) -> OneDimensionalMatrix
+        Return the row_num'th row of this matrix.
+        REQ: row_num >= 0 and row_num <= number of rows in the matrix
+        '''
+        if (row_num < 0 or row_num > self._rows):
+            raise MatrixIndexError("Given row does not exist in this matrix.")
+        cols, vals = self._mirror_entries(row_num)
+        return _make_vector(True, self._cols + 1, self._default, cols, vals)
+
+    @_reads
+    def get_col(self, col_num):
+        '''
+        (SymmetricMatrix, int) -> OneDimensionalMatrix
+        Return the col_num'th column of this matrix, which holds the same
+        values as the col_num'th row.
+        REQ: col_num >= 0 and col_num <= number of columns in the matrix
+        '''
+        if (col_num > self._cols or col_num < 0):
+            raise MatrixIndexError("Given column not in the matrix.")
+        rows, vals = self._mirror_entries(col_num)
+        return _make_vector(False, self._rows + 1, self._default, rows, vals)
+
+    @_writes
+    def load_triplets(self, rows, cols=None, values=None, duplicates='sum'):
+        '''(SymmetricMatrix, list of int, list of int, list of float, str)
+        -> NoneType
+        Replace every value set in this matrix with values[k] at both
+        (rows[k], cols[k]) and (cols[k], rows[k]) for every k. Since those
+        two are the same value, giving both of them counts as a duplicate.
+        See Matrix.load_triplets for the rest.
+        REQ: every coordinate is within the matrix
+        '''
+        if(cols is not None):
+            if(len(rows) != len(cols) or len(rows) != len(values)):
+                raise MatrixDimensionError("Triplet sequences differ in size.")
+            rows = zip(rows, cols, values)
+        # Bring every coordinate into the upper triangle before sorting, so
+        # the order duplicates were given in still counts
+        upper = [(min(i, j), max(i, j), value) for i, j, value in rows]
+        upper = self._check_triplets(upper, None, None, duplicates)
+        self._clear()
+        self._link_rows(_group_triplets(upper, duplicates))
+
+    def _load_coordinates(self, rows, cols, values):
+        '''(SymmetricMatrix, numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        -> NoneType
+        Replace every value set in this matrix with values[k] at
+        (rows[k], cols[k]) for every k, where no coordinate is repeated.
+        Raise an error unless the values given are symmetric.
+        '''
+        upper = rows <= cols
+        lower = rows >= cols
+        # Sort the upper triangle by (row, col) and the lower by (col, row),
+        # so each value lines up with its mirror if the values are symmetric
+        up = numpy.lexsort((cols[upper], rows[upper]))
+        down = numpy.lexsort((rows[lower], cols[lower]))
+        if(not (numpy.array_equal(rows[upper][up], cols[lower][down]) and
+                numpy.array_equal(cols[upper][up], rows[lower][down]) and
+                numpy.array_equal(values[upper][up], values[lower][down]))):
+            raise MatrixInvalidOperationError("Values given are not "
+                                              "symmetric.")
+        Matrix._load_coordinates(self, rows[upper], cols[upper],
+                                 values[upper])
+
+    @_reads
+    def matvec(self, vector):
+        '''(SymmetricMatrix, object) -> object
+        Return the product of this matrix and vector, as in Matrix.matvec.
+        Each stored node is used for both of its positions, so the product
+        takes a single pass over the upper triangle.
+        REQ: vector has as many items as this matrix has columns
+        '''
+        items = _vector_items(vector, self.get_num_cols())
+        default = self._default
+        result = [0] * self.get_num_rows()
+        if(default != 0):
+            result = [default * sum(items)] * self.get_num_rows()
+        for i, cols, vals in Matrix._row_entries(self):
+            item = items[i]
+            total = 0
+            for k in range(len(cols)):
+                value = vals[k] - default
+                total += value * items[cols[k]]
+                # The mirrored node [j, i] adds to row j
+                if(cols[k] != i):
+                    result[cols[k]] += value * item
+            result[i] += total
+        return _vector_like(vector, result)
+
+    @_reads
+    def rmatvec(self, vector):
+        '''(SymmetricMatrix, object) -> object
+        Return the product of the transpose of this matrix and vector, which
+        is the same as its product with vector.
+        REQ: vector has as many items as this matrix has rows
+        '''
+        return self.matvec(vector)
+
+    def _mirror_entries(self, i):
+        '''(SymmetricMatrix, int) -> (list of int, list of float)
+        Return the columns and values of the stored entries of row i, in
+        order. Those left of the diagonal are the nodes above it in column
+        i, and the rest are the nodes of row i itself.
+        '''
+        cols = []
+        vals = []
+        col_node = self._col_index.get(i)
+        if(col_node is not None):
+            curr = col_node.get_down()
+            while(curr is not None and curr.get_row() < i):
+                cols.append(curr.get_row())
+                vals.append(self._read(curr.get_contents()))
+                curr = curr.get_down()
+        row_node = self._row_index.get(i)
+        if(row_node is not None):
+            curr = row_node.get_right()
+            while(curr is not None):
+                cols.append(curr.get_col())
+                vals.append(self._read(curr.get_contents()))
+                curr = curr.get_right()
+        return cols, vals
+
+    @_reads
+    def _line_items(self, index, is_row):
+        '''(SymmetricMatrix, int, bool) -> generator of (int, float)
+        Yield the position and value of every stored entry in row index of
+        this matrix, which is also column index, reading the nodes above
+        the diagonal in column index and then those of row index in place.
+        '''
+        col_node = self._col_index.get(index)
+        if(col_node is not None):
+            curr = col_node.get_down()
+            while(curr is not None and curr.get_row() < index):
+                yield curr.get_row(), self._read(curr.get_contents())
+                curr = curr.get_down()
+        row_node = self._row_index.get(index)
+        if(row_node is not None):
+            curr = row_node.get_right()
+            while(curr is not None):
+                yield curr.get_col(), self._read(curr.get_contents())
+                curr = curr.get_right()
+
+    @_reads
+    def _row_entries(self):
+        '''(SymmetricMatrix) -> generator of (int, list of int,
+        list of float)
+        Yield the row number, the columns and the values of every row of
+        this matrix that has any stored entries, mirrored from the upper
+        triangle, in order of rows and columns.
+        '''
+        # Row i has entries if row i or column i has nodes
+        for i in sorted(set(self._existing_rows).union(self._existing_cols)):
+            cols, vals = self._mirror_entries(i)
+            yield i, cols, vals
+
+    @_reads
+    def _col_entries(self):
+        '''(SymmetricMatrix) -> generator of (int, list of int,
+        list of float)
+        Yield the column number, the rows and the values of every column of
+        this matrix that has any stored entries, in order.
+        '''
+        return self._row_entries()
+
+    @_reads
+    def transpose(self):
+        '''
+        (SymmetricMatrix) -> NoneType
+        Transpose this matrix, which leaves it as it is.
+        REQ: None
+        '''
+        pass
+
+    @_writes
+    def set_row(self, row_num, new_row):
         '''
         (SymmetricMatrix, int, OneDimensionalMatrix) -> NoneType
         Will raise an error if the user attempts to set an row.
@@ -840,6 +3153,7 @@ class SymmetricMatrix(SquareMatrix):
         '''
         raise MatrixInvalidOperationError("Cannot change any rows.")
 
+    @_writes
     def set_col(self, col_num, new_col):
         '''
         (SymmetricMatrix, int, OneDimensionalMatrix) -> NoneType
@@ -848,6 +3162,7 @@ class SymmetricMatrix(SquareMatrix):
         '''
         raise MatrixInvalidOperationError("Cannot change any values.")
 
+    @_writes
     def swap_rows(self, i, j):
         '''
         (SymmetricMatrix, int, int) -> NoneType
@@ -856,6 +3171,7 @@ class SymmetricMatrix(SquareMatrix):
         '''
         raise MatrixInvalidOperationError("Cannot swap any rows given type.")
 
+    @_writes
     def swap_cols(self, i, j):
         '''
         (SymmetricMatrix, int, int) -> NoneType
@@ -870,52 +3186,317 @@ class DiagonalMatrix(SquareMatrix, OneDimensionalMatrix):
 
     def __init__(self, dimensions, default=0):
         '''
-        (DiagonalMatrix, int, float) -> NoneType
-        Create a diagonal matrix.
-        REQ: dimensions is an int > 0
-        REQ: default is some real number
+        (DiagonalMatrix, int, float) -> NoneType
+        Create a diagonal matrix.
+        REQ: dimensions is an int > 0
+        REQ: default is some real number
+        '''
+        # REPRESENTATION INVARIANT
+
+        # (self._rows == self._cols) + 1 is the number of rows and columns
+        # in the matrix (0 indexing used)
+        # self._default is 0, and is the value for all non-diagonal indexes
+        # self._diag_default is the default for all diagonal indexes
+        # self._diagonal is None if every diagonal index holds
+        # self._diag_default, and otherwise a list where
+        # self._diagonal[k] is DiagonalMatrix[k,k]
+        # No nodes are ever linked to self._head
+        # If there are no manually set values in the DiagonalMatrix
+        #    self._diagonal is None
+        #    DiagonalMatrix[i,j] for all i != j is 0
+        #    DiagonalMatrix[k,k] is self._diag_default
+
+        # Call the parent class init to intialize some variables
+        # Enter 0 as default since non-diagonal entries will be 0
+        super(DiagonalMatrix, self).__init__(dimensions, 0)
+        self._diag_default = default
+        # The diagonal is only stored once a value on it is set
+        self._diagonal = None
+
+    @_reads_value
+    def get_val(self, i, j):
+        '''
+        (DiagonalMatrix, int, int) -> float
+        Return the value at position [i,j] in the matrix
+        REQ: i is a number within the first and last row in the matrix
+        REQ: j is a number wihin the first and last column in the matrix
+        '''
+        if (i > self._rows or i < 0 or j > self._cols or j < 0):
+            raise MatrixIndexError("Dimension does not exist in the Matrix.")
+        result = self._default
+        if(i == j):
+            result = self._diag_value(i)
+        return result
+
+    @_writes_value
+    def set_val(self, i, j, new_val):
+        '''
+        (DiagonalMatrix, int, int, float) -> NoneType
+        Set value at position [i,j] in the matrix to new_val
+        REQ: i is a number within the first and last row in the matrix
+        REQ: j is a number wihin the first and last column in the matrix
+        '''
+        if (i > self._rows or i < 0 or j > self._cols or j < 0):
+            raise MatrixIndexError("Dimension does not exist in the Matrix.")
+        # Check if an attempt was made to set a non-diagonal value
+        if(i != j):
+            raise MatrixInvalidOperationError("Non-diagonal values must be 0.")
+        self._before_set(i, j)
+        # If not, set the value at the new position
+        if(self._diagonal is None):
+            self._diagonal = [self._diag_default] * (self._rows + 1)
+        self._diagonal[i] = new_val
+
+    @_writes_value
+    def remove_val(self, i, j):
+        '''
+        (DiagonalMatrix, int, int) -> NoneType
+        Reset the value at position [i,j] in the matrix to the value of the
+        non-diagonal indexes.
+        REQ: i is a number within the first and last row in the matrix
+        REQ: j is a number wihin the first and last column in the matrix
+        '''
+        if (i > self._rows or i < 0 or j > self._cols or j < 0):
+            raise MatrixIndexError("Dimension does not exist in the Matrix.")
+        if(i == j):
+            self.set_val(i, j, self._default)
+
+    @_writes
+    def load_triplets(self, rows, cols=None, values=None, duplicates='sum'):
+        '''(DiagonalMatrix, list of int, list of int, list of float, str)
+        -> NoneType
+        Replace every value set in this matrix with values[k] at
+        (rows[k], cols[k]) for every k, as in Matrix.load_triplets. Raise
+        an error if any coordinate is off the diagonal.
+        REQ: every coordinate is within the matrix
+        '''
+        triples = self._check_triplets(rows, cols, values, duplicates)
+        for i, j, value in triples:
+            if(i != j):
+                raise MatrixInvalidOperationError("Non-diagonal values must "
+                                                  "be 0.")
+        self._clear()
+        self._link_rows(_group_triplets(triples, duplicates))
+
+    def _load_array(self, array):
+        '''(DiagonalMatrix, numpy.ndarray) -> NoneType
+        Replace the diagonal of this matrix with the diagonal of array.
+        Raise an error if any value off the diagonal is not 0.
+        '''
+        off_diagonal = array != 0
+        numpy.fill_diagonal(off_diagonal, False)
+        if(off_diagonal.any()):
+            raise MatrixInvalidOperationError("Non-diagonal values must be "
+                                              "0.")
+        self._clear()
+        self._diagonal = array.diagonal().tolist()
+
+    @_reads
+    def get_row(self, row_num):
+        '''
+        (DiagonalMatrix, int) -> OneDimensionalMatrix
+        Return the row_num'th row of this matrix.
+        REQ: row_num is a number within the first and last row in the matrix
+        '''
+        if (row_num < 0 or row_num > self._rows):
+            raise MatrixIndexError("Given row does not exist in this matrix.")
+        return _make_vector(True, self._cols + 1, self._default, [row_num],
+                            [self._diag_value(row_num)])
+
+    @_reads
+    def get_col(self, col_num):
+        '''
+        (DiagonalMatrix, int) -> OneDimensionalMatrix
+        Return the col_num'th column of this matrix.
+        REQ: col_num is a number within the first and last column
+        '''
+        if (col_num > self._cols or col_num < 0):
+            raise MatrixIndexError("Given column not in the matrix.")
+        return _make_vector(False, self._rows + 1, self._default, [col_num],
+                            [self._diag_value(col_num)])
+
+    @_reads
+    def get_diagonal(self):
+        '''
+        (DiagonalMatrix) -> OneDimensionalMatrix
+        Return a one dimensional matrix with the values of the diagonal
+        of this matrix
+        REQ: None
+        '''
+        # A diagonal which was never set is all one value, which is exactly
+        # an empty OneDimensionalMatrix with that default
+        diag_matrix = OneDimensionalMatrix(1, self._rows + 1,
+                                           self._diag_default)
+        if(self._diagonal is not None):
+            diag_matrix = DenseOneDimensionalMatrix(1, self._rows + 1)
+            diag_matrix._set_items(list(self._diagonal))
+        return diag_matrix
+
+    @_writes
+    def set_diagonal(self, new_diagonal):
+        '''
+        (DiagonalMatrix, OneDimensionalMatrix) -> NoneType
+        Set the values of the diagonal of this matrix to those of
+        new_diagonal
+        REQ: the size of new_diagonal is equal to that of self's rows/cols
+        '''
+        if(new_diagonal.get_size() != self.get_num_rows()):
+            raise MatrixDimensionError("Matrix sizes not compatible.")
+        self._before_write(None)
+        self._diagonal = [new_diagonal.get_item(i)
+                          for i in range(0, new_diagonal.get_size())]
+
+    @_reads
+    def transpose(self):
+        '''
+        (DiagonalMatrix) -> NoneType
+        Transpose this matrix, which leaves it as it is.
+        REQ: None
+        '''
+        pass
+
+    @_writes
+    def compact(self):
+        '''
+        (DiagonalMatrix) -> NoneType
+        Does nothing, since a diagonal matrix keeps no nodes.
+        REQ: None
+        '''
+        pass
+
+    def _start_sum(self, adder_matrix):
+        '''
+        (DiagonalMatrix, Matrix) -> (Matrix, generator)
+        Return the sum of this matrix and adder_matrix as Matrix._start_sum
+        does. The sum of two diagonal matrices is found one diagonal index
+        at a time, and is itself a DiagonalMatrix, which is complete.
+        REQ: adder_matrix has same dimensions as self
+        '''
+        if(not isinstance(adder_matrix, DiagonalMatrix) or
+           self._default != 0 or adder_matrix._default != 0):
+            return Matrix._start_sum(self, adder_matrix)
+        if(self.get_num_rows() != adder_matrix.get_num_rows()):
+            raise MatrixDimensionError("The matrices are not the same size.")
+        sum_matrix = DiagonalMatrix(self.get_num_rows(),
+                                    self._diag_default +
+                                    adder_matrix._diag_default)
+        if(self._diagonal is not None or adder_matrix._diagonal is not None):
+            sum_matrix._diagonal = [self._diag_value(i) +
+                                    adder_matrix._diag_value(i)
+                                    for i in range(0, self._rows + 1)]
+        return sum_matrix, None
+
+    def _start_product(self, mult_matrix):
+        '''
+        (DiagonalMatrix, Matrix) -> (Matrix, generator)
+        Return the product of this matrix and mult_matrix as
+        Matrix._start_product does. Multiplying by a diagonal matrix just
+        scales each row of mult_matrix, and the product of two diagonal
+        matrices is itself a DiagonalMatrix, which is complete.
+        REQ: self has as many columns as mult_matrix has rows
+        '''
+        if(self.get_num_cols() != mult_matrix.get_num_rows()):
+            raise MatrixDimensionError("Unable to multiply given dimensions.")
+        # Scaling rows leaves mult_matrix's default as it is in every row
+        # only when both defaults are 0, so otherwise do the full product
+        if(self._default != 0 or mult_matrix._default != 0):
+            return Matrix._start_product(self, mult_matrix)
+        if(isinstance(mult_matrix, DiagonalMatrix)):
+            product_matrix = DiagonalMatrix(self.get_num_rows(),
+                                            self._diag_default *
+                                            mult_matrix._diag_default)
+            if(self._diagonal is not None or
+               mult_matrix._diagonal is not None):
+                product_matrix._diagonal = [self._diag_value(i) *
+                                            mult_matrix._diag_value(i)
+                                            for i in range(0, self._rows + 1)]
+            return product_matrix, None
+        product_matrix = Matrix(self.get_num_rows(),
+                                mult_matrix.get_num_cols(), 0)
+        return product_matrix, _scale_rows(mult_matrix._row_entries(),
+                                           self._diag_value, True)
+
+    @_reads
+    def nnz(self):
+        '''(DiagonalMatrix) -> int
+        Return the number of values stored in this matrix, which is every
+        index of the diagonal.
+        REQ: None
+        '''
+        return self._rows + 1
+
+    def _diag_value(self, i):
+        '''(DiagonalMatrix, int) -> float
+        Return the value at position [i,i] in the matrix.
+        '''
+        if(self._diagonal is None):
+            return self._diag_default
+        return self._diagonal[i]
+
+    def _before_scale(self):
+        '''(DiagonalMatrix) -> NoneType
+        Get ready for a scalar operation on this matrix, which changes
+        every diagonal value at once.
+        '''
+        self._before_write(None)
+
+    def _transform(self, scale, shift):
+        '''(DiagonalMatrix, float, float) -> NoneType
+        Scale every diagonal value in this matrix by scale and then add shift
+        to it.
+        '''
+        self._diag_default = self._diag_default * scale + shift
+        if(self._diagonal is not None):
+            self._diagonal = [value * scale + shift
+                              for value in self._diagonal]
+
+    @_reads
+    def _line_items(self, index, is_row):
+        '''(DiagonalMatrix, int, bool) -> generator of (int, float)
+        Yield the position and value of the diagonal entry in row (or
+        column) index of this matrix.
         '''
-        # REPRESENTATION INVARIANT
+        yield index, self._diag_value(index)
 
-        # self._head is the first node in the DiagonalMatrix
-        # (self._rows == self._cols) + 1 is the number of rows and columns
-        # in the matrix (0 indexing used)
-        # self._existing_rows is a list containing the existing row index
-        # nodes in the matrix
-        # self._existing_cols is a list containing the existing col index
-        # nodes in the matrix
-        # self._default is 0, and is the value for all non-diagonal indexes
-        # self._diag_default is the default for all diagonal indexes
-        # If there are no manually set values in the DiagonalMatrix
-        #    self._head is the sole node in the matrix
-        #    self._existing_rows is empty
-        #    self._existing_cols is empty
-        #    DiagonalMatrix[i,j] for all i != j is 0
-        #    DiagonalMatrix[k,k] is self._diag_default
+    @_reads
+    def _row_entries(self):
+        '''(DiagonalMatrix) -> generator of (int, list of int,
+        list of float)
+        Yield the row number, the column and the value of the diagonal index
+        in every row of this matrix.
+        '''
+        for i in range(0, self._rows + 1):
+            yield i, [i], [self._diag_value(i)]
 
-        # Call the parent class init to intialize some variables
-        # Enter 0 as default since non-diagonal entries will be 0
-        super(DiagonalMatrix, self).__init__(dimensions, 0)
-        self._diag_default = default
-        # If the user enters a default value which is not 0, change the
-        # main diagonal of the matrix to that default value
-        if(self._diag_default != 0):
-            diag = OneDimensionalMatrix(1, dimensions, default)
-            SquareMatrix.set_diagonal(self, diag)
+    @_reads
+    def _col_entries(self):
+        '''(DiagonalMatrix) -> generator of (int, list of int,
+        list of float)
+        Yield the column number, the row and the value of the diagonal index
+        in every column of this matrix.
+        '''
+        return self._row_entries()
 
-    def set_val(self, i, j, new_val):
+    def _link_rows(self, rows):
+        '''(DiagonalMatrix, iterable of (int, list of int, list of float))
+        -> NoneType
+        Set the diagonal of this matrix from the (row, columns, values)
+        triples in rows.
+        REQ: every column given is on the diagonal
         '''
-        (DiagonalMatrix, int, int, float) -> NoneType
-        Set value at position [i,j] in the matrix to new_val
-        REQ: i is a number within the first and last row in the matrix
-        REQ: j is a number wihin the first and last column in the matrix
+        for i, cols, vals in rows:
+            for k in range(len(cols)):
+                self.set_val(i, cols[k], vals[k])
+
+    def _clear(self):
+        '''(DiagonalMatrix) -> NoneType
+        Reset every diagonal value of this matrix to the default of the
+        diagonal, which is kept.
         '''
-        # Check if an attempt was made to set a non-diagonal value
-        if(i != j):
-            raise MatrixInvalidOperationError("Non-diagonal values must be 0.")
-        # If not, set the value at the new position
-        Matrix.set_val(self, i, j, new_val)
+        self._before_write(None)
+        self._diagonal = None
 
+    @_writes
     def set_row(self, row_num, new_row):
         '''
         (DiagonalMatrix, int, OneDimensionalMatrix) -> NoneType
@@ -924,6 +3505,7 @@ class DiagonalMatrix(SquareMatrix, OneDimensionalMatrix):
         '''
         raise MatrixInvalidOperationError("Cannot change any rows.")
 
+    @_writes
     def set_col(self, col_num, new_col):
         '''
         (DiagonalMatrix, int, OneDimensionalMatrix) -> NoneType
@@ -932,6 +3514,7 @@ class DiagonalMatrix(SquareMatrix, OneDimensionalMatrix):
         '''
         raise MatrixInvalidOperationError("Cannot change any columns.")
 
+    @_writes
     def swap_rows(self, i, j):
         '''
         (DiagonalMatrix, int, int) -> NoneType
@@ -940,6 +3523,7 @@ class DiagonalMatrix(SquareMatrix, OneDimensionalMatrix):
         '''
         raise MatrixInvalidOperationError("Cannot swap any rows given type.")
 
+    @_writes
     def swap_cols(self, i, j):
         '''
         (DiagonalMatrix, int, int) -> NoneType
@@ -959,9 +3543,9 @@ class IdentityMatrix(DiagonalMatrix):
         '''
         # REPRESENTATION INVARIANT
 
-        # self._head is the first node in the matrix
         # (self._rows == self._cols) + 1 is the amount of rows and columns
-        # self._diag_default will always be 1
+        # self._diagonal is always None, so nothing is stored per index
+        # self._diag_default is 1 until a scalar operation changes it
         # If I_M is an IdentityMatrx
         #    I_M has m rows and m columns
         #    I_M[i,j] for all i == j is 1
@@ -971,6 +3555,61 @@ class IdentityMatrix(DiagonalMatrix):
         # Set default value as 1 for the main diagonal
         super(IdentityMatrix, self).__init__(dimensions, 1)
 
+    @classmethod
+    def _sized(cls, m, n, default):
+        '''(type, int, int, float) -> IdentityMatrix
+        Return a new m x m identity matrix, for values which are then
+        checked as they are loaded. Raise an error unless the default,
+        the value of every index not loaded, is 0.
+        REQ: m == n
+        '''
+        if(m != n):
+            raise MatrixDimensionError("Matrix must be square.")
+        if(default != 0):
+            raise MatrixInvalidOperationError("Non-diagonal values must be "
+                                              "0.")
+        return cls(m)
+
+    def _load_array(self, array):
+        '''(IdentityMatrix, numpy.ndarray) -> NoneType
+        Check that array is this identity matrix, raising an error if it
+        is not. Nothing is stored, since no value can change.
+        '''
+        if(not numpy.array_equal(array, numpy.eye(self._rows + 1) *
+                                 self._diag_default)):
+            raise MatrixInvalidOperationError("Values given are not an "
+                                              "identity matrix.")
+
+    def _load_coordinates(self, rows, cols, values):
+        '''(IdentityMatrix, numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        -> NoneType
+        Check that values[k] at (rows[k], cols[k]) for every k make up
+        this identity matrix, raising an error if they do not.
+        '''
+        DiagonalMatrix.load_triplets(self, rows.tolist(), cols.tolist(),
+                                     values.tolist(), 'error')
+
+    def _link_rows(self, rows):
+        '''(IdentityMatrix, iterable of (int, list of int, list of float))
+        -> NoneType
+        Check that the (row, columns, values) triples in rows give every
+        diagonal value of this matrix, and nothing else, raising an error
+        if they do not. Nothing is stored, since no value can change.
+        '''
+        found = 0
+        for i, cols, vals in rows:
+            for k in range(len(cols)):
+                if(cols[k] != i or vals[k] != self._diag_default):
+                    raise MatrixInvalidOperationError("Values given are "
+                                                      "not an identity "
+                                                      "matrix.")
+                found += 1
+        # Every diagonal index not given would be the default of 0
+        if(found != self._rows + 1):
+            raise MatrixInvalidOperationError("Values given are not an "
+                                              "identity matrix.")
+
+    @_writes_value
     def set_val(self, i, j, new_val):
         '''
         (IdentityMatrix, int, int, float) -> NoneType
@@ -979,6 +3618,26 @@ class IdentityMatrix(DiagonalMatrix):
         '''
         raise MatrixInvalidOperationError("Cannot change any values.")
 
+    @_writes_value
+    def remove_val(self, i, j):
+        '''
+        (IdentityMatrix, int, int) -> NoneType
+        Will raise an error if the user attempts to remove any value.
+        REQ: None
+        '''
+        raise MatrixInvalidOperationError("Cannot change any values.")
+
+    @_writes
+    def load_triplets(self, rows, cols=None, values=None, duplicates='sum'):
+        '''
+        (IdentityMatrix, list of int, list of int, list of float, str) ->
+        NoneType
+        Will raise an error if the user attempts to load any values.
+        REQ: None
+        '''
+        raise MatrixInvalidOperationError("Cannot change any values.")
+
+    @_writes
     def set_diagonal(self, new_diag):
         '''
         (IdentityMatrix, OneDimensionalMatrix) -> NoneType
@@ -986,3 +3645,886 @@ class IdentityMatrix(DiagonalMatrix):
         REQ: None
         '''
         raise MatrixInvalidOperationError("Cannot change any values")
+
+
+class CompressedMatrix(Matrix):
+    '''A matrix with the same operations as Matrix, but whose values are
+    kept in flat arrays instead of linked nodes: compressed rows (CSR) for
+    row access, compressed columns (CSC) for column access, and a table of
+    the entries added or removed since the arrays were last built.
+    Suited to matrices which are mostly read and traversed rather than
+    reshaped. Values are stored as double precision floats.'''
+
+    def __init__(self, m, n, default=0):
+        '''(CompressedMatrix, int, int, float) -> NoneType
+        Create a new m x n compressed matrix with all values set to default
+        REQ: m is an int > 0
+        REQ: n is an int > 0
+        REQ: default is some real number
+        '''
+        # REPRESENTATION INVARIANT
+
+        # self._rows and self._cols are the highest row and column numbers
+        # self._indptr has self._rows + 2 entries, and the values of row i
+        # are self._data[self._indptr[i]:self._indptr[i + 1]], with their
+        # columns in the same slice of self._indices, in increasing order
+        # self._updates maps a coordinate (i, j) to the value of a new entry
+        # there, or to None if the entry there was removed, for changes not
+        # in the compressed rows yet. A coordinate is only a key if the
+        # change adds or removes an entry, and they are all merged in before
+        # the rows are read as a whole
+        # self._nnz is the number of entries, counting self._updates
+        # self._csc is None, or a tuple (colptr, rows, pos) where the
+        # entries of column j are colptr[j] to colptr[j + 1], with rows[k]
+        # their row and self._data[pos[k]] their value
+        # self._pending is always None, since scalar operations are applied
+        # to self._data straight away
+        # self._default, self._prune_default, self._version and
+        # self._snapshots are the same as for Matrix, and there are no nodes
+        # If CompressedMatrix[i,j] has no entry, it is the default value
+        self._rows = m - 1
+        self._cols = n - 1
+        if (self._rows < 0 or self._cols < 0):
+            raise MatrixDimensionError("Invalid dimension input.")
+        self._default = default
+        self._pending = None
+        self._prune_default = False
+        self._version = 0
+        self._snapshots = []
+        self._indptr = array('q', [0]) * (m + 1)
+        self._indices = array('q')
+        self._data = array('d')
+        self._updates = {}
+        self._nnz = 0
+        self._csc = None
+
+    @_reads_value
+    def get_val(self, i, j):
+        '''(CompressedMatrix, int, int) -> float
+        Return the value of m[i,j] for this matrix m
+        REQ: i >= 0 and i < number of rows in the matrix
+        REQ: j >= 0 and j < number of columns in the matrix
+        '''
+        if (i > self._rows or i < 0 or j > self._cols or j < 0):
+            raise MatrixIndexError("Dimension does not exist in the Matrix.")
+        # A change not merged in yet is looked up rather than merged, so
+        # reading never changes the arrays
+        if((i, j) in self._updates):
+            value = self._updates[(i, j)]
+            if(value is None):
+                return self._default
+            return value
+        pos = self._find(i, j)
+        if(pos is None):
+            return self._default
+        return self._data[pos]
+
+    @_writes_value
+    def set_val(self, i, j, new_val):
+        '''(CompressedMatrix, int, int, float) -> NoneType
+        Set the value of m[i,j] to new_val for this matrix m
+        REQ: i >= 0 and i < number of rows in the matrix
+        REQ: j >= 0 and j < number of columns in the matrix
+        REQ: new_val is some real number
+        '''
+        if (i > self._rows or i < 0 or j > self._cols or j < 0):
+            raise MatrixIndexError("Dimension does not exist in the Matrix.")
+        self._before_set(i, j)
+        if(self._prune_default and new_val == self._default):
+            self.remove_val(i, j)
+            return
+        pos = self._find(i, j)
+        # An entry in the compressed rows is overwritten in place, bringing
+        # it back if it was removed
+        if(pos is not None):
+            self._data[pos] = new_val
+            if((i, j) in self._updates):
+                del self._updates[(i, j)]
+                self._nnz += 1
+        # Otherwise the new entry waits to be merged in with the others
+        else:
+            if((i, j) not in self._updates):
+                self._nnz += 1
+            self._updates[(i, j)] = float(new_val)
+
+    @_writes_value
+    def remove_val(self, i, j):
+        '''(CompressedMatrix, int, int) -> NoneType
+        Reset m[i,j] to the default value for this matrix m, removing its
+        entry.
+        REQ: i >= 0 and i < number of rows in the matrix
+        REQ: j >= 0 and j < number of columns in the matrix
+        '''
+        if (i > self._rows or i < 0 or j > self._cols or j < 0):
+            raise MatrixIndexError("Dimension does not exist in the Matrix.")
+        self._before_set(i, j)
+        # Deleting from the arrays would move every later entry, so the
+        # removal waits to be merged in along with any other changes
+        if(self._find(i, j) is not None):
+            if((i, j) not in self._updates):
+                self._updates[(i, j)] = None
+                self._nnz -= 1
+        elif((i, j) in self._updates):
+            del self._updates[(i, j)]
+            self._nnz -= 1
+
+    @_writes
+    def compact(self):
+        '''(CompressedMatrix) -> NoneType
+        Remove every entry of this matrix whose value equals the default.
+        REQ: None
+        '''
+        default = self._default
+        rows = [(i, [cols[k] for k in range(len(cols))
+                     if vals[k] != default],
+                 [value for value in vals if value != default])
+                for i, cols, vals in self._row_entries()]
+        self._clear()
+        self._link_rows(rows)
+
+    @_reads
+    def get_row(self, row_num):
+        '''(CompressedMatrix, int) -> OneDimensionalMatrix
+        Return the row_num'th row of this matrix.
+        REQ: row_num >= 0 and row_num < number of rows in the matrix
+        '''
+        if (row_num < 0 or row_num > self._rows):
+            raise MatrixIndexError("Given row does not exist in this matrix.")
+        self._compress()
+        start = self._indptr[row_num]
+        end = self._indptr[row_num + 1]
+        return _make_vector(True, self._cols + 1, self._default,
+                            self._indices[start:end].tolist(),
+                            self._data[start:end].tolist())
+
+    @_reads
+    def get_col(self, col_num):
+        '''(CompressedMatrix, int) -> OneDimensionalMatrix
+        Return the col_num'th column of this matrix.
+        REQ: col_num >= 0 and col_num < number of columns in the matrix
+        '''
+        if (col_num > self._cols or col_num < 0):
+            raise MatrixIndexError("Given column not in the matrix.")
+        colptr, rows, pos = self._get_csc()
+        start = colptr[col_num]
+        end = colptr[col_num + 1]
+        return _make_vector(False, self._rows + 1, self._default,
+                            rows[start:end].tolist(),
+                            [self._data[k] for k in pos[start:end]])
+
+    @_writes
+    def swap_rows(self, i, j):
+        '''(CompressedMatrix, int, int) -> NoneType
+        Swap the values of rows i and j in this matrix
+        REQ: i >= 0 and i < number of rows in the matrix
+        REQ: j >= 0 and j < number of rows in the matrix
+        '''
+        if(i < 0 or j < 0 or i > self.get_num_rows() - 1 or
+           j > self.get_num_rows() - 1):
+            raise MatrixIndexError("Given row(s) does not exist.")
+        if(i == j):
+            return
+        i, j = min(i, j), max(i, j)
+        self._before_write((i, j))
+        self._compress()
+        indptr = self._indptr
+        # Rebuild the arrays from slices with the two rows trading places.
+        # Only the rows from i to j move, so only their offsets change
+        pieces = [(0, indptr[i]), (indptr[j], indptr[j + 1]),
+                  (indptr[i + 1], indptr[j]), (indptr[i], indptr[i + 1]),
+                  (indptr[j + 1], len(self._indices))]
+        indices = array('q')
+        data = array('d')
+        for start, end in pieces:
+            indices.extend(self._indices[start:end])
+            data.extend(self._data[start:end])
+        shift = (indptr[j + 1] - indptr[j]) - (indptr[i + 1] - indptr[i])
+        for k in range(i + 1, j + 1):
+            indptr[k] += shift
+        self._indices = indices
+        self._data = data
+        self._csc = None
+
+    @_writes
+    def swap_cols(self, i, j):
+        '''(CompressedMatrix, int, int) -> NoneType
+        Swap the values of columns i and j in this matrix
+        REQ: i >= 0 and i < number of columns in the matrix
+        REQ: j >= 0 and j < number of columns in the matrix
+        '''
+        if(i < 0 or j < 0 or i > self.get_num_cols() - 1 or
+           j > self.get_num_cols() - 1):
+            raise MatrixIndexError("Given column(s) does not exist.")
+        if(i == j):
+            return
+        # Only the rows holding either column change, and the compressed
+        # columns list them
+        colptr, rows, pos = self._get_csc()
+        changed = sorted(set(rows[colptr[i]:colptr[i + 1]]) |
+                         set(rows[colptr[j]:colptr[j + 1]]))
+        self._before_write(tuple(changed))
+        indptr = self._indptr
+        indices = self._indices
+        data = self._data
+        swap = {i: j, j: i}
+        # Relabel the entries of each of those rows and put them back in
+        # order
+        for row in changed:
+            start = indptr[row]
+            end = indptr[row + 1]
+            entries = sorted((swap.get(indices[k], indices[k]), data[k])
+                             for k in range(start, end))
+            for k in range(start, end):
+                indices[k], data[k] = entries[k - start]
+        self._csc = None
+
+    def _blank(self, m, n, default):
+        '''(CompressedMatrix, int, int, float) -> CompressedMatrix
+        Return a new, empty m x n compressed matrix with the given default.
+        '''
+        return CompressedMatrix(m, n, default)
+
+    def _before_scale(self):
+        '''(CompressedMatrix) -> NoneType
+        Get ready for a scalar operation on this matrix, which changes
+        every stored value at once.
+        '''
+        self._before_write(None)
+
+    def _transform(self, scale, shift):
+        '''(CompressedMatrix, float, float) -> NoneType
+        Scale every value in this matrix by scale and then add shift to it.
+        The values are contiguous, so this is done straight away.
+        '''
+        self._map_values(lambda value: value * scale + shift)
+
+    def _map_values(self, func):
+        '''(CompressedMatrix, function) -> NoneType
+        Replace every stored value in this matrix with func applied to it.
+        '''
+        # The positions of the values do not move, so the column arrays
+        # stay valid
+        self._data = array('d', map(func, self._data))
+        for key in self._updates:
+            if(self._updates[key] is not None):
+                self._updates[key] = func(self._updates[key])
+
+    @_reads
+    def _row_entries(self):
+        '''(CompressedMatrix) -> generator of (int, list of int,
+        list of float)
+        Yield the row number, the columns and the values of every row of
+        this matrix that has any entries, in order of rows and columns.
+        '''
+        self._compress()
+        indptr = self._indptr
+        for i in range(0, self._rows + 1):
+            start = indptr[i]
+            end = indptr[i + 1]
+            if(start != end):
+                yield (i, self._indices[start:end].tolist(),
+                       self._data[start:end].tolist())
+
+    @_reads
+    def _col_entries(self):
+        '''(CompressedMatrix) -> generator of (int, list of int,
+        list of float)
+        Yield the column number, the rows and the values of every column of
+        this matrix that has any entries, in order of columns and rows.
+        '''
+        colptr, rows, pos = self._get_csc()
+        data = self._data
+        for j in range(0, self._cols + 1):
+            start = colptr[j]
+            end = colptr[j + 1]
+            if(start != end):
+                yield (j, rows[start:end].tolist(),
+                       [data[k] for k in pos[start:end]])
+
+    def _unsettled(self):
+        '''(CompressedMatrix) -> bool
+        Return True if entries added or removed since the arrays were last
+        built are still waiting to be merged in by the next read.
+        '''
+        return len(self._updates) != 0
+
+    def _settle(self):
+        '''(CompressedMatrix) -> NoneType
+        Merge any pending changes into the compressed rows.
+        '''
+        self._compress()
+
+    def _write_in_place(self, i, j, new_val):
+        '''(CompressedMatrix, int, int, float) -> NoneType
+        Return None, since every write to this matrix goes through the
+        changes it keeps for all of its rows.
+        '''
+        return None
+
+    def _csr_arrays(self):
+        '''(CompressedMatrix) -> (array, array, array)
+        Return the compressed rows of this matrix as they are stored.
+        '''
+        self._compress()
+        return self._indptr, self._indices, self._data
+
+    @_reads
+    def nnz(self):
+        '''(CompressedMatrix) -> int
+        Return the number of values stored in this matrix, including those
+        not merged into the arrays yet.
+        REQ: None
+        '''
+        return self._nnz
+
+    @_writes
+    def set_seek_index(self, enabled=True):
+        '''(CompressedMatrix, bool) -> NoneType
+        Do nothing, since the entries of each row are already found by
+        bisection, and those of each column through the compressed columns.
+        REQ: None
+        '''
+        pass
+
+    @_reads
+    def _line_items(self, index, is_row):
+        '''(CompressedMatrix, int, bool) -> generator of (int, float)
+        Yield the position and value of every entry in row index of this
+        matrix if is_row is True, or in column index otherwise, read in
+        place from the compressed arrays.
+        '''
+        if(is_row):
+            self._compress()
+            indices = self._indices
+            data = self._data
+            for k in range(self._indptr[index], self._indptr[index + 1]):
+                yield indices[k], data[k]
+        else:
+            colptr, rows, pos = self._get_csc()
+            data = self._data
+            for k in range(colptr[index], colptr[index + 1]):
+                yield rows[k], data[pos[k]]
+
+    def _link_rows(self, rows):
+        '''(CompressedMatrix, iterable of (int, list of int, list of float))
+        -> NoneType
+        Fill the compressed rows of this matrix from the (row, columns,
+        values) triples in rows.
+        REQ: this matrix has no entries yet
+        REQ: rows are given in increasing order, each with increasing
+        columns inside the range of the matrix
+        '''
+        indptr = self._indptr
+        last = 0
+        for i, cols, vals in rows:
+            # Rows skipped over are empty, so they end where the last began
+            for k in range(last + 1, i + 1):
+                indptr[k] = len(self._indices)
+            self._indices.extend(cols)
+            self._data.extend(vals)
+            last = i
+        for k in range(last + 1, self._rows + 2):
+            indptr[k] = len(self._indices)
+        self._nnz = len(self._indices)
+        self._csc = None
+
+    def _clear(self):
+        '''(CompressedMatrix) -> NoneType
+        Remove every entry from this matrix.
+        '''
+        self._before_write(None)
+        self._indptr = array('q', [0]) * (self._rows + 2)
+        self._indices = array('q')
+        self._data = array('d')
+        self._updates = {}
+        self._nnz = 0
+        self._csc = None
+
+    def _find(self, i, j):
+        '''(CompressedMatrix, int, int) -> int
+        Return the position of m[i,j] in the compressed rows, or None if it
+        has no entry there.
+        '''
+        end = self._indptr[i + 1]
+        pos = bisect_left(self._indices, j, self._indptr[i], end)
+        if(pos < end and self._indices[pos] == j):
+            return pos
+        return None
+
+    def _compress(self):
+        '''(CompressedMatrix) -> NoneType
+        Merge any entries added or removed since the arrays were last built
+        into the compressed rows.
+        '''
+        if(not self._updates):
+            return
+        updates = self._updates
+        # Coordinates sort by row and then column
+        order = sorted(updates)
+        indptr = self._indptr
+        indices = self._indices
+        data = self._data
+        new_indptr = array('q', [0]) * (self._rows + 2)
+        new_indices = array('q')
+        new_data = array('d')
+        k = 0
+        for i in range(0, self._rows + 1):
+            start = indptr[i]
+            end = indptr[i + 1]
+            # Rows with nothing pending are copied over whole
+            if(k == len(order) or order[k][0] != i):
+                new_indices.extend(indices[start:end])
+                new_data.extend(data[start:end])
+            else:
+                merged = dict(zip(indices[start:end], data[start:end]))
+                while(k < len(order) and order[k][0] == i):
+                    value = updates[order[k]]
+                    if(value is None):
+                        del merged[order[k][1]]
+                    else:
+                        merged[order[k][1]] = value
+                    k += 1
+                cols = sorted(merged)
+                new_indices.extend(cols)
+                new_data.extend(merged[j] for j in cols)
+            new_indptr[i + 1] = len(new_indices)
+        self._indptr = new_indptr
+        self._indices = new_indices
+        self._data = new_data
+        self._updates = {}
+        self._csc = None
+
+    def _get_csc(self):
+        '''(CompressedMatrix) -> (array, array, array)
+        Return the compressed columns of this matrix, building them from
+        the compressed rows if they are out of date.
+        '''
+        self._compress()
+        if(self._csc is None):
+            indptr = self._indptr
+            indices = self._indices
+            # Count the entries of every column to find where they start
+            colptr = array('q', [0]) * (self._cols + 2)
+            for j in indices:
+                colptr[j + 1] += 1
+            for j in range(0, self._cols + 1):
+                colptr[j + 1] += colptr[j]
+            # Then drop each entry into its column, going through the rows
+            # in order so the rows of every column end up sorted
+            fill = array('q', colptr)
+            rows = array('q', [0]) * len(indices)
+            pos = array('q', [0]) * len(indices)
+            for i in range(0, self._rows + 1):
+                for k in range(indptr[i], indptr[i + 1]):
+                    at = fill[indices[k]]
+                    rows[at] = i
+                    pos[at] = k
+                    fill[indices[k]] = at + 1
+            self._csc = (colptr, rows, pos)
+        return self._csc
+
+
+class MatrixSnapshot():
+    '''A read only copy of a matrix as it was when Matrix.snapshot was
+    called. Rows are shared with the matrix until it is about to change
+    them, and only then copied into the snapshot, so taking a snapshot is
+    O(1) and it costs no more than the rows changed since. A change to the
+    whole matrix at once (a transpose in place, a reload, or applying
+    scalar operations to every node) copies everything the snapshot still
+    shares, detaching it from the matrix.'''
+
+    def __init__(self, matrix):
+        '''(MatrixSnapshot, Matrix) -> NoneType
+        Create a snapshot of matrix as it is now. Use Matrix.snapshot
+        rather than creating one directly, so that the matrix keeps it up
+        to date.
+        REQ: None
+        '''
+        # REPRESENTATION INVARIANT
+
+        # self._matrix is the matrix this was taken from, or None once
+        # every row has been copied out of it
+        # self._kept maps each row copied into the snapshot to a pair of
+        # lists, its stored columns and their values. While self._matrix
+        # is not None, every other row reads as it does in self._matrix,
+        # with the scalar operations self._pending (a pair (scale, shift)
+        # or None) applied to its nodes
+        # self._version is the version of the matrix this was taken at,
+        # and self._rows, self._cols, self._default and self._nnz are as
+        # they were in the matrix then
+        # self._blank makes blank matrices of the class of the matrix
+        self._matrix = matrix
+        self._kept = {}
+        (self._pending, self._version, self._rows, self._cols,
+         self._default, self._nnz, self._blank) = matrix._snapshot_state()
+
+    @_reads
+    def get_version(self):
+        '''(MatrixSnapshot) -> int
+        Return the version of the matrix this snapshot was taken at.
+        REQ: None
+        '''
+        return self._version
+
+    @_reads
+    def is_detached(self):
+        '''(MatrixSnapshot) -> bool
+        Return True if this snapshot holds a copy of every row, and so no
+        longer reads anything from the matrix it was taken from.
+        REQ: None
+        '''
+        return self._matrix is None
+
+    @_writes
+    def detach(self):
+        '''(MatrixSnapshot) -> NoneType
+        Copy every row this snapshot still shares with its matrix, so that
+        it no longer depends on the matrix at all.
+        REQ: None
+        '''
+        if(self._matrix is not None):
+            kept = {}
+            for i, cols, vals in self._row_entries():
+                kept[i] = (cols, vals)
+            self._kept = kept
+            self._matrix = None
+
+    @_reads
+    def get_num_rows(self):
+        '''(MatrixSnapshot) -> int
+        Return the number of rows in this snapshot.
+        REQ: None
+        '''
+        return self._rows + 1
+
+    @_reads
+    def get_num_cols(self):
+        '''(MatrixSnapshot) -> int
+        Return the number of columns in this snapshot.
+        REQ: None
+        '''
+        return self._cols + 1
+
+    @_reads_value
+    def get_val(self, i, j):
+        '''(MatrixSnapshot, int, int) -> float
+        Return the value of m[i,j] for the matrix m this is a snapshot of,
+        as it was when the snapshot was taken.
+        REQ: i >= 0 and i <= number of rows in the snapshot
+        REQ: j >= 0 and j <= number of columns in the snapshot
+        '''
+        if (i > self._rows or i < 0 or j > self._cols or j < 0):
+            raise MatrixIndexError("Dimension does not exist in the Matrix.")
+        matrix = self._matrix
+        row = self._kept.get(i)
+        if(row is None):
+            # A row never copied is as it was, so the matrix can look the
+            # value up itself unless a scalar operation has come since
+            if(matrix is None):
+                return self._default
+            return matrix._snapshot_value(i, j, self._pending, self._default)
+        cols, vals = row
+        pos = bisect_left(cols, j)
+        if(pos < len(cols) and cols[pos] == j):
+            return vals[pos]
+        return self._default
+
+    @_reads
+    def get_row(self, row_num):
+        '''(MatrixSnapshot, int) -> OneDimensionalMatrix
+        Return the row_num'th row of this snapshot.
+        REQ: row_num >= 0 and row_num <= number of rows in the snapshot
+        '''
+        if (row_num < 0 or row_num > self._rows):
+            raise MatrixIndexError("Given row does not exist in this matrix.")
+        cols, vals = self._split(self._line_items(row_num, True))
+        return _make_vector(True, self._cols + 1, self._default, cols, vals)
+
+    @_reads
+    def get_col(self, col_num):
+        '''(MatrixSnapshot, int) -> OneDimensionalMatrix
+        Return the col_num'th column of this snapshot.
+        REQ: col_num >= 0 and col_num <= number of columns in the snapshot
+        '''
+        if (col_num > self._cols or col_num < 0):
+            raise MatrixIndexError("Given column not in the matrix.")
+        rows, vals = self._split(self._line_items(col_num, False))
+        return _make_vector(False, self._rows + 1, self._default, rows, vals)
+
+    @_reads
+    def get_item(self, i):
+        '''(MatrixSnapshot, int) -> float
+        Return the i'th item of this snapshot, taken of a one dimensional
+        matrix.
+        REQ: i is an integer within the number of rows/cols of the snapshot
+        '''
+        return OneDimensionalMatrix.get_item(self, i)
+
+    @_reads
+    def get_size(self):
+        '''(MatrixSnapshot) -> int
+        Return the number of items in this snapshot, taken of a one
+        dimensional matrix.
+        REQ: None
+        '''
+        return OneDimensionalMatrix.get_size(self)
+
+    @_reads
+    def get_diagonal(self):
+        '''(MatrixSnapshot) -> OneDimensionalMatrix
+        Return a one dimensional matrix with the values of the diagonal of
+        this snapshot, taken of a square matrix.
+        REQ: the snapshot has as many rows as columns
+        '''
+        if(self._rows != self._cols):
+            raise MatrixDimensionError("Matrix must be square.")
+        return SquareMatrix.get_diagonal(self)
+
+    @_reads
+    def nnz(self):
+        '''(MatrixSnapshot) -> int
+        Return the number of values the matrix stored when this snapshot
+        was taken.
+        REQ: None
+        '''
+        return self._nnz
+
+    @_reads
+    def iter_nonzero(self, order='row'):
+        '''(MatrixSnapshot, str) -> generator of (int, int, float)
+        Return a generator of (row, column, value) for every value stored in
+        this snapshot, in order of rows if order is 'row' or of columns if
+        order is 'col', as Matrix.iter_nonzero does.
+        REQ: order is 'row' or 'col'
+        '''
+        return Matrix.iter_nonzero(self, order)
+
+    @_reads
+    def iter_row(self, row_num):
+        '''(MatrixSnapshot, int) -> generator of (int, int, float)
+        Return a generator of (row, column, value) for every value stored in
+        the row_num'th row of this snapshot, in order of columns.
+        REQ: row_num >= 0 and row_num <= number of rows in the snapshot
+        '''
+        return Matrix.iter_row(self, row_num)
+
+    @_reads
+    def iter_col(self, col_num):
+        '''(MatrixSnapshot, int) -> generator of (int, int, float)
+        Return a generator of (row, column, value) for every value stored in
+        the col_num'th column of this snapshot, in order of rows.
+        REQ: col_num >= 0 and col_num <= number of columns in the snapshot
+        '''
+        return Matrix.iter_col(self, col_num)
+
+    @_reads
+    def row_view(self, row_num, writable=False):
+        '''(MatrixSnapshot, int, bool) -> MatrixView
+        Return a read only view of the row_num'th row of this snapshot.
+        REQ: row_num >= 0 and row_num <= number of rows in the snapshot
+        REQ: writable is False
+        '''
+        if(writable):
+            raise MatrixInvalidOperationError("A snapshot is read only.")
+        return Matrix.row_view(self, row_num)
+
+    @_reads
+    def col_view(self, col_num, writable=False):
+        '''(MatrixSnapshot, int, bool) -> MatrixView
+        Return a read only view of the col_num'th column of this snapshot.
+        REQ: col_num >= 0 and col_num <= number of columns in the snapshot
+        REQ: writable is False
+        '''
+        if(writable):
+            raise MatrixInvalidOperationError("A snapshot is read only.")
+        return Matrix.col_view(self, col_num)
+
+    @_reads
+    def to_matrix(self):
+        '''(MatrixSnapshot) -> Matrix
+        Return a new matrix, which can be changed, holding the values of
+        this snapshot.
+        REQ: None
+        '''
+        result = self._blank(self._rows + 1, self._cols + 1, self._default)
+        result._link_rows(self._row_entries())
+        return result
+
+    @_reads
+    def add_matrix(self, adder_matrix):
+        '''(MatrixSnapshot, Matrix) -> Matrix
+        Return a new matrix that is the sum of this snapshot and
+        adder_matrix.
+        REQ: adder_matrix has the same dimensions as the snapshot
+        '''
+        return _link_all(*Matrix._start_sum(self, adder_matrix))
+
+    @_reads
+    def multiply_matrix(self, mult_matrix):
+        '''(MatrixSnapshot, Matrix) -> Matrix
+        Return a new matrix that is the product of this snapshot and
+        mult_matrix.
+        REQ: the snapshot has as many columns as mult_matrix has rows
+        '''
+        return self.to_matrix().multiply_matrix(mult_matrix)
+
+    @_reads
+    def transpose(self):
+        '''(MatrixSnapshot) -> Matrix
+        Return a new matrix which is the transpose of this snapshot.
+        REQ: None
+        '''
+        return _link_all(*Matrix._start_transpose(self))
+
+    @_reads
+    def matvec(self, vector):
+        '''(MatrixSnapshot, object) -> object
+        Return the product of this snapshot and vector, as Matrix.matvec
+        does.
+        REQ: vector has as many items as the snapshot has columns
+        '''
+        return Matrix.matvec(self, vector)
+
+    @_reads
+    def rmatvec(self, vector):
+        '''(MatrixSnapshot, object) -> object
+        Return the product of the transpose of this snapshot and vector, as
+        Matrix.rmatvec does.
+        REQ: vector has as many items as the snapshot has rows
+        '''
+        return Matrix.rmatvec(self, vector)
+
+    @_reads
+    def to_numpy(self):
+        '''(MatrixSnapshot) -> numpy.ndarray
+        Return a 2 dimensional NumPy array holding every value of this
+        snapshot.
+        REQ: NumPy is installed
+        '''
+        return Matrix.to_numpy(self)
+
+    @_reads
+    def to_scipy_sparse(self, format='csr'):
+        '''(MatrixSnapshot, str) -> scipy.sparse matrix
+        Return a SciPy sparse matrix in the given format holding every
+        value stored in this snapshot.
+        REQ: SciPy is installed
+        REQ: the default of the snapshot is 0
+        '''
+        return Matrix.to_scipy_sparse(self, format)
+
+    def _keep(self, i):
+        '''(MatrixSnapshot, int) -> NoneType
+        Copy row i out of the matrix into this snapshot, unless it already
+        has been.
+        '''
+        if(i not in self._kept):
+            self._kept[i] = self._split(self._shared_items(i, True))
+
+    def _shared_items(self, index, is_row):
+        '''(MatrixSnapshot, int, bool) -> list of (int, float)
+        Return the position and value of every entry the matrix stores in
+        row index if is_row is True, or in column index otherwise, as this
+        snapshot reads them.
+        '''
+        if(self._matrix is None):
+            return []
+        return self._matrix._snapshot_line(index, is_row, self._pending)
+
+    @_reads
+    def _line_items(self, index, is_row):
+        '''(MatrixSnapshot, int, bool) -> generator of (int, float)
+        Yield the position and value of every entry stored in row index of
+        this snapshot if is_row is True, or in column index otherwise.
+        '''
+        kept = self._kept
+        if(is_row):
+            if(index in kept):
+                return zip(*kept[index])
+            return iter(self._shared_items(index, True))
+        # A column reads from the matrix only in rows never copied, and
+        # from the copies in the rest
+        items = [(i, value) for i, value in self._shared_items(index, False)
+                 if i not in kept]
+        for i, (cols, vals) in kept.items():
+            pos = bisect_left(cols, index)
+            if(pos < len(cols) and cols[pos] == index):
+                items.append((i, vals[pos]))
+        items.sort(key=itemgetter(0))
+        return iter(items)
+
+    @_reads
+    def _row_entries(self):
+        '''(MatrixSnapshot) -> generator of (int, list of int,
+        list of float)
+        Yield the row number, the columns and the values of every row of
+        this snapshot with stored entries, in order of rows and columns.
+        '''
+        kept = self._kept
+        matrix = self._matrix
+        shared = iter(())
+        if(matrix is not None):
+            shared = matrix._snapshot_rows(self._pending)
+        # Merge the rows still shared with the copied ones, in order
+        copied = sorted(kept)
+        k = 0
+        for i, cols, vals in shared:
+            while(k < len(copied) and copied[k] < i):
+                if(kept[copied[k]][0]):
+                    yield (copied[k],) + kept[copied[k]]
+                k += 1
+            if(i not in kept and cols):
+                yield i, cols, vals
+        while(k < len(copied)):
+            if(kept[copied[k]][0]):
+                yield (copied[k],) + kept[copied[k]]
+            k += 1
+
+    @_reads
+    def _col_entries(self):
+        '''(MatrixSnapshot) -> generator of (int, list of int,
+        list of float)
+        Yield the column number, the rows and the values of every column of
+        this snapshot with stored entries, in order of columns and rows.
+        '''
+        columns = {}
+        for i, cols, vals in self._row_entries():
+            for k in range(len(cols)):
+                rows, col_vals = columns.setdefault(cols[k], ([], []))
+                rows.append(i)
+                col_vals.append(vals[k])
+        for j in sorted(columns):
+            yield (j,) + columns[j]
+
+    def _csr_arrays(self):
+        '''(MatrixSnapshot) -> (list of int, list of int, list of float)
+        Return the values of this snapshot in compressed rows.
+        '''
+        return Matrix._csr_arrays(self)
+
+    def _unsettled(self):
+        '''(MatrixSnapshot) -> bool
+        Return True if reading this snapshot would first change how its
+        matrix is stored.
+        '''
+        return self._matrix is not None and self._matrix._unsettled()
+
+    def _settle(self):
+        '''(MatrixSnapshot) -> NoneType
+        Bring anything the matrix of this snapshot builds lazily when it is
+        read up to date.
+        '''
+        if(self._matrix is not None):
+            self._matrix._settle()
+
+    def _split(self, items):
+        '''(MatrixSnapshot, iterable of (int, float)) ->
+        (list of int, list of float)
+        Return the positions and the values of items as two lists.
+        '''
+        positions = []
+        values = []
+        for pos, value in items:
+            positions.append(pos)
+            values.append(value)
+        return positions, values
@@ -0,0 +1,399 @@
+'''Share matrices from Node_Matrix between threads.
+
+Every method of a matrix declares how it uses the matrix (see _reads,
+_writes, _reads_value and _writes_value in Node_Matrix), and
+ConcurrentMatrix locks each call to match. A method which declares
+nothing can not be called through it.
+
+A matrix is guarded by a reader-writer lock over all of it and by lock
+striping over its rows and columns: row i shares the i % stripes'th of a
+set of reader-writer locks with the other rows of its stripe, and column j
+the j % stripes'th of a set of plain locks. Reads hold the matrix lock to
+read along with every row stripe, so they see it as a whole. A write to a
+single value holds the matrix lock to read and only the stripes of its row
+and column to write, so writers to rows and columns in different stripes
+go ahead at the same time; it relinks only those two chains, through
+Matrix._write_in_place. A write which would touch anything more (adding
+or taking out an index node in the frame, bringing pending scalar
+operations up to date, copying rows into a snapshot, or any class which
+does not store each value as a single node) falls back to holding the
+matrix lock to write, as every other write does.
+
+Reads which would change how a matrix is stored (a CompressedMatrix
+merging the values set since it was last read) are run under the write
+lock. The column arrays some matrices build while being read are each put
+in place by a single assignment, so readers building them at the same time
+are safe.
+'''
+import threading
+import types
+from contextlib import contextmanager
+from Node_Matrix import MatrixInvalidOperationError, MatrixView
+
+# The number of stripes the rows and columns of a matrix are locked in
+_STRIPES = 16
+
+
+class ReadWriteLock():
+    '''A lock which any number of readers can hold at once, or one writer
+    on its own. Once a writer is waiting, no new readers are let in, so a
+    steady stream of readers can not keep writers out. The lock is not
+    reentrant.'''
+
+    def __init__(self):
+        '''(ReadWriteLock) -> NoneType
+        Create a new lock, held by no one.
+        '''
+        # REPRESENTATION INVARIANT
+
+        # self._readers is the number of threads holding the lock to read,
+        # and self._writing is True if a thread holds it to write, in which
+        # case self._readers is 0
+        # self._writers_waiting is the number of threads waiting to write
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    def acquire_read(self):
+        '''(ReadWriteLock) -> NoneType
+        Wait until no thread is writing or waiting to write, then hold
+        this lock to read.
+        REQ: None
+        '''
+        with self._condition:
+            while(self._writing or self._writers_waiting):
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        '''(ReadWriteLock) -> NoneType
+        Stop holding this lock to read.
+        REQ: this thread holds the lock to read
+        '''
+        with self._condition:
+            self._readers -= 1
+            if(self._readers == 0):
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        '''(ReadWriteLock) -> NoneType
+        Wait until no thread is reading or writing, then hold this lock to
+        write.
+        REQ: None
+        '''
+        with self._condition:
+            self._writers_waiting += 1
+            while(self._writing or self._readers):
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+
+    def release_write(self):
+        '''(ReadWriteLock) -> NoneType
+        Stop holding this lock to write.
+        REQ: this thread holds the lock to write
+        '''
+        with self._condition:
+            self._writing = False
+            self._condition.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        '''(ReadWriteLock) -> context manager
+        Hold this lock to read for the body of a with statement.
+        REQ: None
+        '''
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        '''(ReadWriteLock) -> context manager
+        Hold this lock to write for the body of a with statement.
+        REQ: None
+        '''
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ConcurrentMatrix():
+    '''A matrix which several threads can use at once. It has every method
+    of the matrix it wraps which declares how it uses the matrix, and each
+    call holds the locks that declaration calls for. Anything a read would
+    hand back as a generator is read in full before the locks are let go.
+    Other ConcurrentMatrix objects passed to a method are read under their
+    own locks.'''
+
+    def __init__(self, matrix, stripes=_STRIPES):
+        '''(ConcurrentMatrix, Matrix, int) -> NoneType
+        Wrap matrix so that it can be shared between threads, locking its
+        rows and its columns in stripes stripes each. The matrix should
+        only be used through this wrapper from then on.
+        REQ: stripes > 0
+        '''
+        # REPRESENTATION INVARIANT
+
+        # self._matrix is the matrix being shared, and self._lock the lock
+        # over all of it
+        # self._row_locks[k] is the lock of every row i with
+        # i % stripes == k, and self._col_locks[k] that of every column j
+        # with j % stripes == k
+        # self._count_lock is held while a write made in place is counted
+        self._matrix = matrix
+        self._lock = ReadWriteLock()
+        self._row_locks = [ReadWriteLock() for k in range(stripes)]
+        self._col_locks = [threading.Lock() for k in range(stripes)]
+        self._count_lock = threading.Lock()
+
+    def get_matrix(self):
+        '''(ConcurrentMatrix) -> Matrix
+        Return the matrix this wraps. It is not locked when used directly.
+        REQ: None
+        '''
+        return self._matrix
+
+    @contextmanager
+    def read_locked(self):
+        '''(ConcurrentMatrix) -> context manager
+        Hold the locks of this matrix to read for the body of a with
+        statement, so that several reads see it in the same state.
+        REQ: the body does not call this matrix through the wrapper
+        '''
+        held = _acquire({id(self._lock): self}, {})
+        try:
+            yield
+        finally:
+            _release(held)
+
+    def write_locked(self):
+        '''(ConcurrentMatrix) -> context manager
+        Hold the lock of this matrix to write for the body of a with
+        statement, so that several changes are seen together.
+        REQ: the body does not call this matrix through the wrapper
+        '''
+        return self._lock.write_locked()
+
+    def row_view(self, row_num, writable=False):
+        '''(ConcurrentMatrix, int, bool) -> MatrixView
+        Return a view of the row_num'th row of this matrix, as
+        Matrix.row_view does, every read and write of which is locked.
+        REQ: row_num >= 0 and row_num <= number of rows in the matrix
+        '''
+        self._call('row_view', (row_num,), {}, False)
+        return MatrixView(self, row_num, True, writable)
+
+    def col_view(self, col_num, writable=False):
+        '''(ConcurrentMatrix, int, bool) -> MatrixView
+        Return a view of the col_num'th column of this matrix, as
+        Matrix.col_view does, every read and write of which is locked.
+        REQ: col_num >= 0 and col_num <= number of columns in the matrix
+        '''
+        self._call('col_view', (col_num,), {}, False)
+        return MatrixView(self, col_num, False, writable)
+
+    def snapshot(self):
+        '''(ConcurrentMatrix) -> ConcurrentMatrix
+        Return a snapshot of this matrix, as Matrix.snapshot does, wrapped
+        so that it is read under the same locks as this matrix, since it
+        shares rows with it.
+        REQ: None
+        '''
+        snapshot = ConcurrentMatrix(self._call('snapshot', (), {}, True))
+        snapshot._lock = self._lock
+        snapshot._row_locks = self._row_locks
+        snapshot._col_locks = self._col_locks
+        snapshot._count_lock = self._count_lock
+        return snapshot
+
+    def __getattr__(self, name):
+        '''(ConcurrentMatrix, str) -> object
+        Return the attribute name of the wrapped matrix. Methods come back
+        wrapped so that calling them holds the locks they declare they
+        need.
+        '''
+        # Only reached for _matrix itself before it is set, as when copied
+        if(name == '_matrix'):
+            raise AttributeError(name)
+        attr = getattr(self._matrix, name)
+        if(not callable(attr)):
+            return attr
+        access = getattr(getattr(type(self._matrix), name, None), '_access',
+                         None)
+        if(access is None):
+            raise MatrixInvalidOperationError(
+                name + " does not declare how it uses the matrix, so it can "
+                "not be called from several threads.")
+
+        def locked(*args, **kwargs):
+            # A single value is locked by its row and column, when called
+            # the usual way
+            if(access.endswith('_value') and not kwargs and
+               len(args) in (2, 3) and type(args[0]) is int and
+               type(args[1]) is int):
+                if(access == 'read_value'):
+                    return self._read_value(name, args)
+                if(self._write_value(args)):
+                    return None
+            return self._call(name, args, kwargs,
+                              access.startswith('write'))
+        locked.__name__ = name
+        locked.__doc__ = attr.__doc__
+        return locked
+
+    def _read_value(self, name, args):
+        '''(ConcurrentMatrix, str, tuple) -> object
+        Call method name of the wrapped matrix, which reads only the value
+        at the row and column args starts with, holding the matrix lock
+        and the lock of that row's stripe to read.
+        '''
+        row_lock = self._row_locks[args[0] % len(self._row_locks)]
+        self._lock.acquire_read()
+        try:
+            # A matrix which would change itself when read is read as a
+            # whole instead, which settles it first
+            if(not self._matrix._unsettled()):
+                with row_lock.read_locked():
+                    return getattr(self._matrix, name)(*args)
+        finally:
+            self._lock.release_read()
+        return self._call(name, args, {}, False)
+
+    def _write_value(self, args):
+        '''(ConcurrentMatrix, tuple) -> bool
+        Set the value at the row and column args starts with to its third
+        item, or remove it if there is none, with Matrix._write_in_place,
+        holding the matrix lock to read and the locks of the stripes of
+        that row and column to write. Return False if the write could not
+        be made that way, having changed nothing.
+        '''
+        i = args[0]
+        j = args[1]
+        new_val = None
+        if(len(args) == 3):
+            new_val = args[2]
+        row_lock = self._row_locks[i % len(self._row_locks)]
+        col_lock = self._col_locks[j % len(self._col_locks)]
+        matrix = self._matrix
+        # Row stripes are always taken before column stripes, and stripes
+        # are only ever taken while holding the matrix lock, so no two
+        # threads can each wait on the other
+        with self._lock.read_locked():
+            with row_lock.write_locked():
+                with col_lock:
+                    change = matrix._write_in_place(i, j, new_val)
+                    if(change is None):
+                        return False
+                    # Writers to other stripes count at the same time
+                    with self._count_lock:
+                        matrix._count_write(change)
+        return True
+
+    def _call(self, name, args, kwargs, write):
+        '''(ConcurrentMatrix, str, tuple, dict, bool) -> object
+        Call method name of the wrapped matrix with args and kwargs, with
+        its lock held to write if write is True or its locks held to read
+        otherwise, and any ConcurrentMatrix among the arguments held to
+        read.
+        '''
+        # Lock wrapped arguments as well, swapping in what they wrap. A
+        # snapshot shares the lock of its matrix, so locks are kept by the
+        # id of the lock rather than of the wrapper
+        writers = {}
+        if(write):
+            writers[id(self._lock)] = self
+        readers = {id(self._lock): self}
+        args = [_unwrap(arg, readers) for arg in args]
+        kwargs = dict((key, _unwrap(value, readers))
+                      for key, value in kwargs.items())
+        for key in writers:
+            del readers[key]
+        while(True):
+            held = _acquire(readers, writers)
+            # A matrix which would change itself when read can not be read
+            # by other threads at the same time, so take its write lock
+            # instead and bring it up to date before reading it
+            unsettled = [key for key, wrapper in readers.items()
+                         if wrapper._matrix._unsettled()]
+            if(not unsettled):
+                break
+            _release(held)
+            for key in unsettled:
+                writers[key] = readers.pop(key)
+        try:
+            for wrapper in writers.values():
+                wrapper._matrix._settle()
+            result = getattr(self._matrix, name)(*args, **kwargs)
+            # Generators would otherwise be read after the lock is let go
+            if(isinstance(result, types.GeneratorType)):
+                result = iter(list(result))
+        finally:
+            _release(held)
+        if(result is self._matrix):
+            return self
+        return result
+
+
+def _unwrap(arg, readers):
+    '''(object, dict of {int: ConcurrentMatrix}) -> object
+    Return arg with any ConcurrentMatrix it is, or any view of one, swapped
+    for the matrix it wraps, adding the wrapper to readers under the id of
+    its lock.
+    '''
+    if(isinstance(arg, ConcurrentMatrix)):
+        readers.setdefault(id(arg._lock), arg)
+        return arg._matrix
+    if(isinstance(arg, MatrixView) and
+       isinstance(arg._matrix, ConcurrentMatrix)):
+        readers.setdefault(id(arg._matrix._lock), arg._matrix)
+        return MatrixView(arg._matrix._matrix, arg._index, arg._is_row,
+                          arg._writable)
+    return arg
+
+
+def _acquire(readers, writers):
+    '''(dict of {int: ConcurrentMatrix}, dict of {int: ConcurrentMatrix})
+    -> list of (ReadWriteLock, bool)
+    Hold the lock of every wrapper in readers to read, along with every
+    one of its row stripes, and the lock of every wrapper in writers to
+    write, and return which locks were taken and whether to write. Locks
+    are always taken in the same order, by the id of the matrix lock and
+    then by stripe, so that two threads locking the same matrices can not
+    each wait on the other.
+    '''
+    order = ([(key, wrapper, False) for key, wrapper in readers.items()] +
+             [(key, wrapper, True) for key, wrapper in writers.items()])
+    order.sort(key=lambda entry: entry[0])
+    held = []
+    try:
+        for key, wrapper, write in order:
+            if(write):
+                wrapper._lock.acquire_write()
+                held.append((wrapper._lock, True))
+            else:
+                # Reading the matrix as a whole keeps out writers to any
+                # single value as well
+                for lock in [wrapper._lock] + wrapper._row_locks:
+                    lock.acquire_read()
+                    held.append((lock, False))
+    except BaseException:
+        _release(held)
+        raise
+    return held
+
+
+def _release(held):
+    '''(list of (ReadWriteLock, bool)) -> NoneType
+    Let go of every lock taken by _acquire, in the reverse order.
+    '''
+    for lock, write in reversed(held):
+        if(write):
+            lock.release_write()
+        else:
+            lock.release_read()
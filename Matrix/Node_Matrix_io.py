@@ -0,0 +1,653 @@
+'''Save matrices from Node_Matrix to a compact binary file and load them
+back, optionally straight out of a memory map.
+
+A file starts with a 48 byte header: the magic bytes b'NMAT', the format
+version, the kind of matrix, the typecodes of the values and of the
+default, the number of rows, columns and stored values, and the default
+itself. After it come the compressed rows of the stored values, as arrays
+of 8 byte little endian numbers: indptr (rows + 1 offsets), indices (one
+column per value) and data (the values, as 'q' integers if every value is
+an int and as 'd' floats otherwise). A SymmetricMatrix saves only the
+upper triangle it stores, and a DiagonalMatrix or IdentityMatrix saves
+every value on its diagonal.
+
+Matrices can also be read from and written to Matrix Market coordinate
+files and CSV files of (row, column, value) lines. Both are read a chunk
+at a time: each chunk is parsed and spread over the rows it holds values
+for, and each row is let go of as soon as it is linked into the matrix, so
+neither the text of the file nor a second copy of every value is ever held
+in memory at once.
+
+Matrix Market has no way of giving a default, so a matrix whose default is
+not 0 is written with a '% default <value>' comment line before the size
+line. This is an extension of this module only: read_matrix_market sets
+the default from it, while any other reader skips it as a comment and so
+reads the values with a default of 0.
+'''
+import mmap
+import struct
+import sys
+from array import array
+from Node_Matrix import (CompressedMatrix, DenseOneDimensionalMatrix,
+                         DiagonalMatrix, IdentityMatrix, Matrix,
+                         MatrixIndexError, MatrixInvalidOperationError,
+                         OneDimensionalMatrix, SquareMatrix, SymmetricMatrix,
+                         _group_triplets, _writes, _writes_value)
+
+_MAGIC = b'NMAT'
+_VERSION = 1
+# magic, version, kind, value typecode, default typecode, rows, columns,
+# number of values, default
+_HEADER = struct.Struct('<4sHBcc3xqqq8s4x')
+# The kind of a matrix is its position in this list. New kinds only ever
+# go on the end, so old files keep their meaning
+_KINDS = [Matrix, SquareMatrix, SymmetricMatrix, DiagonalMatrix,
+          IdentityMatrix, OneDimensionalMatrix, DenseOneDimensionalMatrix,
+          CompressedMatrix]
+# Kinds whose stored values are not simply their rows can not be served
+# from the mapped arrays, so they are always loaded in full
+_UNMAPPABLE = (SymmetricMatrix, DiagonalMatrix, IdentityMatrix)
+# Text files are read and written this many bytes at a time
+_CHUNK_SIZE = 1 << 20
+
+
+class MatrixFormatError(Exception):
+    '''An exception for files which do not hold a matrix in the format
+    they are read as'''
+
+
+def save_matrix(matrix, path):
+    '''(Matrix, str) -> NoneType
+    Save matrix to the file at path, replacing anything already there.
+    REQ: matrix is a Matrix or one of its subclasses
+    '''
+    kind = _kind_of(matrix)
+    m = matrix.get_num_rows()
+    n = matrix.get_num_cols()
+    indptr = array('q', [0]) * (m + 1)
+    indices = array('q')
+    values = []
+    # A SymmetricMatrix is saved as the upper triangle it stores
+    if(isinstance(matrix, SymmetricMatrix)):
+        entries = Matrix._row_entries(matrix)
+    else:
+        entries = matrix._row_entries()
+    last = 0
+    for i, cols, vals in entries:
+        for k in range(last + 1, i + 1):
+            indptr[k] = len(indices)
+        indices.extend(cols)
+        values.extend(vals)
+        last = i
+    for k in range(last + 1, m + 1):
+        indptr[k] = len(indices)
+    data = array(_typecode(values), values)
+    default = matrix._default
+    default_code = _typecode([default])
+    header = _HEADER.pack(_MAGIC, _VERSION, kind, data.typecode.encode(),
+                          default_code.encode(), m, n, len(data),
+                          struct.pack('<' + default_code, default))
+    with open(path, 'wb') as out:
+        out.write(header)
+        for arr in (indptr, indices, data):
+            if(sys.byteorder != 'little'):
+                arr = array(arr.typecode, arr)
+                arr.byteswap()
+            arr.tofile(out)
+
+
+def load_matrix(path, mapped=False):
+    '''(str, bool) -> Matrix
+    Return the matrix saved in the file at path, as the same kind of
+    matrix it was saved as. If mapped is True, the file is memory mapped
+    instead and a MappedMatrix reading straight from it is returned, so
+    nothing is built up front. A SymmetricMatrix, DiagonalMatrix or
+    IdentityMatrix is always loaded in full.
+    REQ: the file at path was written by save_matrix
+    '''
+    with open(path, 'rb') as source:
+        (kind, value_code, m, n, nnz,
+         default) = _read_header(source.read(_HEADER.size))
+        cls = _KINDS[kind]
+        if(mapped and sys.byteorder == 'little' and
+           not issubclass(cls, _UNMAPPABLE)):
+            buffer = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+            return MappedMatrix(m, n, default, buffer, nnz, value_code)
+        indptr = _read_array(source, 'q', m + 1)
+        indices = _read_array(source, 'q', nnz)
+        data = _read_array(source, value_code, nnz)
+    if(issubclass(cls, DiagonalMatrix)):
+        return _load_diagonal(cls, m, default, indptr, data)
+    matrix = cls._sized(m, n, default)
+    if(cls is CompressedMatrix):
+        # The arrays are already in the layout a CompressedMatrix keeps
+        matrix._indptr = indptr
+        matrix._indices = indices
+        matrix._data = array('d', data)
+        matrix._nnz = nnz
+    else:
+        matrix._clear()
+        matrix._link_rows((i, indices[indptr[i]:indptr[i + 1]].tolist(),
+                           data[indptr[i]:indptr[i + 1]].tolist())
+                          for i in range(0, m) if indptr[i] != indptr[i + 1])
+    return matrix
+
+
+def _load_diagonal(cls, m, default, indptr, data):
+    '''(type, int, float, array, array) -> DiagonalMatrix
+    Return a new m x m matrix of class cls, a DiagonalMatrix or one of its
+    subclasses, with the saved default off the diagonal and the saved
+    values on it. The values are put in place directly, since an
+    IdentityMatrix can not have them set.
+    '''
+    matrix = cls._sized(m, m, 0)
+    matrix._default = default
+    # save_matrix writes one value for every row of a diagonal
+    for i in range(0, m):
+        if(indptr[i + 1] - indptr[i] != 1):
+            raise MatrixFormatError("Diagonal value missing from the file.")
+    diagonal = [data[indptr[i]] for i in range(0, m)]
+    # A diagonal holding the same value everywhere is kept as its default,
+    # as it was before saving, and as an IdentityMatrix always keeps it
+    if(diagonal.count(diagonal[0]) == m):
+        matrix._diag_default = diagonal[0]
+    else:
+        matrix._diagonal = diagonal
+    return matrix
+
+
+def read_matrix_market(path, chunk_size=_CHUNK_SIZE):
+    '''(str, int) -> Matrix
+    Return the matrix in the Matrix Market coordinate file at path, as a
+    SymmetricMatrix if the file says it is symmetric and as a Matrix
+    otherwise. The file is parsed chunk_size bytes at a time, and each
+    chunk is spread over the rows it holds values for before the next one
+    is read. Real, integer and pattern files can be read. A '% default'
+    comment line before the size line, which write_matrix_market writes
+    but is not part of the format, sets the default.
+    REQ: chunk_size > 0
+    '''
+    with open(path) as source:
+        header = source.readline().split()
+        if(len(header) != 5 or header[0].lower() != '%%matrixmarket' or
+           header[1].lower() != 'matrix'):
+            raise MatrixFormatError("File is not in Matrix Market format.")
+        layout, field, symmetry = [word.lower() for word in header[2:]]
+        if(layout != 'coordinate' or
+           field not in ('real', 'integer', 'pattern') or
+           symmetry not in ('general', 'symmetric')):
+            raise MatrixFormatError("Only real, integer or pattern "
+                                    "coordinate files which are general or "
+                                    "symmetric can be read.")
+        default = 0
+        line = source.readline()
+        # Comments and blank lines may come before the size line
+        while(line.startswith('%') or (line and not line.strip())):
+            words = line[1:].split()
+            if(len(words) == 2 and words[0] == 'default'):
+                default = _number(words[1])
+            line = source.readline()
+        try:
+            m, n, nnz = [int(word) for word in line.split()]
+        except ValueError:
+            raise MatrixFormatError("Size line is missing or malformed.")
+        if(symmetry == 'symmetric'):
+            if(m != n):
+                raise MatrixFormatError("A symmetric matrix must be square.")
+            matrix = SymmetricMatrix(m, default)
+        else:
+            matrix = Matrix(m, n, default)
+        if(field == 'real'):
+            parse = float
+        else:
+            parse = int
+        groups = _RowGroups(symmetry == 'symmetric')
+        for words in _chunk_words(source, chunk_size, None):
+            if(field == 'pattern'):
+                groups.add(*_take_triplets(words, 2, None, 1))
+            else:
+                groups.add(*_take_triplets(words, 3, parse, 1))
+    if(groups.count != nnz):
+        raise MatrixFormatError("File does not hold as many entries as its "
+                                "size line says.")
+    groups.link(matrix, 'sum')
+    return matrix
+
+
+def write_matrix_market(matrix, path, chunk_size=_CHUNK_SIZE):
+    '''(Matrix, str, int) -> NoneType
+    Write the values stored in matrix to the file at path in Matrix Market
+    coordinate format, straight from its rows, chunk_size bytes at a time.
+    A SymmetricMatrix is written as symmetric, listing its lower triangle.
+    A default other than 0 is written in a '% default' comment line, which
+    only read_matrix_market reads; other readers take the default as 0.
+    REQ: chunk_size > 0
+    '''
+    symmetric = isinstance(matrix, SymmetricMatrix)
+    # Go through the values once first, to count them and find out if
+    # they are all integers
+    nnz = 0
+    field = 'integer'
+    for i, cols, vals in _stored_rows(matrix):
+        nnz += len(cols)
+        if(field == 'integer' and _typecode(vals) != 'q'):
+            field = 'real'
+    with open(path, 'w') as out:
+        out.write('%%MatrixMarket matrix coordinate ' + field + ' ' +
+                  ('symmetric' if symmetric else 'general') + '\n')
+        if(matrix._default != 0):
+            out.write('% default ' + repr(matrix._default) + '\n')
+        out.write('%d %d %d\n' % (matrix.get_num_rows(),
+                                  matrix.get_num_cols(), nnz))
+        # The file lists the lower triangle of a symmetric matrix, which
+        # is the mirror of the upper one it stores
+        _write_lines(out, _stored_rows(matrix), ' ', 1, symmetric,
+                     chunk_size)
+
+
+def read_csv(path, shape=None, default=0, cls=Matrix, delimiter=',',
+             skip_header=False, duplicates='sum', chunk_size=_CHUNK_SIZE):
+    '''(str, (int, int), float, type, str, bool, str, int) -> Matrix
+    Return a matrix of class cls holding the values in the file at path,
+    which has a row, column and value on every line, counted from 0 and
+    separated by delimiter. The matrix has the given shape, or if shape is
+    None, is just big enough to hold every value. The file is parsed
+    chunk_size bytes at a time, and each chunk is spread over the rows it
+    holds values for before the next one is read. See Matrix.load_triplets
+    for how duplicates are handled. A SymmetricMatrix takes each value at
+    both (row, column) and (column, row), so a file listing both of them
+    should be read with duplicates set to 'last'.
+    REQ: chunk_size > 0
+    '''
+    groups = _RowGroups(issubclass(cls, SymmetricMatrix))
+    with open(path) as source:
+        if(skip_header):
+            source.readline()
+        for words in _chunk_words(source, chunk_size, delimiter):
+            groups.add(*_take_triplets(words, 3, _number, 0))
+    if(shape is None):
+        shape = (max(groups.last_row, 0) + 1, max(groups.last_col, 0) + 1)
+        if(issubclass(cls, SquareMatrix)):
+            shape = (max(shape), max(shape))
+    matrix = cls._sized(shape[0], shape[1], default)
+    groups.link(matrix, duplicates)
+    return matrix
+
+
+def write_csv(matrix, path, delimiter=',', chunk_size=_CHUNK_SIZE):
+    '''(Matrix, str, str, int) -> NoneType
+    Write the values stored in matrix to the file at path as a row,
+    column and value per line, counted from 0 and separated by delimiter,
+    straight from its rows, chunk_size bytes at a time. A SymmetricMatrix
+    writes only the upper triangle it stores.
+    REQ: chunk_size > 0
+    '''
+    with open(path, 'w') as out:
+        _write_lines(out, _stored_rows(matrix), delimiter, 0, False,
+                     chunk_size)
+
+
+def _kind_of(matrix):
+    '''(Matrix) -> int
+    Return the kind to save matrix as, which is that of the closest class
+    it inherits from that has one.
+    '''
+    for cls in type(matrix).__mro__:
+        if(cls in _KINDS):
+            return _KINDS.index(cls)
+    raise MatrixInvalidOperationError("Only matrices can be saved.")
+
+
+def _typecode(values):
+    '''(list of float) -> str
+    Return 'q' if every value in values is an int that fits in 8 bytes,
+    and 'd' otherwise.
+    '''
+    for value in values:
+        if(type(value) is not int or not -2 ** 63 <= value < 2 ** 63):
+            return 'd'
+    return 'q'
+
+
+def _read_header(header):
+    '''(bytes) -> (int, str, int, int, int, float)
+    Return the kind, value typecode, number of rows, columns and values,
+    and the default saved in header.
+    '''
+    if(len(header) != _HEADER.size):
+        raise MatrixFormatError("File is too short to hold a matrix.")
+    (magic, version, kind, value_code, default_code, m, n, nnz,
+     default) = _HEADER.unpack(header)
+    if(magic != _MAGIC):
+        raise MatrixFormatError("File does not hold a saved matrix.")
+    if(version != _VERSION or kind >= len(_KINDS)):
+        raise MatrixFormatError("File was saved by a newer version.")
+    value_code = value_code.decode()
+    default_code = default_code.decode()
+    default = struct.unpack('<' + default_code, default)[0]
+    return kind, value_code, m, n, nnz, default
+
+
+def _read_array(source, typecode, length):
+    '''(file, str, int) -> array
+    Read an array of length little endian numbers of the given typecode
+    from source.
+    '''
+    result = array(typecode)
+    try:
+        result.fromfile(source, length)
+    except EOFError:
+        raise MatrixFormatError("File ends before all values are read.")
+    if(sys.byteorder != 'little'):
+        result.byteswap()
+    return result
+
+
+def _number(text):
+    '''(str) -> float
+    Return the number written in text, as an int if it is one.
+    '''
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            raise MatrixFormatError("'" + text + "' is not a number.")
+
+
+def _stored_rows(matrix):
+    '''(Matrix) -> generator of (int, list of int, list of float)
+    Return the rows of values stored in matrix, which for a SymmetricMatrix
+    is only its upper triangle.
+    '''
+    if(isinstance(matrix, SymmetricMatrix)):
+        return Matrix._row_entries(matrix)
+    return matrix._row_entries()
+
+
+def _chunk_words(source, chunk_size, delimiter):
+    '''(file, int, str) -> generator of list of str
+    Yield the words of the rest of source, read chunk_size bytes at a time
+    and split on whitespace and on delimiter, so that no line is split
+    across two chunks.
+    '''
+    rest = ''
+    text = source.read(chunk_size)
+    while(text):
+        text = rest + text
+        # Hold back the last line, which may not have been read in full
+        end = text.rfind('\n') + 1
+        rest = text[end:]
+        text = text[:end]
+        if(delimiter is not None):
+            text = text.replace(delimiter, ' ')
+        yield text.split()
+        text = source.read(chunk_size)
+    if(rest):
+        if(delimiter is not None):
+            rest = rest.replace(delimiter, ' ')
+        yield rest.split()
+
+
+def _take_triplets(words, width, parse, base):
+    '''(list of str, int, function, int) -> (array, array, array)
+    Return the rows, columns and values of the entries in words, width
+    words each, taking base away from the coordinates. The value of an
+    entry is parse applied to its third word, or 1 if width is 2. The
+    values are an array of floats if any of them is one, and of integers
+    otherwise.
+    '''
+    if(len(words) % width != 0):
+        raise MatrixFormatError("Every line must hold " + str(width) +
+                                " numbers.")
+    try:
+        rows = array('q', [int(word) - base for word in words[0::width]])
+        cols = array('q', [int(word) - base for word in words[1::width]])
+    except ValueError:
+        raise MatrixFormatError("Coordinates must be integers.")
+    if(width == 2):
+        return rows, cols, array('q', [1]) * len(rows)
+    try:
+        values = [parse(word) for word in words[2::width]]
+    except ValueError:
+        raise MatrixFormatError("Values must be numbers.")
+    return rows, cols, array(_typecode(values), values)
+
+
+class _RowGroups():
+    '''The entries read so far from a text file, kept as an array of
+    columns and an array of values for every row they are in. Entries are
+    added a chunk at a time, and each row is let go of once it has been
+    linked into a matrix.'''
+
+    def __init__(self, symmetric):
+        '''(_RowGroups, bool) -> NoneType
+        Create a new set of groups holding no entries. If symmetric is
+        True, entries below the diagonal are kept at their mirror above it,
+        as a SymmetricMatrix keeps them.
+        '''
+        # REPRESENTATION INVARIANT
+
+        # self._groups maps each row an entry was added to to a list of the
+        # array of their columns and the array of their values, in the
+        # order they were added
+        # self.count is the number of entries added, self.low the smallest
+        # row or column of any of them (0 if there are none), and
+        # self.last_row and self.last_col the largest row and column of any
+        # of them (-1 if there are none)
+        self._groups = {}
+        self._symmetric = symmetric
+        self.count = 0
+        self.low = 0
+        self.last_row = -1
+        self.last_col = -1
+
+    def add(self, rows, cols, vals):
+        '''(_RowGroups, array, array, array) -> NoneType
+        Add the entry vals[k] at (rows[k], cols[k]) for every k.
+        REQ: rows, cols and vals are of the same length
+        '''
+        if(not rows):
+            return
+        if(self._symmetric):
+            for k in range(len(rows)):
+                if(rows[k] > cols[k]):
+                    rows[k], cols[k] = cols[k], rows[k]
+        groups = self._groups
+        for k in range(len(rows)):
+            group = groups.get(rows[k])
+            if(group is None):
+                group = groups[rows[k]] = [array('q'), array(vals.typecode)]
+            elif(vals.typecode == 'd' and group[1].typecode == 'q'):
+                group[1] = array('d', group[1])
+            group[0].append(cols[k])
+            group[1].append(vals[k])
+        self.count += len(rows)
+        self.low = min(self.low, min(rows), min(cols))
+        self.last_row = max(self.last_row, max(rows))
+        self.last_col = max(self.last_col, max(cols))
+
+    def link(self, matrix, duplicates):
+        '''(_RowGroups, Matrix, str) -> NoneType
+        Replace every value set in matrix with the entries added, as
+        Matrix.load_triplets does, letting go of each row once it is
+        linked in. Entries at the same coordinate are handled as
+        duplicates says, in the order they were added.
+        REQ: None
+        '''
+        if(duplicates not in ('sum', 'last', 'error')):
+            raise MatrixInvalidOperationError("Unknown duplicate policy.")
+        if(self.low < 0 or self.last_row >= matrix.get_num_rows() or
+           self.last_col >= matrix.get_num_cols()):
+            raise MatrixIndexError("Dimension does not exist in the Matrix.")
+        groups = self._groups
+
+        def triples():
+            for i in sorted(groups):
+                cols, vals = groups.pop(i)
+                # The sort is stable, so duplicates stay in the order read
+                for k in sorted(range(len(cols)), key=cols.__getitem__):
+                    yield i, cols[k], vals[k]
+        matrix._clear()
+        matrix._link_rows(_group_triplets(triples(), duplicates))
+
+
+def _write_lines(out, entries, separator, base, mirror, chunk_size):
+    '''(file, iterable, str, int, bool, int) -> NoneType
+    Write a line of row, column and value, separated by separator, for
+    every value in entries, a stream of (row, columns, values) triples,
+    adding base to the coordinates. If mirror is True, the row and column
+    of each value are swapped. Lines are written chunk_size bytes at a
+    time.
+    '''
+    lines = []
+    size = 0
+    for i, cols, vals in entries:
+        for k in range(len(cols)):
+            if(mirror):
+                coordinate = (cols[k] + base, i + base)
+            else:
+                coordinate = (i + base, cols[k] + base)
+            line = (str(coordinate[0]) + separator + str(coordinate[1]) +
+                    separator + repr(vals[k]) + '\n')
+            lines.append(line)
+            size += len(line)
+            if(size >= chunk_size):
+                out.write(''.join(lines))
+                lines = []
+                size = 0
+    out.write(''.join(lines))
+
+
+class MappedMatrix(CompressedMatrix):
+    '''A CompressedMatrix whose compressed rows are read straight out of a
+    memory mapped file written by save_matrix, so opening it costs nothing
+    however many values it holds. Reads are served from the file, and the
+    first change copies the arrays into memory, after which it behaves like
+    any other CompressedMatrix. The file itself is never changed. The map
+    is let go of by close(), or on leaving a with block.'''
+
+    def __init__(self, m, n, default, buffer, nnz, value_code):
+        '''(MappedMatrix, int, int, float, mmap, int, str) -> NoneType
+        Create an m x n matrix with the given default whose nnz values are
+        held in buffer, the mapped file, after its header.
+        REQ: buffer holds a matrix saved by save_matrix
+        '''
+        # REPRESENTATION INVARIANT
+
+        # self._buffer is the mapped file while self._indptr, self._indices
+        # and self._data are read only views into it, and None once they
+        # have been copied into arrays or the matrix is closed
+        # self._views holds every view into the map, to be released before
+        # it is closed
+        # Otherwise the same as for CompressedMatrix
+        CompressedMatrix.__init__(self, m, n, default)
+        if(len(buffer) < _HEADER.size + 8 * (m + 1 + 2 * nnz)):
+            buffer.close()
+            raise MatrixFormatError("File ends before all values are read.")
+        view = memoryview(buffer)
+        start = _HEADER.size
+        end = start + 8 * (m + 1)
+        self._indptr = view[start:end].cast('q')
+        start, end = end, end + 8 * nnz
+        self._indices = view[start:end].cast('q')
+        start, end = end, end + 8 * nnz
+        self._data = view[start:end].cast(value_code)
+        self._views = [view, self._indptr, self._indices, self._data]
+        self._nnz = nnz
+        self._buffer = buffer
+
+    @_writes
+    def close(self):
+        '''(MappedMatrix) -> NoneType
+        Let go of the mapped file. Unless a change already copied the
+        values of this matrix into memory, they were read from the file,
+        and the matrix can not be read after it is closed.
+        REQ: None
+        '''
+        if(self._buffer is not None):
+            for view in self._views:
+                view.release()
+            self._views = []
+            self._buffer.close()
+            self._buffer = None
+
+    def __enter__(self):
+        '''(MappedMatrix) -> MappedMatrix
+        Return this matrix, to be closed when the with block ends.
+        '''
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        '''(MappedMatrix, type, Exception, traceback) -> NoneType
+        Close this matrix at the end of a with block.
+        '''
+        self.close()
+
+    @_writes_value
+    def set_val(self, i, j, new_val):
+        '''(MappedMatrix, int, int, float) -> NoneType
+        Set the value of m[i,j] to new_val for this matrix m
+        REQ: i >= 0 and i < number of rows in the matrix
+        REQ: j >= 0 and j < number of columns in the matrix
+        REQ: new_val is some real number
+        '''
+        self._unmap()
+        CompressedMatrix.set_val(self, i, j, new_val)
+
+    @_writes_value
+    def remove_val(self, i, j):
+        '''(MappedMatrix, int, int) -> NoneType
+        Reset m[i,j] to the default value for this matrix m, removing its
+        entry.
+        REQ: i >= 0 and i < number of rows in the matrix
+        REQ: j >= 0 and j < number of columns in the matrix
+        '''
+        self._unmap()
+        CompressedMatrix.remove_val(self, i, j)
+
+    @_writes
+    def swap_rows(self, i, j):
+        '''(MappedMatrix, int, int) -> NoneType
+        Swap the values of rows i and j in this matrix
+        REQ: i >= 0 and i < number of rows in the matrix
+        REQ: j >= 0 and j < number of rows in the matrix
+        '''
+        self._unmap()
+        CompressedMatrix.swap_rows(self, i, j)
+
+    @_writes
+    def swap_cols(self, i, j):
+        '''(MappedMatrix, int, int) -> NoneType
+        Swap the values of columns i and j in this matrix
+        REQ: i >= 0 and i < number of columns in the matrix
+        REQ: j >= 0 and j < number of columns in the matrix
+        '''
+        self._unmap()
+        CompressedMatrix.swap_cols(self, i, j)
+
+    def _map_values(self, func):
+        '''(MappedMatrix, function) -> NoneType
+        Replace every stored value in this matrix with func applied to it.
+        '''
+        self._unmap()
+        CompressedMatrix._map_values(self, func)
+
+    def _clear(self):
+        '''(MappedMatrix) -> NoneType
+        Remove every entry from this matrix, letting go of the file.
+        '''
+        CompressedMatrix._clear(self)
+        self.close()
+
+    def _unmap(self):
+        '''(MappedMatrix) -> NoneType
+        Copy the compressed rows out of the mapped file into arrays of
+        their own, if they are still read from it.
+        '''
+        if(self._buffer is not None):
+            self._indptr = array('q', self._indptr)
+            self._indices = array('q', self._indices)
+            self._data = array('d', self._data)
+            self.close()
@@ -0,0 +1,312 @@
+'''Multiply and combine matrices from Node_Matrix across several processes.
+
+The rows of the left matrix are cut into blocks, and each block is sent to
+a worker process as flat arrays of row numbers, offsets, columns and
+values rather than as pickled nodes. Every worker is handed the right
+matrix once, in the same form, when it starts. The rows of the product
+come back in order and are linked into the result in a single pass.
+
+Elementwise operations (sums, differences, Hadamard products, maxima and
+minima) put the compressed rows of both matrices in shared memory instead,
+so each worker reads the ranges of rows it merges without copying them.
+Workers attach to the blocks for each chunk they merge and close them once
+it is done; only the calling process unlinks them.
+
+On platforms which start workers by importing the main module, the code
+calling these functions must sit under an if __name__ == '__main__'
+guard.
+'''
+import os
+import time
+from array import array
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from operator import add, mul, sub
+from Node_Matrix import (DiagonalMatrix, MatrixDimensionError,
+                         MatrixInvalidOperationError, _merge_rows,
+                         _sparse_product)
+from Node_Matrix_io import _typecode
+
+# Products whose left matrix stores fewer values than this are worked out
+# in this process, as starting the workers would take longer
+_MIN_NNZ = 50000
+# The rows of the right matrix, as a worker process keeps them
+_rows_b = None
+# The elementwise operations, by the name they are asked for with
+_OPERATIONS = {'add': add, 'subtract': sub, 'multiply': mul, 'max': max,
+               'min': min}
+# The shared memory blocks holding the compressed rows of both matrices,
+# as described by _share, and the defaults of both matrices and the name
+# of the operation a worker process merges them with
+_merge_args = None
+
+
+def multiply_matrix_parallel(matrix, mult_matrix, workers=None,
+                             block_rows=None, min_nnz=_MIN_NNZ):
+    '''(Matrix, Matrix, int, int, int) -> Matrix
+    Return a new matrix that is the product of matrix and mult_matrix, the
+    same as matrix.multiply_matrix(mult_matrix), working it out in up to
+    workers processes (by default, one per CPU) block_rows rows of matrix
+    at a time. Products with one worker, with a DiagonalMatrix, or whose
+    left matrix stores fewer than min_nnz values are worked out in this
+    process instead.
+    REQ: matrix has as many columns as mult_matrix has rows
+    REQ: workers and block_rows are None or ints > 0
+    '''
+    if(matrix.get_num_cols() != mult_matrix.get_num_rows()):
+        raise MatrixDimensionError("Unable to multiply given dimensions.")
+    if(workers is None):
+        workers = os.cpu_count() or 1
+    if(workers <= 1 or isinstance(matrix, DiagonalMatrix) or
+       isinstance(mult_matrix, DiagonalMatrix) or
+       matrix.nnz() < min_nnz):
+        return matrix.multiply_matrix(mult_matrix)
+
+    def product(rows_a, rows_b):
+        return _parallel_product(rows_a, rows_b, workers, block_rows)
+    # Every coordinate of the product away from the stored nodes works out
+    # to N times the product of the two defaults, as in the serial product
+    product_matrix = matrix._blank(matrix.get_num_rows(),
+                                   mult_matrix.get_num_cols(),
+                                   matrix.get_num_cols() * matrix._default *
+                                   mult_matrix._default)
+    product_matrix._link_rows(matrix._product_rows(mult_matrix, product))
+    return product_matrix
+
+
+def elementwise_parallel(matrix, other, operation='add', workers=None,
+                         chunk_rows=None, min_nnz=_MIN_NNZ, timings=None):
+    '''(Matrix, Matrix, str, int, int, int, list) -> Matrix
+    Return a new matrix holding operation applied to every pair of values
+    at the same coordinate of matrix and other, where operation is 'add',
+    'subtract', 'multiply' (the Hadamard product), 'max' or 'min'. The rows
+    are merged chunk_rows at a time in up to workers processes (by
+    default, one per CPU), which read both matrices from shared memory.
+    With one worker, or when both matrices together store fewer than
+    min_nnz values, the rows are merged in this process as a single chunk.
+    If timings is a list, a tuple (first row, last row + 1, values read,
+    seconds taken) is added to it for every chunk, in order.
+    REQ: matrix and other have the same dimensions
+    REQ: workers and chunk_rows are None or ints > 0
+    '''
+    if(matrix.get_num_rows() != other.get_num_rows() or
+       matrix.get_num_cols() != other.get_num_cols()):
+        raise MatrixDimensionError("The matrices are not the same size.")
+    if(operation not in _OPERATIONS):
+        raise MatrixInvalidOperationError("Unknown elementwise operation.")
+    combine = _OPERATIONS[operation]
+    m = matrix.get_num_rows()
+    if(workers is None):
+        workers = os.cpu_count() or 1
+    # Coordinates stored in neither matrix combine their two defaults
+    result = matrix._blank(m, matrix.get_num_cols(),
+                           combine(matrix._default, other._default))
+    csr_a = matrix._csr_arrays()
+    csr_b = other._csr_arrays()
+    nnz = len(csr_a[1]) + len(csr_b[1])
+    if(workers <= 1 or nnz < min_nnz):
+        start_time = time.perf_counter()
+        result._link_rows(_merge_rows(_csr_rows(csr_a, 0, m),
+                                      _csr_rows(csr_b, 0, m),
+                                      matrix._default, other._default,
+                                      combine))
+        if(timings is not None):
+            timings.append((0, m, nnz, time.perf_counter() - start_time))
+        return result
+    if(chunk_rows is None):
+        chunk_rows = max(1, -(-m // (workers * 4)))
+    chunks = [(start, min(start + chunk_rows, m))
+              for start in range(0, m, chunk_rows)]
+    blocks = []
+    try:
+        described = []
+        for arr in csr_a + csr_b:
+            block, description = _share(arr)
+            blocks.append(block)
+            described.append(description)
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_start_merger,
+                                 initargs=(described, matrix._default,
+                                           other._default, operation)
+                                 ) as pool:
+            merged = pool.map(_merge_chunk, chunks)
+            result._link_rows(_collect_chunks(merged, timings))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return result
+
+
+def _parallel_product(rows_a, rows_b, workers, block_rows):
+    '''(iterable, dict of {int: (list of int, list of float)}, int, int)
+    -> generator of (int, list of int, list of float)
+    Yield the same rows as _sparse_product(rows_a, rows_b), handing blocks
+    of block_rows rows of rows_a to a pool of workers processes. If
+    block_rows is None, each worker gets about four blocks.
+    '''
+    rows_a = [row for row in rows_a if row[1]]
+    if(block_rows is None):
+        block_rows = max(1, -(-len(rows_a) // (workers * 4)))
+    blocks = [_pack_rows(rows_a[start:start + block_rows])
+              for start in range(0, len(rows_a), block_rows)]
+    packed_b = _pack_rows((k, cols, vals)
+                          for k, (cols, vals) in sorted(rows_b.items()))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_start_worker,
+                             initargs=(packed_b,)) as pool:
+        # map hands back the blocks in the order they were given
+        for packed in pool.map(_multiply_block, blocks):
+            for row in _unpack_rows(packed):
+                yield row
+
+
+def _start_worker(packed_b):
+    '''(tuple) -> NoneType
+    Keep the rows of the right matrix, packed as by _pack_rows, in this
+    worker process.
+    '''
+    global _rows_b
+    _rows_b = {}
+    for k, cols, vals in _unpack_rows(packed_b):
+        _rows_b[k] = (cols, vals)
+
+
+def _multiply_block(packed):
+    '''(tuple) -> tuple
+    Return the rows of the product of the rows packed by _pack_rows and
+    the right matrix this worker keeps, packed the same way.
+    '''
+    return _pack_rows(_sparse_product(_unpack_rows(packed), _rows_b))
+
+
+def _pack_rows(rows):
+    '''(iterable of (int, list of int, list of float)) ->
+    (array, array, array, array)
+    Return the rows as flat arrays: their row numbers, the offsets where
+    each row starts and ends in the other two, and their columns and
+    values. Values are kept as integers if they all are one.
+    '''
+    row_nums = array('q')
+    indptr = array('q', [0])
+    indices = array('q')
+    values = []
+    for i, cols, vals in rows:
+        row_nums.append(i)
+        indices.extend(cols)
+        values.extend(vals)
+        indptr.append(len(indices))
+    return row_nums, indptr, indices, array(_typecode(values), values)
+
+
+def _unpack_rows(packed):
+    '''((array, array, array, array)) -> generator of (int, list of int,
+    list of float)
+    Yield the rows packed by _pack_rows.
+    '''
+    row_nums, indptr, indices, data = packed
+    for k in range(len(row_nums)):
+        start = indptr[k]
+        end = indptr[k + 1]
+        yield (row_nums[k], indices[start:end].tolist(),
+               data[start:end].tolist())
+
+
+def _csr_rows(csr, start, end):
+    '''((array, array, array), int, int) -> generator of (int,
+    list of int, list of float)
+    Yield the rows from start up to end which have values in the
+    compressed rows csr, a tuple of offsets, columns and values held in
+    lists, arrays or memoryviews.
+    '''
+    indptr, indices, data = csr
+    for i in range(start, end):
+        first = indptr[i]
+        last = indptr[i + 1]
+        if(first != last):
+            yield i, list(indices[first:last]), list(data[first:last])
+
+
+def _share(values):
+    '''(array) -> (SharedMemory, (str, str, int))
+    Copy the numbers in values, an array or list, into a new shared
+    memory block, and return the block with its name, typecode and length.
+    '''
+    if(isinstance(values, array)):
+        typecode = values.typecode
+    else:
+        typecode = _typecode(values)
+    values = array(typecode, values)
+    nbytes = len(values) * values.itemsize
+    # A block can not be empty, even when there is nothing to put in it
+    block = SharedMemory(create=True, size=max(1, nbytes))
+    block.buf[:nbytes] = values.tobytes()
+    return block, (block.name, typecode, len(values))
+
+
+def _start_merger(described, default_a, default_b, operation):
+    '''(list of (str, str, int), float, float, str) -> NoneType
+    Keep the descriptions of the shared memory blocks made by _share,
+    holding the compressed rows of both matrices, in this worker process,
+    with the defaults and the operation to merge them with.
+    '''
+    global _merge_args
+    _merge_args = (described, default_a, default_b, operation)
+
+
+@contextmanager
+def _attached(described):
+    '''(list of (str, str, int)) -> context manager
+    Attach to the shared memory blocks described by _share for the body of
+    a with statement, giving a memoryview of the numbers in each. The views
+    are released and the blocks closed afterwards, but never unlinked,
+    which is left to the process that made them.
+    '''
+    blocks = []
+    views = []
+    try:
+        for name, typecode, length in described:
+            block = SharedMemory(name=name)
+            blocks.append(block)
+            size = length * array(typecode).itemsize
+            views.append(block.buf[:size].cast(typecode))
+        yield views
+    finally:
+        # A block can not be closed while a view of it is still held
+        for view in views:
+            view.release()
+        for block in blocks:
+            block.close()
+
+
+def _merge_chunk(chunk):
+    '''((int, int)) -> (int, int, int, float, tuple)
+    Merge the rows from the first row of chunk up to its second, and
+    return the chunk, the number of values read, the seconds it took and
+    the merged rows packed as by _pack_rows.
+    '''
+    start_time = time.perf_counter()
+    start, end = chunk
+    described, default_a, default_b, operation = _merge_args
+    with _attached(described) as views:
+        csr_a = tuple(views[0:3])
+        csr_b = tuple(views[3:6])
+        nnz = (csr_a[0][end] - csr_a[0][start] +
+               csr_b[0][end] - csr_b[0][start])
+        packed = _pack_rows(_merge_rows(_csr_rows(csr_a, start, end),
+                                        _csr_rows(csr_b, start, end),
+                                        default_a, default_b,
+                                        _OPERATIONS[operation]))
+    return start, end, nnz, time.perf_counter() - start_time, packed
+
+
+def _collect_chunks(merged, timings):
+    '''(iterable, list) -> generator of (int, list of int, list of float)
+    Yield the rows of every merged chunk in order, adding its timing to
+    timings if it is a list.
+    '''
+    for start, end, nnz, seconds, packed in merged:
+        if(timings is not None):
+            timings.append((start, end, nnz, seconds))
+        for row in _unpack_rows(packed):
+            yield row